@@ -0,0 +1,74 @@
+"""Stress benchmark: many processes recording into one account at once.
+
+Each worker opens its own `Account` on the shared file and records steps in
+`transaction()` blocks. At the end the account must hold exactly
+workers x steps steps; the script reports throughput under contention.
+
+Run from the project root:
+
+  python benchmarks/bench_concurrent_record.py --workers 8 --steps 200 --storage journal
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Process
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from money_manager.session import Account  # noqa: E402
+from money_manager.storage import STORAGE_KINDS  # noqa: E402
+
+
+def record_steps(data_file: str, storage: str, steps: int) -> None:
+    acct = Account(data_file=data_file, storage=storage)
+    for _ in range(steps):
+        with acct.transaction():
+            if acct.current_session is None:
+                acct.start_session()
+            acct.record_result(bet_percent=0.0001, bet_amount=0.01, pnl=-0.01, result="loss")
+    acct.close()
+
+
+def run(workers: int, steps: int, storage: str, data_file: str) -> dict:
+    Account(data_file=data_file, storage=storage).init_account(1_000_000)
+    procs = [Process(target=record_steps, args=(data_file, storage, steps)) for _ in range(workers)]
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - start
+
+    acct = Account(data_file=data_file, storage=storage)
+    recorded = sum(s.step_count for s in acct.sessions)
+    acct.close()
+    expected = workers * steps
+    return {
+        "expected": expected,
+        "recorded": recorded,
+        "lost": expected - recorded,
+        "seconds": elapsed,
+        "steps_per_sec": expected / elapsed if elapsed else float("inf"),
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Concurrent Account.record_result stress benchmark")
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--steps", type=int, default=100, help="Steps recorded per worker")
+    p.add_argument("--storage", choices=STORAGE_KINDS, default="json")
+    p.add_argument("--data-file", default=None, help="Account file (default: a temp directory)")
+    args = p.parse_args()
+
+    data_file = args.data_file or os.path.join(tempfile.mkdtemp(), "mm_account.json")
+    res = run(args.workers, args.steps, args.storage, data_file)
+    print(f"{args.workers} workers x {args.steps} steps ({args.storage}): {res['recorded']}/{res['expected']} recorded, "
+          f"{res['lost']} lost, {res['seconds']:.2f}s, {res['steps_per_sec']:.0f} steps/s")
+    if res["lost"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Latency of CLI commands run one process each versus through `app.py serve`.
+
+Builds an account with a long history, then times:
+- `python src/app.py next` as a fresh process (startup + imports + load);
+- the same command sent to a running daemon over a persistent connection.
+
+Run from the project root:
+
+  python benchmarks/bench_daemon.py --steps 50000 --calls 2000
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from money_manager.daemon import Client  # noqa: E402
+from money_manager.storage import write_json  # noqa: E402
+
+APP = os.path.join(SRC, "app.py")
+
+
+def build_account(data_file: str, steps: int, per_session: int = 10) -> None:
+    """Write an account with `steps` steps in closed sessions plus one active session."""
+    balance = 1000.0
+    sessions = []
+    for s in range(steps // per_session):
+        rows = []
+        for i in range(per_session):
+            win = i == per_session - 1
+            pnl = 1.0 if win else -0.1
+            balance = round(balance + pnl, 2)
+            rows.append({"idx": i + 1, "bet_percent": 0.001, "bet_amount": 1.0, "result": "win" if win else "loss",
+                         "pnl": pnl, "balance_after": balance, "timestamp": f"2024-01-01T00:00:{s % 60:02d}"})
+        sessions.append({"id": f"s{s}", "start_balance": 1000.0, "active": False, "created_at": "2024-01-01T00:00:00", "steps": rows})
+    sessions.append({"id": "active", "start_balance": balance, "active": True, "created_at": "2024-01-01T00:00:00", "steps": []})
+    write_json(data_file, {"balance": balance, "sessions": sessions})
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def main():
+    p = argparse.ArgumentParser(description="CLI vs daemon command latency")
+    p.add_argument("--steps", type=int, default=50000, help="Steps of history in the account")
+    p.add_argument("--calls", type=int, default=2000, help="Commands sent to the daemon")
+    p.add_argument("--cold-runs", type=int, default=5, help="Fresh-process runs to time")
+    args = p.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    build_account(os.path.join(workdir, "mm_account.json"), args.steps)
+    sock = os.path.join(workdir, "mm_account.sock")
+
+    cold = []
+    for _ in range(args.cold_runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, APP, "next"], cwd=workdir, check=True, stdout=subprocess.DEVNULL)
+        cold.append(time.perf_counter() - start)
+
+    daemon = subprocess.Popen([sys.executable, APP, "serve"], cwd=workdir, stdout=subprocess.PIPE, text=True)
+    try:
+        daemon.stdout.readline()  # "Serving ..." once the socket is up
+        warm = []
+        with Client(sock) as client:
+            for _ in range(args.calls):
+                start = time.perf_counter()
+                reply = client.call(["next"])
+                warm.append(time.perf_counter() - start)
+                assert reply["status"] == 0, reply
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+    print(f"history: {args.steps} steps")
+    print(f"fresh process : median {statistics.median(cold) * 1000:8.2f} ms")
+    print(f"daemon        : median {statistics.median(warm) * 1000:8.3f} ms, p99 {percentile(warm, 99) * 1000:.3f} ms over {args.calls} calls")
+
+
+if __name__ == "__main__":
+    main()
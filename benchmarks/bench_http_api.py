@@ -0,0 +1,109 @@
+"""Load test for the HTTP API (`app.py api`): requests/sec and latency percentiles.
+
+Starts the API in a subprocess on a fresh account. It then drives the API
+with `--connections` keep-alive clients. Each client sends GET /next-bet and
+GET /status, plus POST /record with probability `--write-ratio`.
+
+Run from the project root:
+
+  python benchmarks/bench_http_api.py --connections 32 --requests 20000 --write-ratio 0.1 --storage sqlite
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from money_manager.session import Account  # noqa: E402
+from money_manager.storage import STORAGE_KINDS  # noqa: E402
+
+APP = os.path.join(SRC, "app.py")
+RECORD_BODY = json.dumps({"result": "loss", "bet_percent": 0.0001, "bet_amount": 0.01, "pnl": -0.01}).encode()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def client(port: int, n: int, write_ratio: float, seed: int, latencies: dict) -> None:
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for _ in range(n):
+        if rng.random() < write_ratio:
+            kind, req = "write", b"POST /record HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n%s" % (len(RECORD_BODY), RECORD_BODY)
+        else:
+            path = b"/next-bet" if rng.random() < 0.5 else b"/status"
+            kind, req = "read", b"GET " + path + b" HTTP/1.1\r\nHost: x\r\n\r\n"
+        start = time.perf_counter()
+        writer.write(req)
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b"\r\n":
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        latencies[kind].append(time.perf_counter() - start)
+        if status != 200:
+            raise RuntimeError(f"{kind} request failed with HTTP {status}")
+    writer.close()
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] * 1000 if ordered else float("nan")
+
+
+async def run_load(port: int, connections: int, requests: int, write_ratio: float) -> tuple:
+    latencies = {"read": [], "write": []}
+    per_client = max(1, requests // connections)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, per_client, write_ratio, i, latencies) for i in range(connections)))
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    p = argparse.ArgumentParser(description="HTTP API load benchmark")
+    p.add_argument("--connections", type=int, default=32)
+    p.add_argument("--requests", type=int, default=20000, help="Total requests across all connections")
+    p.add_argument("--write-ratio", type=float, default=0.1, help="Share of requests that are POST /record")
+    p.add_argument("--storage", choices=STORAGE_KINDS, default="sqlite")
+    args = p.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    with Account(data_file=os.path.join(workdir, "mm_account.json"), storage=args.storage) as acct:
+        acct.init_account(1_000_000)
+        acct.start_session()
+
+    port = free_port()
+    server = subprocess.Popen([sys.executable, APP, "--storage", args.storage, "api", "--port", str(port)], cwd=workdir, stdout=subprocess.PIPE, text=True)
+    try:
+        server.stdout.readline()  # "Serving ..." once listening
+        elapsed, latencies = asyncio.run(run_load(port, args.connections, args.requests, args.write_ratio))
+    finally:
+        server.terminate()
+        server.wait()
+
+    total = len(latencies["read"]) + len(latencies["write"])
+    print(f"{total} requests over {args.connections} connections in {elapsed:.2f}s: {total / elapsed:.0f} req/s ({args.storage})")
+    for kind in ("read", "write"):
+        samples = latencies[kind]
+        print(f"  {kind:5}: {len(samples):6} requests, p50 {percentile(samples, 50):7.2f} ms, p99 {percentile(samples, 99):7.2f} ms")
+    everything = latencies["read"] + latencies["write"]
+    print(f"  all  : p99 {percentile(everything, 99):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,24 @@
 """CLI app for daily money tracking with percentage-based Martingale progression."""
 import argparse
+import contextlib
+import csv
+import functools
+import io
+import itertools
+import json
+import os
+import signal
+import sys
+import weakref
 from pathlib import Path
+from money_manager.daemon import CommandServer, default_socket_path, send
+from money_manager.importer import IMPORT_FORMATS, read_results
 from money_manager.session import Account
+from money_manager.storage import STORAGE_KINDS, CorruptDataError, migrate_json_to_sqlite
+
+
+# AccountStats per loaded account, so repeated `stats` under `serve` only fold in new steps
+_STATS = weakref.WeakKeyDictionary()
 
 
 def get_data_file():
@@ -9,18 +26,29 @@ def get_data_file():
     return str(Path.cwd() / "mm_account.json")
 
 
+def open_account(args):
+    # Commands run by `serve` share the daemon's account instead of loading their own
+    acct = getattr(args, "account", None)
+    if acct is not None:
+        return acct
+    return Account(data_file=get_data_file(), storage=args.storage)
+
+
 def cmd_init(args):
-    acct = Account(data_file=get_data_file())
-    acct.init_account(args.balance)
+    acct = open_account(args)
+    with acct.transaction():
+        acct.init_account(args.balance)
     print(f"Initialized account with balance: {acct.balance}")
 
 
 def cmd_status(args):
-    acct = Account(data_file=get_data_file())
+    acct = open_account(args)
     s = acct.status()
     print(f"Balance: {s['balance']}")
     if s["current_session"]:
         print(f"Active session id: {s['current_session']['id']}")
+        prog = s["current_session"]["progress"]
+        print(f"Loss streak: {prog['loss_streak']} (session loss {prog['session_loss']})")
         print("Steps:")
         for st in s["current_session"]["steps"]:
             print(f"  {st['idx']}: bet {st['bet_amount']} ({st['bet_percent']*100:.2f}%) -> {st['result']} pnl={st['pnl']} bal={st['balance_after']}")
@@ -29,45 +57,320 @@ def cmd_status(args):
 
 
 def cmd_start(args):
-    acct = Account(data_file=get_data_file())
-    sess = acct.start_session()
+    acct = open_account(args)
+    with acct.transaction():
+        sess = acct.start_session(base_percent=args.base_percent, multiplier=args.multiplier)
     print(f"Started session {sess.id} at balance {sess.start_balance}")
 
 
 def cmd_next(args):
-    acct = Account(data_file=get_data_file())
+    acct = open_account(args)
     info = acct.get_next_bet(base_percent=args.base_percent, multiplier=args.multiplier)
     print(f"Next bet: {info['bet_amount']} ({info['bet_percent']*100:.2f}% of balance {acct.balance})")
 
 
-def cmd_record(args):
-    acct = Account(data_file=get_data_file())
-    # Determine next bet if not provided
-    if args.bet_percent is None or args.bet_amount is None:
-        info = acct.get_next_bet(base_percent=args.base_percent, multiplier=args.multiplier)
-        bet_percent = info["bet_percent"]
-        bet_amount = info["bet_amount"]
+def cmd_ladder(args):
+    acct = open_account(args)
+    ladder = acct.get_ladder(depth=args.depth, win_prob=args.win_prob, base_percent=args.base_percent, multiplier=args.multiplier)
+    print(f"{'Depth':>5} {'Bet %':>9} {'Bet':>12} {'Balance if lost':>16}" + (f" {'P(reach)':>10}" if args.win_prob is not None else ""))
+    for row in ladder.rows():
+        line = f"{row['depth']:>5} {row['bet_percent']*100:>8.2f}% {row['bet_amount']:>12.2f} {row['balance_after']:>16.2f}"
+        if row["reach_probability"] is not None:
+            line += f" {row['reach_probability']:>10.4%}"
+        print(line)
+    if ladder.bust_depth is not None:
+        print(f"Bet {ladder.bust_depth} needs the whole balance: {ladder.bust_depth - 1} losses in a row are affordable")
     else:
-        bet_percent = args.bet_percent
-        bet_amount = args.bet_amount
+        print(f"All {args.depth} bets are affordable")
 
-    # If user provided pnl use that, otherwise infer from win/loss assuming even payout
-    if args.pnl is not None:
-        pnl = args.pnl
-    else:
-        # assume win -> profit = bet_amount (1:1), loss -> profit = -bet_amount
-        if args.win:
-            pnl = float(bet_amount)
+
+def cmd_record(args):
+    acct = open_account(args)
+    # Hold the account lock from computing the bet to saving the step
+    with acct.transaction():
+        # Determine next bet if not provided
+        if args.bet_percent is None or args.bet_amount is None:
+            info = acct.get_next_bet(base_percent=args.base_percent, multiplier=args.multiplier)
+            bet_percent = info["bet_percent"]
+            bet_amount = info["bet_amount"]
+        else:
+            bet_percent = args.bet_percent
+            bet_amount = args.bet_amount
+
+        # If user provided pnl use that, otherwise infer from win/loss assuming even payout
+        if args.pnl is not None:
+            pnl = args.pnl
         else:
-            pnl = -float(bet_amount)
+            # assume win -> profit = bet_amount (1:1), loss -> profit = -bet_amount
+            if args.win:
+                pnl = float(bet_amount)
+            else:
+                pnl = -float(bet_amount)
+
+        result = "win" if args.win else "loss"
+        step = acct.record_result(bet_percent=bet_percent, bet_amount=bet_amount, pnl=pnl, result=result)
+        print(f"Recorded step {step.idx}: {result} pnl={step.pnl} balance={step.balance_after}")
+
+
+def cmd_import(args):
+    acct = open_account(args)
+    on_step = None
+    path_fh = None
+    if args.path_out:
+        path_fh = sys.stdout if args.path_out == "-" else open(args.path_out, "w", newline="", encoding="utf-8")
+        writer = csv.writer(path_fh)
+        writer.writerow(["n", "timestamp", "result", "bet_amount", "pnl", "balance"])
+        counter = itertools.count(1)
+        on_step = lambda st: writer.writerow([next(counter), st.timestamp, st.result, st.bet_amount, st.pnl, st.balance_after])
+    params = {k: v for k, v in (("base_percent", args.base_percent), ("multiplier", args.multiplier)) if v is not None}
+    try:
+        with acct.transaction():
+            summary = acct.record_many(read_results(args.file, args.format), chunk_size=args.chunk_size, dry_run=args.dry_run, on_step=on_step, **params)
+    except ValueError as e:
+        note = "" if args.dry_run else " (results before it were recorded)"
+        print(f"Error: {e}{note}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if path_fh is not None and path_fh is not sys.stdout:
+            path_fh.close()
+    out = sys.stderr if args.path_out == "-" else sys.stdout
+    verb = "Dry run: would import" if args.dry_run else "Imported"
+    print(
+        f"{verb} {summary['steps']} results ({summary['sessions_started']} new sessions): "
+        f"balance {summary['start_balance']} -> {summary['final_balance']} "
+        f"(min {summary['min_balance']}, max {summary['max_balance']})",
+        file=out,
+    )
+
+
+def cmd_stats(args):
+    # Imported here so other commands, and the --socket client, skip NumPy
+    from money_manager.stats import AccountStats
+
+    acct = open_account(args)
+    stats = _STATS.get(acct)
+    if stats is None:
+        stats = _STATS[acct] = AccountStats()
+    s = stats.update(acct).summary()
+    if args.json:
+        print(json.dumps(dict(s, by_hour=stats.by_hour()), indent=2))
+        return
+    if not s["steps"]:
+        print(f"No steps recorded yet (balance {s['balance']}, {s['sessions']} sessions)")
+        return
+    print(f"Steps: {s['steps']} ({s['wins']} wins, {s['losses']} losses, win rate {s['win_rate'] * 100:.1f}%)")
+    print(f"Sessions: {s['sessions']} (avg {s['avg_session_length']:.1f} steps, avg P&L {s['avg_session_pnl']:+.2f}, "
+          f"best {s['best_session_pnl']:+.2f}, worst {s['worst_session_pnl']:+.2f})")
+    print(f"Balance: {s['starting_balance']} -> {s['balance']} (P&L {s['total_pnl']:+.2f})")
+    print(f"Max drawdown: {s['max_drawdown']:.2f} ({s['max_drawdown_pct'] * 100:.2f}%)")
+    print(f"Loss streak: longest {s['longest_loss_streak']}, current {s['current_loss_streak']}")
+    if args.by_hour:
+        print(f"{'Hour':>4}  {'Steps':>7}  {'Win rate':>8}  {'P&L':>10}")
+        for row in stats.by_hour():
+            print(f"{row['hour']:>4}  {row['steps']:>7}  {row['win_rate'] * 100:>7.1f}%  {row['pnl']:>+10.2f}")
+
+
+def cmd_backtest(args):
+    # Imported here so other commands, and the --socket client, skip NumPy
+    from money_manager.backtest import backtest, outcome_sequence, settings_grid
+    from money_manager.sweep import write_table
+
+    acct = open_account(args)
+    outcomes = outcome_sequence(acct)
+    if not len(outcomes.ret):
+        print("No steps recorded yet")
+        return
+    bases, mults = settings_grid(args.base_percent, args.multiplier)
+    try:
+        result = backtest(outcomes, bases, mults, keep_curves=bool(args.curves))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    rows = result.rows()
+    if args.out:
+        with open(args.out, "w", encoding="utf-8", newline="") as f:
+            write_table(rows, f)
+    recorded = outcomes.recorded_balance
+    print(f"{len(recorded)} recorded steps from {outcomes.starting_balance}: recorded final {recorded[-1]:.2f}")
+    print(f"{'Base %':>8} {'Mult':>6} {'Final':>12} {'P&L':>12} {'Min':>12} {'Max DD':>12} {'DD %':>7} {'Bust at':>8}")
+    for row in rows:
+        print(f"{row['base_percent'] * 100:>7.2f}% {row['multiplier']:>6.2f} {row['final_balance']:>12.2f} {row['pnl']:>+12.2f} "
+              f"{row['min_balance']:>12.2f} {row['max_drawdown']:>12.2f} {row['max_drawdown_pct'] * 100:>6.2f}% {row['bust_step'] or '-':>8}")
+    if args.curves:
+        with open(args.curves, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["step", "recorded"] + [f"{b:g}x{m:g}" for b, m in zip(bases, mults)])
+            writer.writerow([0, outcomes.starting_balance] + [f"{v:.2f}" for v in result.curves[:, 0]])
+            for i in range(len(recorded)):
+                writer.writerow([i + 1, recorded[i]] + [f"{v:.2f}" for v in result.curves[:, i + 1]])
+
+
+def cmd_export(args):
+    # Imported here so other commands skip openpyxl
+    from money_manager.export import IncrementalExport, write_workbook
+    from money_manager.stats import AccountStats
+
+    acct = open_account(args)
+    export = IncrementalExport(args.csv)
+    print(f"Appended {export.update(acct)} rows to {args.csv}")
+    if args.xlsx:
+        try:
+            rows = write_workbook(acct.to_document(), args.xlsx, figures=export.figures(), stats=AccountStats().update(acct).summary())
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Wrote {rows} rows to {args.xlsx}")
+
+
+def cmd_migrate(args):
+    try:
+        storage = migrate_json_to_sqlite(get_data_file(), force=args.force)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    doc = storage.load()
+    storage.close()
+    steps = sum(len(s["steps"]) if "steps" in s else s["step_count"] for s in doc["sessions"])
+    print(f"Migrated {len(doc['sessions'])} sessions and {steps} steps to {storage.path}")
 
-    result = "win" if args.win else "loss"
-    step = acct.record_result(bet_percent=bet_percent, bet_amount=bet_amount, pnl=pnl, result=result)
-    print(f"Recorded step {step.idx}: {result} pnl={step.pnl} balance={step.balance_after}")
+
+def run_command(acct, parser, argv):
+    """Run one CLI invocation against `acct` and return its exit status and output.
+
+    Used by `serve`: the account stays loaded between commands and is synced
+    with other writers through `Account.transaction()`.
+    """
+    out, err = io.StringIO(), io.StringIO()
+    status = 0
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            args = parser.parse_args(argv)
+            if not hasattr(args, "func"):
+                parser.print_help()
+            elif args.func in (cmd_serve, cmd_api):
+                print("Error: the daemon cannot start another daemon", file=sys.stderr)
+                status = 1
+            elif args.func is cmd_migrate:
+                # It takes the account lock itself, which the daemon's transaction would hold
+                print("Error: run migrate without --socket", file=sys.stderr)
+                status = 1
+            else:
+                args.account = acct
+                with acct.transaction():
+                    args.func(args)
+        except SystemExit as e:
+            # argparse reports usage errors and --help this way
+            status = e.code if isinstance(e.code, int) else 1
+        except (RuntimeError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            status = 1
+    return {"status": status, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+
+def cmd_serve(args):
+    path = args.socket or default_socket_path(get_data_file())
+    acct = open_account(args)
+    try:
+        server = CommandServer(path, functools.partial(run_command, acct, build_parser()))
+    except (OSError, RuntimeError) as e:
+        acct.close()
+        print(f"Error: cannot serve on {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    # Exit through the finally block on `kill` as well as Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Serving {acct.data_file} on {path} (Ctrl+C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        acct.close()
+
+
+def cmd_api(args):
+    # Imported here so other commands, and the --socket client, skip asyncio
+    from money_manager.http_api import serve
+
+    acct = open_account(args)
+    try:
+        serve(acct, host=args.host, port=args.port, ready=lambda: print(f"Serving {acct.data_file} on http://{args.host}:{args.port} (Ctrl+C to stop)", flush=True))
+    finally:
+        acct.close()
+
+
+# Path arguments the client resolves before forwarding: dest -> option (None: positional)
+_CLIENT_PATHS = {"file": None, "path_out": "--path-out", "csv": "--csv", "xlsx": "--xlsx", "out": "--out", "curves": "--curves"}
+
+
+def _parses_to(parser, argv, dest, value):
+    with contextlib.redirect_stderr(io.StringIO()):
+        try:
+            return getattr(parser.parse_args(argv), dest, None) == value
+        except SystemExit:
+            return False
+
+
+def client_argv(parser, args, argv):
+    """`argv` for the daemon, with path arguments made absolute against this process's directory.
+
+    The daemon runs in its own directory and cannot read this process's
+    stdin, so `import -` is refused, as is `--storage` (the daemon's account
+    is already open).
+    """
+    if "--storage" in argv or any(a.startswith("--storage=") for a in argv) or args.storage != "json":
+        raise ValueError("--storage cannot be used with --socket; the daemon's storage is chosen by 'serve'")
+    if args.func is cmd_import and args.file == "-":
+        raise ValueError("the daemon cannot read this process's stdin; pass the file path instead of -")
+    argv = list(argv)
+    expected = dict(vars(args))
+    for dest, option in _CLIENT_PATHS.items():
+        value = getattr(args, dest, None)
+        if not isinstance(value, str) or value == "-":
+            continue
+        absolute = os.path.abspath(value)
+        expected[dest] = absolute
+        for i, token in enumerate(argv):
+            if token == value:
+                candidate = absolute
+            elif token.startswith("--") and token.endswith("=" + value):
+                candidate = token[:-len(value)] + absolute
+            else:
+                continue
+            trial = argv[:i] + [candidate] + argv[i + 1:]
+            if _parses_to(parser, trial, dest, absolute):
+                argv = trial
+                break
+        else:
+            # Not on the command line: the default, which the daemon would resolve in its own directory
+            argv.append(f"{option}={absolute}")
+    if vars(parser.parse_args(argv)) != expected:
+        raise ValueError("could not forward the path arguments; spell out option names in full")
+    return argv
+
+
+def forward(parser, args, argv):
+    """Client mode: run the command on the daemon listening on `args.socket`."""
+    try:
+        argv = client_argv(parser, args, argv)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+    try:
+        reply = send(args.socket, argv)
+    except OSError as e:
+        print(f"Error: no daemon on {args.socket} ({e}); start one with 'app.py serve'", file=sys.stderr)
+        sys.exit(1)
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    if reply["status"]:
+        sys.exit(reply["status"])
 
 
 def build_parser():
     p = argparse.ArgumentParser(description="Money management app (percentage martingale)")
+    p.add_argument("--storage", choices=STORAGE_KINDS, default="json", help="Account storage backend (journal appends one record per change)")
+    p.add_argument("--socket", default=None, help="Send the command to the daemon listening on this socket (see 'serve')")
     sub = p.add_subparsers(dest="cmd")
 
     init = sub.add_parser("init")
@@ -78,11 +381,13 @@ def build_parser():
     status.set_defaults(func=cmd_status)
 
     start = sub.add_parser("start")
+    start.add_argument("--base-percent", type=float, default=0.02)
+    start.add_argument("--multiplier", type=float, default=2.0)
     start.set_defaults(func=cmd_start)
 
     nxt = sub.add_parser("next")
-    nxt.add_argument("--base-percent", type=float, default=0.02)
-    nxt.add_argument("--multiplier", type=float, default=2.0)
+    nxt.add_argument("--base-percent", type=float, default=None, help="Override the session's base percent")
+    nxt.add_argument("--multiplier", type=float, default=None, help="Override the session's multiplier")
     nxt.set_defaults(func=cmd_next)
 
     record = sub.add_parser("record")
@@ -90,20 +395,74 @@ def build_parser():
     record.add_argument("--pnl", type=float, default=None, help="Specify exact PnL for this bet (positive for win, negative for loss)")
     record.add_argument("--bet-percent", type=float, default=None, help="Bet percent used (overrides computation)")
     record.add_argument("--bet-amount", type=float, default=None, help="Bet amount used (overrides computation)")
-    record.add_argument("--base-percent", type=float, default=0.02)
-    record.add_argument("--multiplier", type=float, default=2.0)
+    record.add_argument("--base-percent", type=float, default=None, help="Override the session's base percent")
+    record.add_argument("--multiplier", type=float, default=None, help="Override the session's multiplier")
     record.set_defaults(func=cmd_record)
 
+    ladder = sub.add_parser("ladder", help="Show bets and balances through a run of consecutive losses")
+    ladder.add_argument("--depth", type=int, default=15, help="Number of consecutive losses to tabulate")
+    ladder.add_argument("--win-prob", type=float, default=None, help="Win probability per bet; adds the chance of reaching each depth")
+    ladder.add_argument("--base-percent", type=float, default=None, help="Override the session's base percent")
+    ladder.add_argument("--multiplier", type=float, default=None, help="Override the session's multiplier")
+    ladder.set_defaults(func=cmd_ladder)
+
+    imp = sub.add_parser("import", help="Record many results from a CSV or NDJSON file in one pass")
+    imp.add_argument("file", help="File of results (columns: result, pnl, bet_amount, bet_percent, timestamp); - for stdin")
+    imp.add_argument("--format", choices=IMPORT_FORMATS, default=None, help="File format (default: from the extension)")
+    imp.add_argument("--dry-run", action="store_true", help="Validate and report the balance path without saving")
+    imp.add_argument("--path-out", default=None, help="Write the balance after each result as CSV to this file (- for stdout)")
+    imp.add_argument("--chunk-size", type=int, default=10000, help="Records per storage commit (journal/sqlite; JSON storage commits once at the end)")
+    imp.add_argument("--base-percent", type=float, default=None, help="Base percent for sessions the import starts")
+    imp.add_argument("--multiplier", type=float, default=None, help="Multiplier for sessions the import starts")
+    imp.set_defaults(func=cmd_import)
+
+    stats = sub.add_parser("stats", help="Win rate, drawdown, loss streaks and session figures over the whole history")
+    stats.add_argument("--by-hour", action="store_true", help="Also break steps down by hour of day")
+    stats.add_argument("--json", action="store_true", help="Print every figure as JSON")
+    stats.set_defaults(func=cmd_stats)
+
+    bt = sub.add_parser("backtest", help="Replay the recorded wins/losses under other base percent/multiplier settings")
+    bt.add_argument("--base-percent", type=float, nargs="+", default=[0.005, 0.01, 0.02, 0.05], help="Base percent values")
+    bt.add_argument("--multiplier", type=float, nargs="+", default=[1.5, 2.0, 3.0], help="Multiplier values")
+    bt.add_argument("--out", default=None, help="Also write the results table as CSV")
+    bt.add_argument("--curves", default=None, help="Write every setting's balance after each step as CSV")
+    bt.set_defaults(func=cmd_backtest)
+
+    export = sub.add_parser("export", help="Append new steps to the CSV history export, optionally rebuilding the xlsx")
+    export.add_argument("--csv", default=str(Path.cwd() / "trading_history.csv"), help="CSV export, appended to (watermark in <csv>.state)")
+    export.add_argument("--xlsx", default=None, help="Also rebuild this Excel workbook from the account")
+    export.set_defaults(func=cmd_export)
+
+    migrate = sub.add_parser("migrate", help="Copy mm_account.json into mm_account.db for --storage sqlite")
+    migrate.add_argument("--force", action="store_true", help="Replace an existing mm_account.db")
+    migrate.set_defaults(func=cmd_migrate)
+
+    serve = sub.add_parser("serve", help="Keep the account loaded and answer commands sent with --socket")
+    serve.set_defaults(func=cmd_serve)
+
+    api = sub.add_parser("api", help="Serve the account as a local HTTP/JSON API for bots and dashboards")
+    api.add_argument("--host", default="127.0.0.1")
+    api.add_argument("--port", type=int, default=8765)
+    api.set_defaults(func=cmd_api)
+
     return p
 
 
-def main():
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
     p = build_parser()
-    args = p.parse_args()
+    args = p.parse_args(argv)
     if not hasattr(args, "func"):
         p.print_help()
         return
-    args.func(args)
+    if args.socket and args.func is not cmd_serve:
+        forward(p, args, argv)
+        return
+    try:
+        args.func(args)
+    except CorruptDataError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
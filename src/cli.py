@@ -1,10 +1,19 @@
 """Simple CLI for running the Martingale simulator."""
 import argparse
 import json
-from money_manager.martingale import MartingaleSimulator
+import sys
+from dataclasses import asdict
+from money_manager.analytic import analyze
+from money_manager.martingale import MartingaleSimulator, merge_summaries, summarize_many
+from money_manager.parallel import run_parallel
+from money_manager.sweep import sweep, write_table
 
 
-def parse_args():
+def _optional_float(value):
+    return None if value.lower() == "none" else float(value)
+
+
+def parse_args(argv=None):
     p = argparse.ArgumentParser(description="Martingale simulator CLI")
     p.add_argument("--balance", type=float, default=1000.0, help="Starting balance")
     p.add_argument("--base-bet", type=float, default=1.0, help="Base bet size")
@@ -15,11 +24,91 @@ def parse_args():
     p.add_argument("--max-bet", type=float, default=None, help="Maximum bet allowed")
     p.add_argument("--max-rounds", type=int, default=10000, help="Maximum simulation rounds")
     p.add_argument("--seed", type=int, default=None, help="Random seed for reproducibility")
-    return p.parse_args()
+    p.add_argument("--paths", type=int, default=None, help="Run this many paths in batch and print a summary")
+    p.add_argument("--workers", type=int, default=1, help="Worker processes for --paths runs")
+    p.add_argument(
+        "--history",
+        choices=("full", "none", "stream"),
+        default="full",
+        help="Per-round history: full JSON, none (summary only) or stream (NDJSON steps to stdout)",
+    )
+    p.add_argument("--analytic", action="store_true", help="Print exact ruin/target probabilities instead of simulating (needs --target-profit)")
+    p.add_argument("--cross-check", action="store_true", help="Compare the analytic figures with a --paths batch (default 20000 paths)")
+
+    sub = p.add_subparsers(dest="cmd")
+    sw = sub.add_parser("sweep", help="Evaluate a grid of parameters and write a CSV results table")
+    sw.add_argument("--balance", type=float, default=1000.0, help="Starting balance")
+    sw.add_argument("--base-bet", type=float, nargs="+", default=[1.0], help="Base bet values")
+    sw.add_argument("--multiplier", type=float, nargs="+", default=[2.0], help="Multiplier values")
+    sw.add_argument("--win-prob", type=float, nargs="+", default=[0.5], help="Win probability values")
+    sw.add_argument("--payout", type=float, nargs="+", default=[2.0], help="Payout values")
+    sw.add_argument("--target-profit", type=_optional_float, nargs="+", default=[None], help="Target profit values ('none' for no target)")
+    sw.add_argument("--max-bet", type=_optional_float, nargs="+", default=[None], help="Maximum bet values ('none' for no cap)")
+    sw.add_argument("--max-rounds", type=int, default=10000, help="Maximum simulation rounds")
+    sw.add_argument("--paths", type=int, default=10000, help="Paths per grid cell")
+    sw.add_argument("--seed", type=int, default=None, help="Random seed shared by all cells")
+    sw.add_argument("--out", default=None, help="Write the CSV table here instead of stdout")
+
+    argv = sys.argv[1:] if argv is None else argv
+    args = p.parse_args(argv)
+    if args.cmd == "sweep":
+        # sweep redefines these, so its defaults would silently replace values given before it
+        top = {o for a in p._actions for o in a.option_strings}
+        shared = [o for a in sw._actions for o in a.option_strings if o.startswith("--") and o in top and o != "--help"]
+        given = set()
+        for token in argv[:argv.index("sweep")]:
+            name = token.split("=", 1)[0]
+            if name.startswith("--") and len(name) > 2:
+                given.update(o for o in shared if o.startswith(name))
+        if given:
+            p.error(f"{', '.join(sorted(given))} must follow 'sweep', which has its own")
+    if args.cmd is None and args.workers != 1 and args.paths is None:
+        p.error("--workers requires --paths")
+    return args
+
+
+def run_sweep(args):
+    grid = {
+        "base_bet": args.base_bet,
+        "multiplier": args.multiplier,
+        "win_prob": args.win_prob,
+        "payout": args.payout,
+        "target_profit": args.target_profit,
+        "max_bet": args.max_bet,
+    }
+    rows = sweep(grid, n_paths=args.paths, starting_balance=args.balance, max_rounds=args.max_rounds, seed=args.seed)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8", newline="") as f:
+            write_table(rows, f)
+    else:
+        write_table(rows, sys.stdout)
+
+
+def simulated_figures(batch):
+    """A merged batch summary in the terms of `RuinAnalysis`, so the cross-check compares like with like.
+
+    As in `analyze`, `ruin_probability` counts bankrupt and max-bet-exceeded
+    paths; the batch's own `ruin_probability` is the bankrupt share only.
+    """
+    n = batch["n_paths"]
+    bankrupt = batch["stop_reasons"]["bankrupt"] / n
+    max_bet = batch["stop_reasons"]["max_bet_exceeded"] / n
+    return {
+        "n_paths": n,
+        "target_probability": batch["stop_reasons"]["target_profit"] / n,
+        "bankrupt_probability": bankrupt,
+        "max_bet_probability": max_bet,
+        "ruin_probability": bankrupt + max_bet,
+        "expected_rounds": batch["mean_rounds"],
+        "expected_final_balance": batch["mean_final_balance"],
+    }
 
 
 def main():
     args = parse_args()
+    if args.cmd == "sweep":
+        run_sweep(args)
+        return
     sim = MartingaleSimulator(
         starting_balance=args.balance,
         base_bet=args.base_bet,
@@ -31,7 +120,24 @@ def main():
         max_rounds=args.max_rounds,
         seed=args.seed,
     )
-    result = sim.simulate()
+    if args.analytic or args.cross_check:
+        try:
+            result = {"analytic": asdict(analyze(sim))}
+        except ValueError as e:
+            sys.exit(f"error: {e}")
+        if args.cross_check:
+            batch = merge_summaries([summarize_many(sim.simulate_many(args.paths or 20000))])
+            result["simulated"] = simulated_figures(batch)
+    elif args.paths is not None:
+        result = run_parallel(sim, args.paths, workers=args.workers, seed=args.seed)
+    elif args.history == "stream":
+        # One JSON object per line: every step, then the run summary
+        write = sys.stdout.write
+        result = sim.simulate(history="stream", on_step=lambda st: write(json.dumps(st.__dict__) + "\n"))
+        print(json.dumps(result))
+        return
+    else:
+        result = sim.simulate(history=args.history)
     print(json.dumps(result, indent=2))
 
 
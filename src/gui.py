@@ -5,21 +5,18 @@ Run with:
 
 Modern dark theme with enhanced UI/UX, status messages (no popups), and Excel export.
 """
+import dataclasses
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 import tkinter.font as tkFont
+from money_manager.export import HAS_OPENPYXL, IncrementalExport, write_workbook
+from gui_support import Debouncer, HistoryBrowser, StepTable, TaskRunner
 from money_manager.session import Account
+from money_manager.stats import AccountStats
+from money_manager.storage import CorruptDataError
 import os
 from pathlib import Path
 
-# Try to import openpyxl for Excel export
-try:
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment
-    HAS_OPENPYXL = True
-except ImportError:
-    HAS_OPENPYXL = False
-
 # Color scheme (modern dark theme)
 DARK_BG = "#1e1e1e"
 PRIMARY_COLOR = "#2ecc71"  # Green
@@ -31,11 +28,24 @@ SUCCESS_COLOR = "#27ae60"  # Darker green
 WARNING_COLOR = "#e67e22"  # Orange
 
 
+def step_row(st):
+    """Treeview values and tags for one step."""
+    # Calculate gain percentage: (pnl / bet_amount) * 100
+    gain_pct = (st.pnl / st.bet_amount * 100) if st.bet_amount > 0 else 0
+    # Status: PROFIT or LOSS with emoji
+    if st.pnl > 0:
+        status, tag = "✓ PROFIT", 'win'
+    else:
+        status, tag = "✗ LOSS", 'loss'
+    values = (st.idx, f"${st.bet_amount:.2f}", f"{st.bet_percent*100:.2f}%", f"{st.pnl:+.2f}", f"{gain_pct:+.1f}%", status, f"${st.balance_after:.2f}")
+    return values, (tag,)
+
+
 class MoneyApp(tk.Tk):
     def __init__(self, data_file=None):
         super().__init__()
         self.title("💰 Money Manager - Martingale Trading")
-        self.geometry("950x800")
+        self.geometry("950x950")
         self.configure(bg=DARK_BG)
         self.resizable(True, True)
 
@@ -50,7 +60,18 @@ class MoneyApp(tk.Tk):
         style.configure('Treeview.Heading', background=HEADER_BG, foreground=TEXT_COLOR)
 
         self.account = Account(data_file=data_file)
-        self.excel_file = os.path.join(os.path.dirname(data_file) if data_file else os.getcwd(), "trading_history.xlsx")
+        export_dir = os.path.dirname(data_file) if data_file else os.getcwd()
+        self.excel_file = os.path.join(export_dir, "trading_history.xlsx")
+        # Per-trade exports append to a CSV; the workbook is rebuilt on demand
+        self.csv_export = IncrementalExport(os.path.join(export_dir, "trading_history.csv"))
+        # Account reads and writes (and the CSV export) run on one worker thread so
+        # disk I/O never blocks Tk; the slow Excel rebuild has a worker of its own
+        self.tasks = TaskRunner(self, name="mm-account")
+        self.export_tasks = TaskRunner(self, name="mm-excel-export", poll_ms=100)
+        self._export_pending = False
+        self.export_stats = AccountStats()  # only used on the export worker
+        self._status_reset = Debouncer(self, 3000, lambda: self.status_var.set("Ready"))
+        self._bet_input_debounce = Debouncer(self, 200, self.update_profit_calc)
 
         # Main container
         main_container = tk.Frame(self, bg=DARK_BG)
@@ -143,6 +164,31 @@ class MoneyApp(tk.Tk):
         self.profit_calc_var = tk.StringVar(value="Enter bet amount and % to calculate profit")
         tk.Label(profit_frame, textvariable=self.profit_calc_var, bg=HEADER_BG, fg=SECONDARY_COLOR, font=("Segoe UI", 9)).pack(side=tk.LEFT)
 
+        # Bet ladder: bets and balances through a run of losses
+        ladder_frame = tk.Frame(main_container, bg=HEADER_BG, relief=tk.FLAT, bd=1)
+        ladder_frame.pack(fill=tk.X, pady=(0, 12))
+        ladder_row = tk.Frame(ladder_frame, bg=HEADER_BG)
+        ladder_row.pack(fill=tk.X, padx=12, pady=(8, 4))
+        tk.Label(ladder_row, text="Bet Ladder", font=("Segoe UI", 11, "bold"), bg=HEADER_BG, fg=PRIMARY_COLOR).pack(side=tk.LEFT, padx=(0, 16))
+        tk.Label(ladder_row, text="Depth:", bg=HEADER_BG, fg=TEXT_COLOR, font=("Segoe UI", 9)).pack(side=tk.LEFT)
+        self.ladder_depth_var = tk.IntVar(value=10)
+        tk.Entry(ladder_row, textvariable=self.ladder_depth_var, width=4, bg='#3c3f41', fg=TEXT_COLOR, insertbackground=TEXT_COLOR, font=("Segoe UI", 9), relief=tk.FLAT, bd=1).pack(side=tk.LEFT, padx=(4, 16))
+        tk.Label(ladder_row, text="Win prob:", bg=HEADER_BG, fg=TEXT_COLOR, font=("Segoe UI", 9)).pack(side=tk.LEFT)
+        self.win_prob_var = tk.DoubleVar(value=0.5)
+        tk.Entry(ladder_row, textvariable=self.win_prob_var, width=6, bg='#3c3f41', fg=TEXT_COLOR, insertbackground=TEXT_COLOR, font=("Segoe UI", 9), relief=tk.FLAT, bd=1).pack(side=tk.LEFT, padx=(4, 16))
+        tk.Button(ladder_row, text="📈 Show Ladder", command=self.on_ladder, bg=SECONDARY_COLOR, fg='white', font=("Segoe UI", 9, "bold"), relief=tk.FLAT, bd=0, padx=12, pady=4, cursor="hand2").pack(side=tk.LEFT, padx=(0, 8))
+        self.ladder_summary_var = tk.StringVar(value="-")
+        tk.Label(ladder_row, textvariable=self.ladder_summary_var, bg=HEADER_BG, fg=SECONDARY_COLOR, font=("Segoe UI", 9)).pack(side=tk.LEFT)
+
+        ladder_columns = ("depth", "bet_pct", "bet_amt", "balance", "reach")
+        ladder_names = {"depth": "Losses", "bet_pct": "Bet %", "bet_amt": "Bet Amount ($)", "balance": "Balance If Lost ($)", "reach": "Chance To Reach"}
+        self.ladder_tree = ttk.Treeview(ladder_frame, columns=ladder_columns, show="headings", height=5)
+        for c in ladder_columns:
+            self.ladder_tree.heading(c, text=ladder_names[c])
+            self.ladder_tree.column(c, width=60 if c == "depth" else 140)
+        self.ladder_tree.pack(fill=tk.X, padx=8, pady=(0, 8))
+        self.ladder_tree.tag_configure('bust', foreground=ACCENT_COLOR, background='#3a1a1a')
+
         # Session history
         hist_label = tk.Label(main_container, text="Current Session History", font=("Segoe UI", 11, "bold"), bg=DARK_BG, fg=PRIMARY_COLOR)
         hist_label.pack(anchor=tk.W, pady=(12, 4))
@@ -174,20 +220,56 @@ class MoneyApp(tk.Tk):
         # Configure treeview colors for wins/losses
         self.tree.tag_configure('win', foreground=PRIMARY_COLOR, background='#1a3a1a')
         self.tree.tag_configure('loss', foreground=ACCENT_COLOR, background='#3a1a1a')
+        self.step_table = StepTable(self.tree, step_row)
+        self._shown_balance = None
+        self.history_window = None
 
         # Footer
         footer_frame = tk.Frame(main_container, bg=DARK_BG)
         footer_frame.pack(fill=tk.X, pady=(0, 0))
         tk.Button(footer_frame, text="🔄 Refresh", command=self.refresh, bg=SECONDARY_COLOR, fg='white', font=("Segoe UI", 9, "bold"), relief=tk.FLAT, bd=0, padx=12, pady=4, cursor="hand2").pack(side=tk.LEFT)
+        tk.Button(footer_frame, text="📜 History", command=self.open_history, bg=SECONDARY_COLOR, fg='white', font=("Segoe UI", 9, "bold"), relief=tk.FLAT, bd=0, padx=12, pady=4, cursor="hand2").pack(side=tk.LEFT, padx=6)
         tk.Button(footer_frame, text="❌ Quit", command=self.quit, bg=ACCENT_COLOR, fg='white', font=("Segoe UI", 9, "bold"), relief=tk.FLAT, bd=0, padx=12, pady=4, cursor="hand2").pack(side=tk.RIGHT)
 
-        self.refresh()
+        self._show(self._account_view())
 
     def set_status(self, message, color=SUCCESS_COLOR):
         """Update status bar instead of showing popups"""
         self.status_var.set(message)
         self.status_label.config(fg=color)
-        self.after(3000, lambda: self.status_var.set("Ready"))  # Reset after 3 seconds
+        self._status_reset.trigger()  # Back to "Ready" 3 seconds after the last message
+
+    def _account_view(self):
+        """Balance and the current session with a copy of its step list, for drawing on the Tk thread."""
+        sess = self.account.current_session
+        return self.account.balance, (dataclasses.replace(sess, steps=list(sess.steps)) if sess is not None else None)
+
+    def run_account(self, fn, on_done=None, on_error=None):
+        """Run `fn()` on the worker inside an account transaction, then redraw.
+
+        The transaction first picks up changes other processes (CLI, scripts)
+        made to the account file. `on_done(result)` and `on_error(exc)` run on
+        the Tk thread.
+        """
+        def task():
+            with self.account.transaction():
+                return fn(), self._account_view()
+
+        def done(outcome):
+            result, view = outcome
+            self._show(view)
+            if on_done is not None:
+                on_done(result)
+
+        def failed(e):
+            if on_error is not None:
+                on_error(e)
+            else:
+                self.set_status(f"❌ Error: {e}", ACCENT_COLOR)
+            # Redraw whatever did change, without another reload that could fail the same way
+            self.tasks.submit(self._account_view, self._show)
+
+        self.tasks.submit(task, done, failed)
 
     def on_init(self):
         try:
@@ -195,35 +277,68 @@ class MoneyApp(tk.Tk):
         except Exception:
             self.set_status("❌ Invalid balance - enter a number", ACCENT_COLOR)
             return
-        self.account.init_account(val)
-        self.init_entry.delete(0, tk.END)
-        self.refresh()
-        self.export_to_excel()  # Auto-export after init
-        self.set_status(f"✓ Account initialized with balance: {val}", SUCCESS_COLOR)
+
+        def done(_):
+            self.init_entry.delete(0, tk.END)
+            self.set_status(f"✓ Account initialized with balance: {val}", SUCCESS_COLOR)
+            self.export_new_rows()  # Auto-export after init
+
+        self.run_account(lambda: self.account.init_account(val), done)
 
     def on_start_session(self):
-        try:
-            sess = self.account.start_session()
-            self.set_status(f"✓ Session started at {sess.start_balance}", SUCCESS_COLOR)
-        except Exception as e:
-            self.set_status(f"⚠ {str(e)}", WARNING_COLOR)
-        self.refresh()
+        params = dict(base_percent=self.base_percent_var.get(), multiplier=self.mult_var.get())
+        self.run_account(
+            lambda: self.account.start_session(**params),
+            lambda sess: self.set_status(f"✓ Session started at {sess.start_balance}", SUCCESS_COLOR),
+            lambda e: self.set_status(f"⚠ {str(e)}", WARNING_COLOR),
+        )
 
     def on_end_session(self):
-        self.account.force_end_session()
-        self.set_status("✓ Session ended", SUCCESS_COLOR)
-        self.refresh()
+        self.run_account(self.account.force_end_session, lambda _: self.set_status("✓ Session ended", SUCCESS_COLOR))
 
     def on_next_bet(self):
-        info = self.account.get_next_bet(base_percent=self.base_percent_var.get(), multiplier=self.mult_var.get())
-        bet_amount = info['bet_amount']
-        bet_percent = info['bet_percent']
-        # Display calculation: balance × bet% = bet amount; profit if win = +bet_amount (100%)
-        display_text = f"💰 ${bet_amount:.2f} ({bet_percent*100:.2f}%) | Win: +${bet_amount:.2f} (+100%) | Loss: -${bet_amount:.2f} (-100%)"
-        self.next_bet_var.set(display_text)
-        self.set_status(f"Next bet: ${bet_amount:.2f} at {bet_percent*100:.2f}% of ${self.account.balance:.2f}", SECONDARY_COLOR)
+        params = dict(base_percent=self.base_percent_var.get(), multiplier=self.mult_var.get())
+
+        def done(info):
+            bet_amount = info['bet_amount']
+            bet_percent = info['bet_percent']
+            # Display calculation: balance × bet% = bet amount; profit if win = +bet_amount (100%)
+            display_text = f"💰 ${bet_amount:.2f} ({bet_percent*100:.2f}%) | Win: +${bet_amount:.2f} (+100%) | Loss: -${bet_amount:.2f} (-100%)"
+            self.next_bet_var.set(display_text)
+            self.set_status(f"Next bet: ${bet_amount:.2f} at {bet_percent*100:.2f}% of ${info['balance']:.2f}", SECONDARY_COLOR)
+
+        self.run_account(lambda: dict(self.account.get_next_bet(**params), balance=self.account.balance), done)
+
+    def on_ladder(self):
+        try:
+            params = dict(depth=self.ladder_depth_var.get(), win_prob=self.win_prob_var.get(), base_percent=self.base_percent_var.get(), multiplier=self.mult_var.get())
+        except tk.TclError as e:
+            self.set_status(f"❌ Invalid ladder settings: {e}", ACCENT_COLOR)
+            return
+        self.run_account(lambda: self.account.get_ladder(**params), self._show_ladder, lambda e: self.set_status(f"❌ Invalid ladder settings: {e}", ACCENT_COLOR))
+
+    def _show_ladder(self, ladder):
+        for i in self.ladder_tree.get_children():
+            self.ladder_tree.delete(i)
+        for row in ladder.rows():
+            tag = 'bust' if ladder.bust_depth is not None and row["depth"] >= ladder.bust_depth else ''
+            self.ladder_tree.insert("", tk.END, values=(
+                row["depth"],
+                f"{row['bet_percent']*100:.2f}%",
+                f"${row['bet_amount']:.2f}",
+                f"${row['balance_after']:.2f}",
+                f"{row['reach_probability']*100:.2f}%",
+            ), tags=(tag,))
+        if ladder.bust_depth is not None:
+            self.ladder_summary_var.set(f"Affordable losses in a row: {ladder.bust_depth - 1}")
+        else:
+            self.ladder_summary_var.set(f"All {len(ladder.depth)} bets affordable")
 
     def on_bet_input_change(self, event=None):
+        """Recalculate the profit preview once typing pauses."""
+        self._bet_input_debounce.trigger()
+
+    def update_profit_calc(self):
         """Calculate profit when user enters bet amount and %"""
         try:
             bet_amount = float(self.manual_bet_entry.get()) if self.manual_bet_entry.get() else 0
@@ -244,12 +359,6 @@ class MoneyApp(tk.Tk):
             self.profit_calc_var.set("Invalid input - enter numbers only")
 
     def _record(self, win: bool):
-        if self.account.current_session is None:
-            try:
-                self.account.start_session()
-            except Exception:
-                pass
-
         # Check if manual bet input is provided
         try:
             manual_bet_amt = float(self.manual_bet_entry.get()) if self.manual_bet_entry.get() else None
@@ -257,36 +366,35 @@ class MoneyApp(tk.Tk):
         except ValueError:
             self.set_status("❌ Invalid bet amount or percentage", ACCENT_COLOR)
             return
-
-        if manual_bet_amt and manual_bet_amt > 0 and manual_bet_pct and manual_bet_pct > 0:
-            # Use manual input
-            bet_amount = manual_bet_amt
-            bet_percent = manual_bet_pct
-        else:
-            # Use auto-calculated
-            info = self.account.get_next_bet(base_percent=self.base_percent_var.get(), multiplier=self.mult_var.get())
-            bet_percent = info["bet_percent"]
-            bet_amount = info["bet_amount"]
-
-        if win:
-            pnl = float(bet_amount)
-        else:
-            pnl = -float(bet_amount)
-
-        try:
-            step = self.account.record_result(bet_percent=bet_percent, bet_amount=bet_amount, pnl=pnl, result=("win" if win else "loss"))
+        params = dict(base_percent=self.base_percent_var.get(), multiplier=self.mult_var.get())
+
+        def task():
+            if self.account.current_session is None:
+                self.account.start_session(**params)
+            if manual_bet_amt and manual_bet_amt > 0 and manual_bet_pct and manual_bet_pct > 0:
+                # Use manual input
+                bet_amount = manual_bet_amt
+                bet_percent = manual_bet_pct
+            else:
+                # Use auto-calculated
+                info = self.account.get_next_bet(**params)
+                bet_percent = info["bet_percent"]
+                bet_amount = info["bet_amount"]
+            pnl = float(bet_amount) if win else -float(bet_amount)
+            return self.account.record_result(bet_percent=bet_percent, bet_amount=bet_amount, pnl=pnl, result=("win" if win else "loss"))
+
+        def done(step):
             result_text = "WIN ✓" if win else "LOSS ✗"
             # Show detailed calculation: base balance → bet calculation → profit/loss → new balance
-            self.set_status(f"Step {step.idx}: {result_text} | Bet: ${bet_amount:.2f} ({bet_percent*100:.2f}%) | P&L: {step.pnl:+.2f} | Balance: ${step.balance_after:.2f}", SUCCESS_COLOR if win else ACCENT_COLOR)
-            self.export_to_excel()  # Auto-export after each trade
+            self.set_status(f"Step {step.idx}: {result_text} | Bet: ${step.bet_amount:.2f} ({step.bet_percent*100:.2f}%) | P&L: {step.pnl:+.2f} | Balance: ${step.balance_after:.2f}", SUCCESS_COLOR if win else ACCENT_COLOR)
+            self.export_new_rows()  # Auto-export after each trade
             # Clear manual input after recording
             self.manual_bet_entry.delete(0, tk.END)
             self.manual_bet_pct_entry.delete(0, tk.END)
+            self._bet_input_debounce.cancel()
             self.profit_calc_var.set("Enter bet amount and % to calculate profit")
-        except Exception as e:
-            self.set_status(f"❌ Error: {str(e)}", ACCENT_COLOR)
 
-        self.refresh()
+        self.run_account(task, done)
 
     def on_record_win(self):
         self._record(True)
@@ -294,122 +402,78 @@ class MoneyApp(tk.Tk):
     def on_record_loss(self):
         self._record(False)
 
+    def export_new_rows(self):
+        """Append steps recorded since the last export to the CSV history (on the worker)."""
+        self.tasks.submit(lambda: self.csv_export.update(self.account), on_error=lambda e: self.set_status(f"❌ CSV export failed: {e}", ACCENT_COLOR))
+
     def export_to_excel(self):
-        """Export all sessions to Excel file"""
+        """Rebuild the Excel workbook from all sessions on the export worker.
+
+        Calls made while an export is running are coalesced into one more
+        export once it finishes, so a burst of presses writes the file twice
+        at most.
+        """
         if not HAS_OPENPYXL:
             self.set_status("⚠ openpyxl not installed - install with: pip install openpyxl", WARNING_COLOR)
             return
-
-        try:
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Trading History"
-
-            # Headers
-            headers = ["Step", "Bet Amount ($)", "Bet %", "P&L Amount ($)", "P&L %", "Status", "New Balance ($)"]
-            ws.append(headers)
-
-            # Style headers
-            header_fill = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
-            header_font = Font(bold=True, color="ecf0f1")
-            for cell in ws[1]:
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-
-            # Add all sessions data
-            row_num = 2
-            for session in self.account.sessions:
-                for step in session.steps:
-                    gain_pct = (step.pnl / step.bet_amount * 100) if step.bet_amount > 0 else 0
-                    status = "✓ PROFIT" if step.pnl > 0 else "✗ LOSS"
-                    ws.append([
-                        step.idx,
-                        f"{step.bet_amount:.2f}",
-                        f"{step.bet_percent*100:.2f}%",
-                        f"{step.pnl:+.2f}",
-                        f"{gain_pct:+.1f}%",
-                        status,
-                        f"{step.balance_after:.2f}"
-                    ])
-                    # Color code rows: Green for profit, Red for loss
-                    if step.pnl > 0:
-                        row_fill = PatternFill(start_color="1b5e20", end_color="1b5e20", fill_type="solid")
-                        text_color = "4caf50"  # Light green text
-                    else:
-                        row_fill = PatternFill(start_color="5d1a1a", end_color="5d1a1a", fill_type="solid")
-                        text_color = "ef5350"  # Light red text
-                    for cell in ws[row_num]:
-                        cell.fill = row_fill
-                        cell.font = Font(color=text_color, bold=True)
-                        cell.alignment = Alignment(horizontal="center")
-                    row_num += 1
-
-            # Adjust column widths
-            ws.column_dimensions['A'].width = 10
-            ws.column_dimensions['B'].width = 15
-            ws.column_dimensions['C'].width = 10
-            ws.column_dimensions['D'].width = 12
-            ws.column_dimensions['E'].width = 12
-            ws.column_dimensions['F'].width = 15
-
-            # Add summary sheet
-            summary_ws = wb.create_sheet("Summary")
-            summary_ws.append(["Metric", "Value"])
-            summary_ws.append(["Starting Balance", ""])
-            summary_ws.append(["Current Balance", self.account.balance])
-            summary_ws.append(["Total Profit/Loss", self.account.balance - (self.account.sessions[0].start_balance if self.account.sessions else self.account.balance)])
-            summary_ws.append(["Total Sessions", len(self.account.sessions)])
-            summary_ws.column_dimensions['A'].width = 20
-            summary_ws.column_dimensions['B'].width = 15
-
-            wb.save(self.excel_file)
-            self.set_status(f"✓ Exported to Excel: {Path(self.excel_file).name}", SUCCESS_COLOR)
-        except Exception as e:
-            self.set_status(f"❌ Excel export failed: {str(e)}", ACCENT_COLOR)
+        if self.export_tasks.busy:
+            self._export_pending = True
+            return
+        self._export_pending = False
+        progress = lambda done, total: self.export_tasks.post(self._export_progress, done, total)
+
+        def export():
+            stats = self.export_stats.update(self.account).summary()
+            return write_workbook(self.account.to_document(), self.excel_file, progress=progress, stats=stats)
+
+        self.export_tasks.submit(export, self._export_done, self._export_failed)
+
+    def _export_progress(self, done, total):
+        if done < total:
+            self.set_status(f"⏳ Exporting to Excel: {done}/{total} rows", SECONDARY_COLOR)
+
+    def _export_done(self, rows):
+        self.set_status(f"✓ Exported {rows} rows to Excel: {Path(self.excel_file).name}", SUCCESS_COLOR)
+        if self._export_pending:
+            self.export_to_excel()
+
+    def _export_failed(self, e):
+        self.set_status(f"❌ Excel export failed: {e}", ACCENT_COLOR)
+        if self._export_pending:
+            self.export_to_excel()
+
+    def open_history(self):
+        """Show the full-history browser, or bring the open one up to date."""
+        if self.history_window is not None and self.history_window.winfo_exists():
+            self.history_window.apply_filters()
+            self.history_window.lift()
+            return
+        self.history_window = HistoryBrowser(self, self.account, tasks=self.tasks, tag_colors={'win': {'foreground': PRIMARY_COLOR, 'background': '#1a3a1a'}, 'loss': {'foreground': ACCENT_COLOR, 'background': '#3a1a1a'}})
 
     def refresh(self):
-        self.balance_var.set(f"{self.account.balance:.2f}")
-        
-        # Update balance color
-        if self.account.balance > 1000:
-            self.balance_lbl.config(fg=PRIMARY_COLOR)
-        elif self.account.balance < 1000:
-            self.balance_lbl.config(fg=ACCENT_COLOR)
-        else:
-            self.balance_lbl.config(fg=PRIMARY_COLOR)
+        """Reload the account on the worker (picking up other writers) and redraw."""
+        self.run_account(lambda: None)
 
-        # Update session tree
-        for i in self.tree.get_children():
-            self.tree.delete(i)
+    def _show(self, view):
+        # Balance and table update independently; each touches widgets only on change
+        balance, session = view
+        self._refresh_balance(balance)
+        self.step_table.sync(session)
 
-        sess = self.account.current_session
-        if sess:
-            for st in sess.steps:
-                # Calculate gain percentage: (pnl / bet_amount) * 100
-                gain_pct = (st.pnl / st.bet_amount * 100) if st.bet_amount > 0 else 0
-                
-                # Status: PROFIT or LOSS with emoji
-                if st.pnl > 0:
-                    status = f"✓ PROFIT"
-                    tag = 'win'
-                else:
-                    status = f"✗ LOSS"
-                    tag = 'loss'
-                
-                self.tree.insert("", tk.END, values=(
-                    st.idx, 
-                    f"${st.bet_amount:.2f}", 
-                    f"{st.bet_percent*100:.2f}%", 
-                    f"{st.pnl:+.2f}", 
-                    f"{gain_pct:+.1f}%",
-                    status,
-                    f"${st.balance_after:.2f}"
-                ), tags=(tag,))
+    def _refresh_balance(self, balance):
+        if balance == self._shown_balance:
+            return
+        self._shown_balance = balance
+        self.balance_var.set(f"{balance:.2f}")
+        self.balance_lbl.config(fg=ACCENT_COLOR if balance < 1000 else PRIMARY_COLOR)
 
 
 def main():
-    app = MoneyApp()
+    try:
+        app = MoneyApp()
+    except CorruptDataError as e:
+        messagebox.showerror("Money Manager", str(e))
+        return
     app.mainloop()
 
 
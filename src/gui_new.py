@@ -8,7 +8,9 @@ Modern dark theme with enhanced UI/UX.
 import tkinter as tk
 from tkinter import ttk, messagebox
 import tkinter.font as tkFont
-from money_manager.session import Account
+from gui_support import HistoryBrowser, StepTable
+from money_manager.session import Account, AccountConflictError
+from money_manager.storage import CorruptDataError
 
 # Color scheme (modern dark theme)
 DARK_BG = "#1e1e1e"
@@ -19,6 +21,12 @@ TEXT_COLOR = "#ecf0f1"  # Light gray
 HEADER_BG = "#2c3e50"  # Dark blue-gray
 
 
+def step_row(st):
+    """Treeview values and tags for one step."""
+    tag = 'win' if st.result == 'win' else 'loss'
+    return (st.idx, f"{st.bet_amount:.2f}", f"{st.bet_percent*100:.2f}%", st.result, f"{st.pnl:.2f}", f"{st.balance_after:.2f}"), (tag,)
+
+
 class MoneyApp(tk.Tk):
     def __init__(self, data_file=None):
         super().__init__()
@@ -114,66 +122,97 @@ class MoneyApp(tk.Tk):
         # Configure treeview colors for wins/losses
         self.tree.tag_configure('win', foreground=PRIMARY_COLOR)
         self.tree.tag_configure('loss', foreground=ACCENT_COLOR)
+        self.step_table = StepTable(self.tree, step_row)
+        self._shown_balance = None
+        self.history_window = None
 
         # Footer
         footer_frame = tk.Frame(main_container, bg=DARK_BG)
         footer_frame.pack(fill=tk.X, pady=(0, 0))
         tk.Button(footer_frame, text="🔄 Refresh", command=self.refresh, bg=SECONDARY_COLOR, fg='white', font=("Segoe UI", 9, "bold"), relief=tk.FLAT, bd=0, padx=12, pady=4, cursor="hand2").pack(side=tk.LEFT)
+        tk.Button(footer_frame, text="📜 History", command=self.open_history, bg=SECONDARY_COLOR, fg='white', font=("Segoe UI", 9, "bold"), relief=tk.FLAT, bd=0, padx=12, pady=4, cursor="hand2").pack(side=tk.LEFT, padx=6)
+        self.status_var = tk.StringVar(value="")
+        tk.Label(footer_frame, textvariable=self.status_var, bg=DARK_BG, fg=ACCENT_COLOR, font=("Segoe UI", 9)).pack(side=tk.LEFT, padx=12)
         tk.Button(footer_frame, text="❌ Quit", command=self.quit, bg=ACCENT_COLOR, fg='white', font=("Segoe UI", 9, "bold"), relief=tk.FLAT, bd=0, padx=12, pady=4, cursor="hand2").pack(side=tk.RIGHT)
 
         self.refresh()
 
+    def _in_transaction(self, fn):
+        """Run `fn()` as one read-modify-write under the account lock.
+
+        The transaction first picks up changes other processes (CLI, scripts)
+        made to the account file, and no other writer can slip in before
+        `fn`'s own writes. Dialogs are shown after it returns, so the lock is
+        never held while one is open.
+        """
+        with self.account.transaction():
+            return fn()
+
+    def report_callback_exception(self, exc, val, tb):
+        # Another writer won a race: say so in the status bar and show its data
+        if isinstance(val, AccountConflictError):
+            self.account.reload()
+            self.refresh()
+            self.status_var.set(f"⚠ {val}")
+            return
+        super().report_callback_exception(exc, val, tb)
+
     def on_init(self):
         try:
             val = float(self.init_entry.get())
         except Exception:
             messagebox.showerror("Invalid", "Please enter a valid number for initial balance.")
             return
-        self.account.init_account(val)
+        self._in_transaction(lambda: self.account.init_account(val))
         self.init_entry.delete(0, tk.END)
         self.refresh()
         messagebox.showinfo("Success", f"Account initialized with balance: {val}")
 
     def on_start_session(self):
         try:
-            sess = self.account.start_session()
-            messagebox.showinfo("Session", f"Started session at {sess.start_balance}")
+            base_percent, multiplier = self.base_percent_var.get(), self.mult_var.get()
+            sess = self._in_transaction(lambda: self.account.start_session(base_percent=base_percent, multiplier=multiplier))
+        except AccountConflictError:
+            raise
         except Exception as e:
+            self.refresh()
             messagebox.showwarning("Start", str(e))
+            return
         self.refresh()
+        messagebox.showinfo("Session", f"Started session at {sess.start_balance}")
 
     def on_end_session(self):
-        self.account.force_end_session()
-        messagebox.showinfo("Session", "Session ended")
+        self._in_transaction(self.account.force_end_session)
         self.refresh()
+        messagebox.showinfo("Session", "Session ended")
 
     def on_next_bet(self):
-        info = self.account.get_next_bet(base_percent=self.base_percent_var.get(), multiplier=self.mult_var.get())
+        base_percent, multiplier = self.base_percent_var.get(), self.mult_var.get()
+        info = self._in_transaction(lambda: self.account.get_next_bet(base_percent=base_percent, multiplier=multiplier))
         self.next_bet_var.set(f"{info['bet_amount']:.2f} ({info['bet_percent']*100:.2f}%)")
+        self.refresh()
 
     def _record(self, win: bool):
-        if self.account.current_session is None:
-            try:
-                self.account.start_session()
-            except Exception:
-                pass
-
-        info = self.account.get_next_bet(base_percent=self.base_percent_var.get(), multiplier=self.mult_var.get())
-        bet_percent = info["bet_percent"]
-        bet_amount = info["bet_amount"]
+        base_percent, multiplier = self.base_percent_var.get(), self.mult_var.get()
 
-        if win:
-            pnl = float(bet_amount)
-        else:
-            pnl = -float(bet_amount)
+        def record():
+            if self.account.current_session is None:
+                self.account.start_session(base_percent=base_percent, multiplier=multiplier)
+            info = self.account.get_next_bet(base_percent=base_percent, multiplier=multiplier)
+            bet_amount = float(info["bet_amount"])
+            pnl = bet_amount if win else -bet_amount
+            return self.account.record_result(bet_percent=info["bet_percent"], bet_amount=info["bet_amount"], pnl=pnl, result=("win" if win else "loss"))
 
         try:
-            step = self.account.record_result(bet_percent=bet_percent, bet_amount=bet_amount, pnl=pnl, result=("win" if win else "loss"))
-            messagebox.showinfo("Recorded", f"Step {step.idx}: {step.result} pnl={step.pnl:.2f} → {step.balance_after:.2f}")
+            step = self._in_transaction(record)
+        except AccountConflictError:
+            raise
         except Exception as e:
+            self.refresh()
             messagebox.showerror("Error", str(e))
-
+            return
         self.refresh()
+        messagebox.showinfo("Recorded", f"Step {step.idx}: {step.result} pnl={step.pnl:.2f} → {step.balance_after:.2f}")
 
     def on_record_win(self):
         self._record(True)
@@ -181,30 +220,35 @@ class MoneyApp(tk.Tk):
     def on_record_loss(self):
         self._record(False)
 
+    def open_history(self):
+        """Show the full-history browser, or bring the open one up to date."""
+        if self.history_window is not None and self.history_window.winfo_exists():
+            self.history_window.apply_filters()
+            self.history_window.lift()
+            return
+        self.history_window = HistoryBrowser(self, self.account, tag_colors={'win': {'foreground': PRIMARY_COLOR}, 'loss': {'foreground': ACCENT_COLOR}})
+
     def refresh(self):
-        self.balance_var.set(f"{self.account.balance:.2f}")
-        
-        # Update balance color
-        if self.account.balance > 1000:
-            self.balance_lbl.config(fg=PRIMARY_COLOR)
-        elif self.account.balance < 1000:
-            self.balance_lbl.config(fg=ACCENT_COLOR)
-        else:
-            self.balance_lbl.config(fg=PRIMARY_COLOR)
-
-        # Update session tree
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
-        sess = self.account.current_session
-        if sess:
-            for st in sess.steps:
-                tag = 'win' if st.result == 'win' else 'loss'
-                self.tree.insert("", tk.END, values=(st.idx, f"{st.bet_amount:.2f}", f"{st.bet_percent*100:.2f}%", st.result, f"{st.pnl:.2f}", f"{st.balance_after:.2f}"), tags=(tag,))
+        self.status_var.set("")
+        # Balance and table update independently; each touches widgets only on change
+        self._refresh_balance()
+        self.step_table.sync(self.account.current_session)
+
+    def _refresh_balance(self):
+        balance = self.account.balance
+        if balance == self._shown_balance:
+            return
+        self._shown_balance = balance
+        self.balance_var.set(f"{balance:.2f}")
+        self.balance_lbl.config(fg=ACCENT_COLOR if balance < 1000 else PRIMARY_COLOR)
 
 
 def main():
-    app = MoneyApp()
+    try:
+        app = MoneyApp()
+    except CorruptDataError as e:
+        messagebox.showerror("Money Manager", str(e))
+        return
     app.mainloop()
 
 
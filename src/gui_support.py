@@ -0,0 +1,329 @@
+"""Helpers shared by the Tkinter GUIs (`gui.py`, `gui_new.py`)."""
+import queue
+import threading
+import tkinter as tk
+from datetime import datetime
+from tkinter import ttk
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from money_manager.export import HISTORY_HEADERS, history_row
+from money_manager.session import Account, Session, Step
+
+Row = Tuple[tuple, tuple]  # (values, tags) of one Treeview item
+
+
+def _reraise(exc: BaseException) -> None:
+    raise exc
+
+
+class TaskRunner:
+    """Run callables on one worker thread and hand their outcome back to the Tk thread.
+
+    `submit(fn, on_done, on_error)` queues `fn()`; tasks run one at a time in
+    submission order. Results go on a queue that the Tk thread drains with
+    `after()`, calling `on_done(result)` or `on_error(exc)` there, so
+    callbacks may touch widgets. A running task sends intermediate updates
+    (progress) with `post(callback, *args)`. Polling runs only while tasks
+    are outstanding. Without `on_error`, the exception is re-raised on the Tk
+    thread and shows up through Tk's error reporting.
+    """
+
+    def __init__(self, widget, name: str = "mm-worker", poll_ms: int = 50):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._tasks: "queue.Queue" = queue.Queue()
+        self._results: "queue.Queue" = queue.Queue()
+        self._outstanding = 0  # only touched on the Tk thread
+        self._poll_id = None
+        threading.Thread(target=self._work, name=name, daemon=True).start()
+
+    @property
+    def busy(self) -> bool:
+        return self._outstanding > 0
+
+    def submit(self, fn: Callable[[], Any], on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None) -> None:
+        self._outstanding += 1
+        self._tasks.put((fn, on_done, on_error or _reraise))
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+    def post(self, callback: Callable, *args) -> None:
+        """Worker side: run `callback(*args)` on the Tk thread."""
+        self._results.put((callback, args, False))
+
+    def _work(self) -> None:
+        while True:
+            fn, on_done, on_error = self._tasks.get()
+            try:
+                result = fn()
+            except Exception as e:
+                self._results.put((on_error, (e,), True))
+            else:
+                self._results.put((on_done, (result,), True))
+
+    def _poll(self) -> None:
+        self._poll_id = None
+        try:
+            while True:
+                try:
+                    callback, args, finished = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                if finished:
+                    self._outstanding -= 1
+                if callback is not None:
+                    callback(*args)
+        finally:
+            if self._outstanding and self._poll_id is None:
+                self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+
+class Debouncer:
+    """Call `fn(*args)` `delay_ms` after the last `trigger(*args)`; earlier pending calls are dropped."""
+
+    def __init__(self, widget, delay_ms: int, fn: Callable):
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self.fn = fn
+        self._after_id = None
+
+    def trigger(self, *args) -> None:
+        self.cancel()
+        self._after_id = self.widget.after(self.delay_ms, self._fire, *args)
+
+    def cancel(self) -> None:
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _fire(self, *args) -> None:
+        self._after_id = None
+        self.fn(*args)
+
+
+class StepTable:
+    """Keep a `ttk.Treeview` showing one session's steps, touching only rows that changed.
+
+    `row(step)` formats a step as `(values, tags)`. `sync(session)` inserts
+    steps that are not shown yet and updates rows whose step changed. When
+    the last drawn step is still in place, only the new tail is examined, so
+    recording a trade costs one insert. The table is cleared only when the
+    shown session changes.
+    """
+
+    def __init__(self, tree, row: Callable[[Step], Row]):
+        self.tree = tree
+        self.row = row
+        self.session_id: Optional[str] = None
+        self.items: Dict[int, str] = {}  # step idx -> Treeview item id
+        self._drawn: List[Step] = []  # steps as last drawn, in table order
+
+    def clear(self) -> None:
+        if self.items:
+            self.tree.delete(*self.items.values())
+        self.items.clear()
+        self._drawn = []
+
+    def sync(self, session: Optional[Session]) -> None:
+        session_id = session.id if session is not None else None
+        if session_id != self.session_id:
+            self.clear()
+            self.session_id = session_id
+        if session is None:
+            return
+        steps = session.steps
+        n = len(self._drawn)
+        # Steps are only ever appended; a reload replaces the objects, so
+        # then every row is compared (and redrawn only if its values differ)
+        start = n if n <= len(steps) and (n == 0 or steps[n - 1] is self._drawn[n - 1]) else 0
+        for pos in range(start, len(steps)):
+            step = steps[pos]
+            if pos < n:
+                if step is self._drawn[pos]:
+                    continue
+                values, tags = self.row(step)
+                if (values, tags) != self.row(self._drawn[pos]):
+                    self.tree.item(self.items[self._drawn[pos].idx], values=values, tags=tags)
+                self._drawn[pos] = step
+            else:
+                values, tags = self.row(step)
+                self.items[step.idx] = self.tree.insert("", "end", values=values, tags=tags)
+                self._drawn.append(step)
+        if len(self._drawn) > len(steps):
+            for step in self._drawn[len(steps):]:
+                self.tree.delete(self.items.pop(step.idx))
+            del self._drawn[len(steps):]
+
+
+def history_browser_row(step: Dict) -> Row:
+    """Browser row for an `Account.history()` step dict: session, time, then the export columns."""
+    values = (step["session_id"][:8], step["timestamp"][:19].replace("T", " "), *history_row(step))
+    return values, ("win" if step["pnl"] > 0 else "loss",)
+
+
+class HistoryBrowser(tk.Toplevel):
+    """Every session's steps, newest first, fetched one viewport at a time.
+
+    The table holds at most `rows` items, rewritten in place as the user
+    scrolls. The scrollbar is driven by hand from the filtered step count.
+    Filtering and paging are done by `Account.history()`, so memory and
+    redraw work stay bounded by the viewport whatever the history size.
+    With `tasks`, counts and pages are read on that `TaskRunner`'s worker,
+    and scroll events that arrive while a page loads are coalesced into one
+    more load.
+    """
+
+    RESULTS = ("all", "win", "loss")
+
+    def __init__(self, master, account: Account, rows: int = 25, tag_colors: Optional[Dict[str, Dict]] = None,
+                 tasks: Optional[TaskRunner] = None):
+        super().__init__(master)
+        self.title("📜 Trading History")
+        self.account = account
+        self.tasks = tasks
+        self.rows = rows
+        self.offset = 0
+        self.total = 0
+        self.filters: Dict[str, str] = {}
+        self._items: List[str] = []
+        self._load_pending = False
+
+        bar = ttk.Frame(self)
+        bar.pack(fill=tk.X, padx=8, pady=8)
+        self.session_var = tk.StringVar()
+        self.result_var = tk.StringVar(value="all")
+        self.since_var = tk.StringVar()
+        self.until_var = tk.StringVar()
+        for label, widget in (
+            ("Session", ttk.Entry(bar, textvariable=self.session_var, width=12)),
+            ("Result", ttk.Combobox(bar, textvariable=self.result_var, values=self.RESULTS, width=6, state="readonly")),
+            ("From", ttk.Entry(bar, textvariable=self.since_var, width=12)),
+            ("To", ttk.Entry(bar, textvariable=self.until_var, width=12)),
+        ):
+            ttk.Label(bar, text=label).pack(side=tk.LEFT, padx=(8, 2))
+            widget.pack(side=tk.LEFT)
+            widget.bind("<Return>", lambda e: self.apply_filters())
+        ttk.Button(bar, text="Apply", command=self.apply_filters).pack(side=tk.LEFT, padx=8)
+
+        table = ttk.Frame(self)
+        table.pack(fill=tk.BOTH, expand=True, padx=8)
+        columns = ("session", "time") + tuple(f"c{i}" for i in range(len(HISTORY_HEADERS)))
+        self.tree = ttk.Treeview(table, columns=columns, show="headings", height=rows, selectmode="browse")
+        for c, heading in zip(columns, ("Session", "Time", *HISTORY_HEADERS)):
+            self.tree.heading(c, text=heading)
+            self.tree.column(c, width=140 if c == "time" else 90, stretch=True)
+        for tag, options in (tag_colors or {}).items():
+            self.tree.tag_configure(tag, **options)
+        self.scroll = ttk.Scrollbar(table, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_wheel)
+        for key, delta in (("<Prior>", -rows), ("<Next>", rows), ("<Up>", -1), ("<Down>", 1)):
+            self.tree.bind(key, lambda e, d=delta: self._scroll_to(self.offset + d) or "break")
+        self.tree.bind("<Home>", lambda e: self._scroll_to(0) or "break")
+        self.tree.bind("<End>", lambda e: self._scroll_to(self.total) or "break")
+
+        self.status_var = tk.StringVar()
+        self.status_lbl = ttk.Label(self, textvariable=self.status_var)
+        self.status_lbl.pack(anchor=tk.W, padx=8, pady=(4, 8))
+        self.apply_filters()
+
+    def _parse_filters(self) -> Dict[str, str]:
+        filters = {}
+        prefix = self.session_var.get().strip()
+        if prefix:
+            ids = [s.id for s in self.account.sessions if s.id.startswith(prefix)]
+            if len(ids) != 1:
+                raise ValueError(f"No session matches '{prefix}'" if not ids else f"{len(ids)} sessions match '{prefix}'")
+            filters["session_id"] = ids[0]
+        if self.result_var.get() != "all":
+            filters["result"] = self.result_var.get()
+        for name, var in (("since", self.since_var), ("until", self.until_var)):
+            value = var.get().strip()
+            if value:
+                datetime.fromisoformat(value)  # ValueError for anything that is not an ISO date
+                filters[name] = value
+        return filters
+
+    def _fetch(self, fn: Callable[[], Any], on_done: Callable[[Any], None]) -> None:
+        if self.tasks is None:
+            on_done(fn())
+            return
+
+        def done(result):
+            if self.winfo_exists():
+                on_done(result)
+
+        def failed(e):
+            self._load_pending = False
+            if self.winfo_exists():
+                self.status_var.set(f"❌ {e}")
+
+        self.tasks.submit(fn, done, failed)
+
+    def apply_filters(self) -> None:
+        """Re-read the filter fields, recount and show the newest page."""
+        try:
+            filters = self._parse_filters()
+        except ValueError as e:
+            self.status_var.set(f"❌ {e}")
+            return
+
+        def fetch():
+            return self.account.history_count(**filters), self.account.history(0, self.rows, **filters)
+
+        def show(result):
+            self.filters = filters
+            self.total, steps = result
+            self.offset = 0
+            self._show_page(0, steps)
+
+        self._load_pending = True
+        self._fetch(fetch, show)
+
+    def _on_scrollbar(self, action: str, amount: str, unit: Optional[str] = None) -> None:
+        if action == "moveto":
+            self._scroll_to(round(float(amount) * self.total))
+        else:
+            self._scroll_to(self.offset + int(amount) * (self.rows if unit == "pages" else 1))
+
+    def _on_wheel(self, event) -> str:
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self._scroll_to(self.offset + (-3 if up else 3))
+        return "break"
+
+    def _scroll_to(self, offset: int) -> None:
+        offset = max(0, min(offset, self.total - self.rows))
+        if offset == self.offset:
+            return
+        self.offset = offset
+        if not self._load_pending:
+            self._load_page()
+
+    def _load_page(self) -> None:
+        offset, filters = self.offset, self.filters
+        self._load_pending = True
+        self._fetch(lambda: self.account.history(offset, self.rows, **filters), lambda steps: self._show_page(offset, steps))
+
+    def _show_page(self, offset: int, steps: List[Dict]) -> None:
+        self._load_pending = False
+        for pos, step in enumerate(steps):
+            values, tags = history_browser_row(step)
+            if pos < len(self._items):
+                self.tree.item(self._items[pos], values=values, tags=tags)
+            else:
+                self._items.append(self.tree.insert("", "end", values=values, tags=tags))
+        if len(self._items) > len(steps):
+            self.tree.delete(*self._items[len(steps):])
+            del self._items[len(steps):]
+        if self.total:
+            self.scroll.set(offset / self.total, (offset + len(steps)) / self.total)
+            self.status_var.set(f"Steps {offset + 1}-{offset + len(steps)} of {self.total} (newest first)")
+        else:
+            self.scroll.set(0, 1)
+            self.status_var.set("No steps match")
+        if offset != self.offset:
+            # Scrolled on while this page was loading
+            self._load_page()
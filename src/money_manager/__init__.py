@@ -1,2 +1,2 @@
 """Money manager package."""
-__all__ = ["martingale"]
+__all__ = ["analytic", "backtest", "daemon", "export", "history", "http_api", "importer", "locking", "martingale", "parallel", "session", "stats", "storage", "sweep"]
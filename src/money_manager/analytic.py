@@ -0,0 +1,144 @@
+"""Exact risk-of-ruin figures for `MartingaleSimulator` without simulating.
+
+The simulator's progression restarts at `base_bet` after every win, so a run
+is a sequence of loss streaks ("cycles") that each end in a win or in a stop.
+From a given balance the cycle outcomes are known in closed form; a Markov
+chain over balance buckets then gives the absorption probabilities and
+expected rounds. `max_rounds` is ignored (infinite horizon).
+"""
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .martingale import MartingaleSimulator
+
+# Dense solves are used when balances can move down between cycles.
+MAX_DENSE_STATES = 5000
+
+
+@dataclass
+class RuinAnalysis:
+    max_loss_streak: int
+    target_probability: float
+    bankrupt_probability: float
+    max_bet_probability: float
+    ruin_probability: float
+    expected_rounds: float
+    expected_final_balance: float
+    states: int
+    exact: bool
+
+
+def loss_ladder(base_bet: float, multiplier: float, limit: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Return bets and cumulative stakes of a loss streak until the total exceeds `limit`.
+
+    One extra rung past `limit` is included so the next bet is always known.
+    """
+    if base_bet <= 0:
+        raise ValueError("base_bet must be positive")
+    if multiplier < 1:
+        raise ValueError("multiplier must be at least 1")
+    bets = [float(base_bet)]
+    total = float(base_bet)
+    while total <= limit:
+        bets.append(bets[-1] * multiplier)
+        total += bets[-1]
+    bets.append(bets[-1] * multiplier)
+    bets = np.array(bets)
+    return bets, np.cumsum(bets)
+
+
+def max_loss_streak(balance: float, base_bet: float, multiplier: float, max_bet: Optional[float] = None) -> int:
+    """Longest run of consecutive losses that can be staked from `balance`."""
+    bets, cum = loss_ladder(base_bet, multiplier, balance)
+    depth = int(np.searchsorted(cum, balance, side="right"))
+    if max_bet is not None:
+        depth = min(depth, int(np.searchsorted(bets, max_bet, side="right")))
+    return depth
+
+
+def analyze(sim: MartingaleSimulator, bucket: Optional[float] = None) -> RuinAnalysis:
+    """Compute ruin and target probabilities, expected rounds and final balance for `sim`.
+
+    Balances are tracked on a grid of width `bucket` (default: the profit of
+    a base-bet win). The result is `exact` when every cycle's net gain is a
+    whole number of buckets, which holds for the classic doubling system.
+    """
+    if sim.target_profit is None:
+        raise ValueError("Analytic risk of ruin needs a target_profit")
+    start = sim.starting_balance
+    top = start + sim.target_profit
+    gain = sim.payout - 1.0
+    unit = float(bucket) if bucket is not None else sim.base_bet * gain
+    if unit <= 0:
+        raise ValueError("bucket must be positive (payout must exceed 1 without an explicit bucket)")
+    p = sim.win_prob
+    q = 1.0 - p
+
+    bets, cum = loss_ladder(sim.base_bet, sim.multiplier, top)
+    # Net gain of a cycle that wins at depth j: last stake's profit minus the earlier losses.
+    gains = bets * gain - (cum - bets)
+    moves = np.rint(gains / unit).astype(np.int64)
+    exact = bool(np.allclose(moves * unit, gains))
+
+    k0 = math.ceil(start / unit) - 1
+    n = k0 + math.ceil(sim.target_profit / unit)
+    balances = start + (np.arange(n) - k0) * unit
+    depth = np.searchsorted(cum, balances, side="right")
+    if sim.max_bet is not None:
+        depth = np.minimum(depth, np.searchsorted(bets, sim.max_bet, side="right"))
+    win_weights = p * q ** np.arange(len(bets))
+
+    # Per-state immediate results: [P(target), P(bankrupt), P(max_bet), rounds, final balance]
+    reward = np.zeros((n, 5))
+    transitions = []
+    for k in range(n):
+        K = int(depth[k])
+        bal = balances[k]
+        w = win_weights[:K]
+        dest = np.maximum(k + moves[:K], 0)
+        rounds_won = np.arange(1, K + 1)
+        reward[k, 3] += w @ rounds_won
+        hit = dest >= n
+        reward[k, 0] += w[hit].sum()
+        reward[k, 4] += w[hit] @ (bal + gains[:K][hit])
+        transitions.append((dest[~hit], w[~hit]))
+
+        lose_all = q ** K
+        left = bal - (cum[K - 1] if K else 0.0)
+        if K and left <= 0:
+            reason, rounds = 1, K
+        else:
+            reason, rounds = (1 if bets[K] > left else 2), K + 1
+        reward[k, reason] += lose_all
+        reward[k, 3] += lose_all * rounds
+        reward[k, 4] += lose_all * left
+
+    if all(m > 0 for m in moves[:int(depth.max(initial=0))]):
+        # Every win moves up the grid: solve by back-substitution from the top.
+        values = np.zeros((n, 5))
+        for k in range(n - 1, -1, -1):
+            dest, w = transitions[k]
+            values[k] = reward[k] + (w @ values[dest] if dest.size else 0.0)
+    else:
+        if n > MAX_DENSE_STATES:
+            raise ValueError(f"{n} balance states is too many for a dense solve; pass a larger bucket")
+        system = np.eye(n)
+        for k, (dest, w) in enumerate(transitions):
+            np.subtract.at(system[k], dest, w)
+        values = np.linalg.solve(system, reward)
+
+    v = values[k0]
+    return RuinAnalysis(
+        max_loss_streak=int(depth[k0]),
+        target_probability=float(v[0]),
+        bankrupt_probability=float(v[1]),
+        max_bet_probability=float(v[2]),
+        ruin_probability=float(v[1] + v[2]),
+        expected_rounds=float(v[3]),
+        expected_final_balance=float(v[4]),
+        states=n,
+        exact=exact,
+    )
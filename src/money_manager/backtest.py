@@ -0,0 +1,139 @@
+"""Replay an account's recorded outcomes under other percentage-Martingale settings.
+
+The progression restarts after every win and at the start of every recorded
+session, so the loss streak before each step, and with it the bet percent
+`base_percent * multiplier ** streak`, follows from the outcome sequence
+alone. Each step's balance factor is therefore known up front for every
+setting, and the balance curves of all settings are cumulative products
+computed together, `chunk_size` steps at a time.
+
+Each step keeps its recorded return per unit staked (`pnl / bet_amount`), so
+payouts other than 1:1 carry over. Stakes are not rounded to cents;
+replaying the recorded settings matches the recorded balances to within
+rounding. A setting stops (its balance freezes) at the first step whose bet
+would exceed the balance.
+"""
+import itertools
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class OutcomeSequence:
+    """The recorded steps reduced to what a replay needs."""
+    ret: np.ndarray  # pnl per unit staked
+    streak: np.ndarray  # losses in a row before the step, within its session
+    recorded_balance: np.ndarray  # balance after each step as recorded
+    starting_balance: float
+
+
+@dataclass
+class BacktestResult:
+    """One entry per setting; `curves[i]` is setting i's balance before the first and after every step."""
+    base_percent: np.ndarray
+    multiplier: np.ndarray
+    final_balance: np.ndarray
+    min_balance: np.ndarray
+    max_drawdown: np.ndarray
+    max_drawdown_pct: np.ndarray
+    bust_step: np.ndarray  # 1-based step whose bet was unaffordable, 0 if none
+    curves: Optional[np.ndarray]
+    starting_balance: float
+
+    def rows(self) -> List[Dict]:
+        return [
+            {
+                "base_percent": float(self.base_percent[i]),
+                "multiplier": float(self.multiplier[i]),
+                "final_balance": float(self.final_balance[i]),
+                "pnl": float(self.final_balance[i] - self.starting_balance),
+                "min_balance": float(self.min_balance[i]),
+                "max_drawdown": float(self.max_drawdown[i]),
+                "max_drawdown_pct": float(self.max_drawdown_pct[i]),
+                "bust_step": int(self.bust_step[i]) or None,
+            }
+            for i in range(len(self.base_percent))
+        ]
+
+
+def outcome_sequence(account) -> OutcomeSequence:
+    """Read every recorded step of `account`, oldest first."""
+    delta = account.steps_since(None, 0)
+    rows = delta["rows"]
+    n = len(rows)
+    pnl = np.fromiter((r["pnl"] for r in rows), dtype=np.float64, count=n)
+    stake = np.fromiter((r["bet_amount"] for r in rows), dtype=np.float64, count=n)
+    win = np.fromiter((r["result"] == "win" for r in rows), dtype=np.bool_, count=n)
+    new_session = np.fromiter((i == 0 or r["session_id"] != rows[i - 1]["session_id"] for i, r in enumerate(rows)), dtype=np.bool_, count=n)
+    recorded = np.fromiter((r["balance_after"] for r in rows), dtype=np.float64, count=n)
+    # A step with no stake on record counts as an even-money bet
+    ret = np.where(stake > 0, pnl / np.where(stake > 0, stake, 1.0), np.where(win, 1.0, -1.0))
+
+    # The streak restarts at a session's first step and after every win
+    idx = np.arange(n)
+    restart = new_session.copy()
+    restart[1:] |= win[:-1]
+    streak = idx - np.maximum.accumulate(np.where(restart, idx, 0)) if n else idx
+    starting_balance = delta["new_sessions"][0]["start_balance"] if delta["new_sessions"] else delta["balance"]
+    return OutcomeSequence(ret=ret, streak=streak, recorded_balance=recorded, starting_balance=float(starting_balance))
+
+
+def backtest(outcomes: OutcomeSequence, base_percent: Sequence[float], multiplier: Sequence[float],
+             keep_curves: bool = True, chunk_size: int = 4096) -> BacktestResult:
+    """Replay `outcomes` once per `(base_percent[i], multiplier[i])` pair, all settings at once."""
+    base = np.asarray(base_percent, dtype=np.float64)
+    mult = np.asarray(multiplier, dtype=np.float64)
+    if base.shape != mult.shape or base.ndim != 1:
+        raise ValueError("base_percent and multiplier must be 1-D and the same length")
+    if (base <= 0).any() or (mult <= 0).any():
+        raise ValueError("base_percent and multiplier must be positive")
+    n_settings, n_steps = len(base), len(outcomes.ret)
+    start = outcomes.starting_balance
+
+    balance = np.full(n_settings, start)
+    peak = balance.copy()
+    low = balance.copy()
+    max_dd = np.zeros(n_settings)
+    max_dd_pct = np.zeros(n_settings)
+    bust_step = np.zeros(n_settings, dtype=np.int64)
+    curves = np.empty((n_settings, n_steps + 1)) if keep_curves else None
+    if curves is not None:
+        curves[:, 0] = start
+
+    chunk_size = max(1, int(chunk_size))
+    # Long streaks overflow multiplier ** streak to inf, which just means unaffordable
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for lo in range(0, n_steps, chunk_size):
+            hi = min(lo + chunk_size, n_steps)
+            pct = base[:, None] * mult[:, None] ** outcomes.streak[None, lo:hi]
+            # Once a bet is unaffordable the setting stops for good
+            stopped = np.logical_or.accumulate(pct > 1, axis=1) | (bust_step > 0)[:, None]
+            first = stopped.argmax(axis=1)
+            newly = (bust_step == 0) & stopped.any(axis=1)
+            bust_step[newly] = lo + first[newly] + 1
+            factor = np.where(stopped, 1.0, 1.0 + np.where(stopped, 0.0, pct) * outcomes.ret[None, lo:hi])
+            path = balance[:, None] * np.cumprod(factor, axis=1)
+
+            peaks = np.maximum(peak[:, None], np.maximum.accumulate(path, axis=1))
+            drawdown = peaks - path
+            max_dd = np.maximum(max_dd, drawdown.max(axis=1))
+            max_dd_pct = np.maximum(max_dd_pct, np.where(peaks > 0, drawdown / peaks, 0.0).max(axis=1))
+            low = np.minimum(low, path.min(axis=1))
+            peak = peaks[:, -1]
+            balance = path[:, -1]
+            if curves is not None:
+                curves[:, lo + 1:hi + 1] = path
+
+    return BacktestResult(
+        base_percent=base, multiplier=mult, final_balance=balance, min_balance=low,
+        max_drawdown=max_dd, max_drawdown_pct=max_dd_pct, bust_step=bust_step, curves=curves,
+        starting_balance=start,
+    )
+
+
+def settings_grid(base_percents: Sequence[float], multipliers: Sequence[float]) -> Tuple[List[float], List[float]]:
+    """Every `(base_percent, multiplier)` combination, as the two sequences `backtest` takes."""
+    pairs = list(itertools.product(base_percents, multipliers))
+    return [b for b, _ in pairs], [m for _, m in pairs]
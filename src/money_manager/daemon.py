@@ -0,0 +1,125 @@
+"""Serve CLI commands from one long-lived process over a Unix domain socket.
+
+The protocol is one JSON object per line in each direction. A request is
+`{"argv": [...]}`, the arguments a CLI invocation would have received. The
+reply is `{"status": n, "stdout": "...", "stderr": "..."}`. A connection may
+carry several requests, answered in order. Each connection gets its own
+thread, so a long-lived client does not hold up the others, but commands
+from all connections run one at a time.
+
+This module only moves requests and replies. The caller supplies the
+handler that runs a command (see `app.py serve`).
+"""
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Callable, Dict, List, Optional
+
+Handler = Callable[[List[str]], Dict]
+
+
+def default_socket_path(data_file: str) -> str:
+    """`mm_account.json` -> `mm_account.sock` in the same directory."""
+    root, _ = os.path.splitext(data_file)
+    return root + ".sock"
+
+
+def _require_unix_sockets() -> None:
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Unix domain sockets are not available on this platform")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                argv = json.loads(line)["argv"]
+                if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+                    raise ValueError("argv must be a list of strings")
+            except (ValueError, KeyError, TypeError) as e:
+                reply = {"status": 2, "stdout": "", "stderr": f"Bad request: {e}\n"}
+            else:
+                with self.server.lock:
+                    reply = self.server.handler(argv)
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class CommandServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server that passes each request's argv to `handler`.
+
+    Connections are served on their own threads, but calls to the handler
+    are serialized by `lock`, so it never runs concurrently with itself (the
+    CLI handler redirects the process-wide stdout/stderr).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, handler: Handler):
+        _require_unix_sockets()
+        self.handler = handler
+        self.lock = threading.Lock()
+        _remove_stale_socket(path)
+        super().__init__(path, _RequestHandler)
+        os.chmod(path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Delete a socket file left by a daemon that died; refuse if one is still listening."""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)
+    else:
+        raise RuntimeError(f"A daemon is already listening on {path}")
+    finally:
+        probe.close()
+
+
+class Client:
+    """Connection to a `CommandServer`; reuse one instance for many commands."""
+
+    def __init__(self, path: str, timeout: Optional[float] = 30.0):
+        _require_unix_sockets()
+        self.path = path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self._rfile = self.sock.makefile("rb")
+
+    def call(self, argv: List[str]) -> Dict:
+        self.sock.sendall(json.dumps({"argv": list(argv)}).encode("utf-8") + b"\n")
+        line = self._rfile.readline()
+        if not line:
+            raise ConnectionError(f"Daemon on {self.path} closed the connection")
+        return json.loads(line)
+
+    def close(self) -> None:
+        self._rfile.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def send(path: str, argv: List[str]) -> Dict:
+    """Run one command on the daemon listening on `path` and return its reply."""
+    with Client(path) as client:
+        return client.call(argv)
@@ -0,0 +1,220 @@
+"""Export of the account history: xlsx (needs the optional openpyxl package) and CSV.
+
+Workbooks are written in openpyxl's write-only mode, so rows stream to disk
+instead of building a full in-memory sheet. Row colours come from a few
+shared named styles rather than per-cell style objects.
+
+An xlsx file cannot be appended to without loading it, so per-trade exports
+go to `IncrementalExport`, an append-only CSV mirror of the history sheet.
+The workbook is rebuilt from the account on demand.
+"""
+import csv
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .storage import CorruptDataError, read_json, write_json
+
+try:
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+
+HISTORY_SHEET = "Trading History"
+SUMMARY_SHEET = "Summary"
+HISTORY_HEADERS = ["Step", "Bet Amount ($)", "Bet %", "P&L Amount ($)", "P&L %", "Status", "New Balance ($)"]
+HISTORY_WIDTHS = {"A": 10, "B": 15, "C": 10, "D": 12, "E": 12, "F": 15}
+CSV_HEADERS = HISTORY_HEADERS + ["Session", "Timestamp"]
+HEADER_STYLE = "mm_header"
+PROFIT_STYLE = "mm_profit"
+LOSS_STYLE = "mm_loss"
+
+
+def _named_styles() -> List["NamedStyle"]:
+    def style(name, fill, font):
+        return NamedStyle(
+            name=name,
+            fill=PatternFill(start_color=fill, end_color=fill, fill_type="solid"),
+            font=font,
+            alignment=Alignment(horizontal="center", vertical="center"),
+        )
+
+    return [
+        style(HEADER_STYLE, "2c3e50", Font(bold=True, color="ecf0f1")),
+        style(PROFIT_STYLE, "1b5e20", Font(bold=True, color="4caf50")),  # light green on dark green
+        style(LOSS_STYLE, "5d1a1a", Font(bold=True, color="ef5350")),  # light red on dark red
+    ]
+
+
+def history_row(step: Dict) -> List:
+    """One history sheet row for a step dict, formatted as the GUI shows it."""
+    gain_pct = (step["pnl"] / step["bet_amount"] * 100) if step["bet_amount"] > 0 else 0
+    return [
+        step["idx"],
+        f"{step['bet_amount']:.2f}",
+        f"{step['bet_percent'] * 100:.2f}%",
+        f"{step['pnl']:+.2f}",
+        f"{gain_pct:+.1f}%",
+        "✓ PROFIT" if step["pnl"] > 0 else "✗ LOSS",
+        f"{step['balance_after']:.2f}",
+    ]
+
+
+def summary_figures(doc: Dict) -> Dict:
+    """The Summary sheet figures of `doc`: balance, first start balance, session count."""
+    sessions = doc["sessions"]
+    return {
+        "balance": doc["balance"],
+        "first_balance": sessions[0]["start_balance"] if sessions else None,
+        "sessions": len(sessions),
+    }
+
+
+def summary_rows(figures: Dict, stats: Optional[Dict] = None) -> List[List]:
+    """Summary sheet rows; `stats` (an `AccountStats.summary()`) adds the history metrics."""
+    first_balance = figures["first_balance"]
+    rows = [
+        ["Metric", "Value"],
+        ["Starting Balance", first_balance if first_balance is not None else ""],
+        ["Current Balance", figures["balance"]],
+        ["Total Profit/Loss", figures["balance"] - (figures["balance"] if first_balance is None else first_balance)],
+        ["Total Sessions", figures["sessions"]],
+    ]
+    if stats is not None:
+        rows += [
+            ["Win Rate (%)", round(stats["win_rate"] * 100, 2)],
+            ["Max Drawdown ($)", round(stats["max_drawdown"], 2)],
+            ["Max Drawdown (%)", round(stats["max_drawdown_pct"] * 100, 2)],
+            ["Longest Loss Streak", stats["longest_loss_streak"]],
+            ["Avg Session Length (steps)", round(stats["avg_session_length"], 2)],
+            ["Avg Session P&L ($)", round(stats["avg_session_pnl"], 2)],
+        ]
+    return rows
+
+
+def write_workbook(doc: Dict, path: str, progress: Optional[Callable[[int, int], None]] = None, progress_every: int = 5000,
+                   figures: Optional[Dict] = None, stats: Optional[Dict] = None) -> int:
+    """Write `doc` (the `Account.to_document()` layout) to `path` as xlsx.
+
+    The file is written next to `path` and renamed into place, so readers
+    never see a half-written workbook. `progress(done, total)` is called
+    every `progress_every` rows. The Summary sheet shows `figures` (e.g.
+    `IncrementalExport.figures()`), by default `summary_figures(doc)`, and
+    the metrics in `stats` (`AccountStats.summary()`) when given.
+    Returns the number of history rows.
+    """
+    if not HAS_OPENPYXL:
+        raise RuntimeError("openpyxl is not installed - install with: pip install openpyxl")
+    wb = openpyxl.Workbook(write_only=True)
+    for style in _named_styles():
+        wb.add_named_style(style)
+
+    ws = wb.create_sheet(HISTORY_SHEET)
+    # Write-only sheets take column widths only before the first row
+    for col, width in HISTORY_WIDTHS.items():
+        ws.column_dimensions[col].width = width
+
+    def styled(values, style):
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            cells.append(cell)
+        return cells
+
+    ws.append(styled(HISTORY_HEADERS, HEADER_STYLE))
+    total = sum(len(s["steps"]) for s in doc["sessions"])
+    done = 0
+    for session in doc["sessions"]:
+        for step in session["steps"]:
+            ws.append(styled(history_row(step), PROFIT_STYLE if step["pnl"] > 0 else LOSS_STYLE))
+            done += 1
+            if progress is not None and done % progress_every == 0:
+                progress(done, total)
+
+    summary_ws = wb.create_sheet(SUMMARY_SHEET)
+    summary_ws.column_dimensions["A"].width = 26
+    summary_ws.column_dimensions["B"].width = 15
+    for row in summary_rows(figures if figures is not None else summary_figures(doc), stats):
+        summary_ws.append(row)
+
+    root, ext = os.path.splitext(path)
+    tmp = f"{root}.tmp{ext}"
+    wb.save(tmp)
+    os.replace(tmp, path)
+    if progress is not None:
+        progress(done, total)
+    return done
+
+
+class IncrementalExport:
+    """Append-only CSV mirror of the history sheet, updated in O(new rows).
+
+    `<path>.state` holds the watermark (session id and step idx of the last
+    exported step), the CSV's length at that point and the running Summary
+    figures. `update()` asks the account only for steps past the watermark
+    and appends them. Bytes past the recorded length (a crash between
+    appending and saving the state) are cut off before the next append. A
+    missing or unreadable state, or a watermark the account no longer has
+    (re-initialized), rewrites the CSV from scratch.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.state_path = path + ".state"
+        self.state = self._load_state()
+
+    def _load_state(self) -> Optional[Dict]:
+        try:
+            state = read_json(self.state_path)
+            if os.path.getsize(self.path) < state["size"]:
+                return None
+        except (OSError, CorruptDataError, KeyError):
+            return None
+        return state
+
+    @property
+    def watermark(self) -> Tuple[Optional[str], int]:
+        if self.state is None:
+            return None, 0
+        return self.state["session_id"], self.state["idx"]
+
+    def figures(self) -> Optional[Dict]:
+        """Summary figures as of the last `update()`, for `summary_rows`/`write_workbook`."""
+        if self.state is None:
+            return None
+        state = self.state
+        return {"balance": state["balance"], "first_balance": state["first_balance"], "sessions": state["session_count"]}
+
+    def update(self, account) -> int:
+        """Append the steps `account` recorded since the last call; returns how many."""
+        delta = account.steps_since(*self.watermark) if self.state is not None else None
+        if delta is None:
+            delta = account.steps_since(None, 0)
+            state = {"size": 0, "rows": 0, "session_count": 0, "first_balance": None}
+            mode = "w"
+        else:
+            state = dict(self.state)
+            if os.path.getsize(self.path) > state["size"]:
+                os.truncate(self.path, state["size"])
+            mode = "a"
+        rows = delta["rows"]
+        if rows or mode == "w":
+            with open(self.path, mode, encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                if mode == "w":
+                    writer.writerow(CSV_HEADERS)
+                writer.writerows(history_row(step) + [step["session_id"], step["timestamp"]] for step in rows)
+            state["size"] = os.path.getsize(self.path)
+        new_sessions = delta["new_sessions"]
+        if state["first_balance"] is None and new_sessions:
+            state["first_balance"] = new_sessions[0]["start_balance"]
+        state["rows"] += len(rows)
+        state["session_count"] += len(new_sessions)
+        state["balance"] = delta["balance"]
+        state["session_id"], state["idx"] = delta["watermark"]
+        write_json(self.state_path, state, indent=None, fsync=False, backup=False)
+        self.state = state
+        return len(rows)
@@ -0,0 +1,125 @@
+"""Columnar, array-backed storage for simulator step history."""
+import os
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from .martingale import StepResult
+
+# Outcome strings stored as small integer codes, indexed by code.
+OUTCOMES = ("win", "loss", "bankrupt", "max_bet_exceeded")
+_OUTCOME_CODES = {name: code for code, name in enumerate(OUTCOMES)}
+_COLUMNS = (("round", np.int64), ("bet", np.float64), ("outcome", np.int8), ("balance", np.float64))
+
+
+class HistoryArrays:
+    """Per-round history held as one NumPy buffer per column.
+
+    Appends are amortized O(1) (buffers double when full) and cost about 25
+    bytes per round. Slicing returns a view, and `StepResult` objects or dicts
+    are only built when asked for.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        capacity = max(1, int(capacity))
+        self._cols = {name: np.empty(capacity, dtype=dtype) for name, dtype in _COLUMNS}
+        self._n = 0
+
+    @classmethod
+    def from_arrays(cls, round, bet, outcome, balance) -> "HistoryArrays":
+        """Wrap existing equal-length column arrays without copying them."""
+        hist = cls.__new__(cls)
+        hist._cols = {}
+        for (name, dtype), values in zip(_COLUMNS, (round, bet, outcome, balance)):
+            hist._cols[name] = np.asarray(values, dtype=dtype)
+        lengths = {len(v) for v in hist._cols.values()}
+        if len(lengths) != 1:
+            raise ValueError("History columns must all have the same length")
+        hist._n = lengths.pop()
+        return hist
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(needed, 2 * len(self._cols["round"]))
+        for name, dtype in _COLUMNS:
+            buf = np.empty(capacity, dtype=dtype)
+            buf[:self._n] = self._cols[name][:self._n]
+            self._cols[name] = buf
+
+    def append(self, round: int, bet: float, outcome: Union[str, int], balance: float) -> None:
+        n = self._n
+        if n >= len(self._cols["round"]):
+            self._grow(n + 1)
+        self._cols["round"][n] = round
+        self._cols["bet"][n] = bet
+        self._cols["outcome"][n] = _OUTCOME_CODES[outcome] if isinstance(outcome, str) else outcome
+        self._cols["balance"][n] = balance
+        self._n = n + 1
+
+    def append_step(self, step: StepResult) -> None:
+        self.append(step.round, step.bet, step.outcome, step.balance)
+
+    @property
+    def round(self) -> np.ndarray:
+        return self._cols["round"][:self._n]
+
+    @property
+    def bet(self) -> np.ndarray:
+        return self._cols["bet"][:self._n]
+
+    @property
+    def outcome(self) -> np.ndarray:
+        """Outcome codes; see `OUTCOMES` for their names."""
+        return self._cols["outcome"][:self._n]
+
+    @property
+    def balance(self) -> np.ndarray:
+        return self._cols["balance"][:self._n]
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return HistoryArrays.from_arrays(self.round[key], self.bet[key], self.outcome[key], self.balance[key])
+        i = range(self._n)[key]
+        return StepResult(int(self._cols["round"][i]), float(self._cols["bet"][i]), OUTCOMES[self._cols["outcome"][i]], float(self._cols["balance"][i]))
+
+    def __iter__(self) -> Iterator[StepResult]:
+        for i in range(self._n):
+            yield self[i]
+
+    def to_dicts(self) -> List[Dict]:
+        """Return the history as a list of `StepResult`-shaped dicts."""
+        outcomes = [OUTCOMES[c] for c in self.outcome.tolist()]
+        return [
+            {"round": r, "bet": b, "outcome": o, "balance": bal}
+            for r, b, o, bal in zip(self.round.tolist(), self.bet.tolist(), outcomes, self.balance.tolist())
+        ]
+
+    def save(self, path: str) -> None:
+        """Save the columns without an intermediate copy.
+
+        A path ending in `.npz` writes one uncompressed archive; any other path
+        is used as a directory holding one `.npy` file per column, which `load`
+        can memory-map.
+        """
+        columns = {name: self._cols[name][:self._n] for name, _ in _COLUMNS}
+        if path.endswith(".npz"):
+            np.savez(path, **columns)
+            return
+        os.makedirs(path, exist_ok=True)
+        for name, values in columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), values)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = "r") -> "HistoryArrays":
+        """Load a history written by `save`.
+
+        Column directories are memory-mapped with `mmap_mode` (zero-copy; the
+        first append copies into fresh buffers). `.npz` columns are read once
+        and adopted as-is.
+        """
+        if path.endswith(".npz"):
+            with np.load(path) as data:
+                return cls.from_arrays(*(data[name] for name, _ in _COLUMNS))
+        return cls.from_arrays(*(np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name, _ in _COLUMNS))
@@ -0,0 +1,346 @@
+"""Local HTTP/JSON API over an `Account`, built on asyncio (stdlib only).
+
+Endpoints (JSON in, JSON out):
+
+- `GET /status`: balance and the active session, as `Account.status()`.
+- `GET /next-bet?base_percent=&multiplier=`: as `Account.get_next_bet()`.
+- `POST /record`: `{"result": "win"|"loss", "bet_percent", "bet_amount", "pnl"}`.
+  Everything except `result` is optional, with the same defaults as
+  `app.py record`.
+- `POST /session/start`: `{"base_percent", "multiplier"}`, both optional.
+- `POST /session/end`
+- `GET /history?offset=0&limit=50&session_id=&result=&since=&until=`: steps
+  newest first, optionally filtered as in `Account.history()`.
+
+One writer task applies mutations in arrival order. Each runs in a worker
+thread (saving blocks on disk I/O) inside `Account.transaction()`. Once a
+mutation is saved the writer publishes a new read-only snapshot.
+Status and next-bet requests are answered from the latest snapshot without
+queueing behind writes, after checking the account's version on disk: if
+another process wrote meanwhile, the writer reloads the account and
+publishes a fresh snapshot first. History pages are read in a thread pool.
+"""
+import asyncio
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .session import DEFAULT_BASE_PERCENT, Account, Session, bet_amount_for, number_field
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_PAGE_SIZE = 500
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Read-only view of the account as of the last applied mutation."""
+    balance: float
+    version: int  # `Account.version` the snapshot was taken at
+    session: Optional[Session]  # progression only; steps are not copied
+    status_body: bytes  # `Account.status()` pre-encoded for GET /status
+
+
+def _float_param(values: Dict, name: str, query: bool = False) -> Optional[float]:
+    """Number `name` from a JSON body, or from a `parse_qs` query with `query`; checked as in `record_many`."""
+    value = values.get(name)
+    if query and value is not None:
+        value = value[-1]
+    try:
+        return number_field(name, value)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+
+
+def _int_param(values: Dict, name: str, default: int) -> int:
+    value = values.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value[0])
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+
+
+class AccountAPI:
+    """Serve one `Account` over HTTP; see the module docstring for endpoints."""
+
+    def __init__(self, account: Account):
+        self.account = account
+        # JSON of the active session's steps, extended as steps are recorded
+        self._encoded_session: Optional[str] = None
+        self._encoded_steps: List[bytes] = []
+        self.snapshot = self._take_snapshot()
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mm-writer")
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._routes: Dict[Tuple[str, str], Callable] = {
+            ("GET", "/status"): self._status,
+            ("GET", "/next-bet"): self._next_bet,
+            ("GET", "/history"): self._history,
+            ("POST", "/record"): self._record,
+            ("POST", "/session/start"): self._start_session,
+            ("POST", "/session/end"): self._end_session,
+        }
+
+    def _take_snapshot(self) -> Snapshot:
+        acct = self.account
+        sess = acct.current_session if acct.current_session is not None and acct.current_session.active else None
+        if sess is None:
+            current = b"null"
+        else:
+            # Encode only the steps added since the last snapshot
+            if sess.id != self._encoded_session:
+                self._encoded_session, self._encoded_steps = sess.id, []
+            for st in sess.steps[len(self._encoded_steps):]:
+                self._encoded_steps.append(json.dumps(asdict(st)).encode("utf-8"))
+            head = json.dumps({"id": sess.id, "start_balance": sess.start_balance, "progress": sess.progress()}).encode("utf-8")
+            current = head[:-1] + b', "steps": [' + b", ".join(self._encoded_steps) + b"]}"
+        return Snapshot(
+            balance=acct.balance,
+            version=acct.version,
+            session=replace(sess, steps=[]) if sess is not None else None,
+            status_body=b'{"balance": ' + json.dumps(acct.balance).encode("utf-8") + b', "current_session": ' + current + b"}",
+        )
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._writer_task is not None:
+            await self._queue.join()
+            self._writer_task.cancel()
+        self._write_executor.shutdown(wait=True)
+
+    # -- writes ---------------------------------------------------------------
+
+    async def _submit(self, mutation: Callable[[], Dict]) -> Dict:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((mutation, future))
+        return await future
+
+    def _apply(self, mutation: Callable[[], Dict]) -> Tuple[Dict, Snapshot]:
+        with self.account.transaction():
+            result = mutation()
+            return result, self._take_snapshot()
+
+    async def _writer(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            mutation, future = await self._queue.get()
+            try:
+                result, snapshot = await loop.run_in_executor(self._write_executor, self._apply, mutation)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                self.snapshot = snapshot
+                if not future.cancelled():
+                    future.set_result(result)
+            finally:
+                self._queue.task_done()
+
+    async def _fresh_snapshot(self) -> Snapshot:
+        """The latest snapshot, first refreshed through the writer if another process wrote since."""
+        version = await asyncio.get_running_loop().run_in_executor(None, self.account.disk_version)
+        if version != self.snapshot.version:
+            # An empty mutation: the transaction reloads and the writer republishes
+            await self._submit(lambda: None)
+        return self.snapshot
+
+    # -- endpoints ------------------------------------------------------------
+
+    async def _status(self, query: Dict, body: Dict):
+        return (await self._fresh_snapshot()).status_body
+
+    async def _next_bet(self, query: Dict, body: Dict):
+        snap = await self._fresh_snapshot()
+        base_percent = _float_param(query, "base_percent", query=True)
+        multiplier = _float_param(query, "multiplier", query=True)
+        if snap.session is None:
+            pct = float(DEFAULT_BASE_PERCENT if base_percent is None else base_percent)
+        else:
+            pct = snap.session.next_percent(base_percent, multiplier)
+        return {"bet_percent": pct, "bet_amount": bet_amount_for(snap.balance, pct), "balance": snap.balance}
+
+    async def _history(self, query: Dict, body: Dict):
+        offset = _int_param(query, "offset", 0)
+        limit = min(max(_int_param(query, "limit", 50), 1), MAX_PAGE_SIZE)
+        session_id, result, since, until = (query.get(name, [None])[0] for name in ("session_id", "result", "since", "until"))
+        fetch = functools.partial(self.account.history, offset, limit, session_id, result=result, since=since, until=until)
+        steps = await asyncio.get_running_loop().run_in_executor(None, fetch)
+        return {"offset": offset, "limit": limit, "next_offset": offset + len(steps) if len(steps) == limit else None, "steps": steps}
+
+    async def _record(self, query: Dict, body: Dict):
+        result = body.get("result")
+        if result not in ("win", "loss"):
+            raise HTTPError(400, 'result must be "win" or "loss"')
+        bet_percent = _float_param(body, "bet_percent")
+        bet_amount = _float_param(body, "bet_amount")
+        pnl = _float_param(body, "pnl")
+
+        def mutation():
+            pct, amount = bet_percent, bet_amount
+            if pct is None or amount is None:
+                info = self.account.get_next_bet()
+                pct, amount = info["bet_percent"], info["bet_amount"]
+            # Even payout unless the caller says otherwise, as in `app.py record`
+            step_pnl = pnl if pnl is not None else (amount if result == "win" else -amount)
+            step = self.account.record_result(bet_percent=pct, bet_amount=amount, pnl=step_pnl, result=result)
+            return dict(asdict(step), balance=self.account.balance)
+
+        return await self._submit(mutation)
+
+    async def _start_session(self, query: Dict, body: Dict):
+        params = {}
+        for name in ("base_percent", "multiplier"):
+            value = _float_param(body, name)
+            if value is not None:
+                params[name] = value
+
+        def mutation():
+            sess = self.account.start_session(**params)
+            return {"id": sess.id, "start_balance": sess.start_balance, "progress": sess.progress()}
+
+        return await self._submit(mutation)
+
+    async def _end_session(self, query: Dict, body: Dict):
+        def mutation():
+            ended = self.account.current_session is not None
+            self.account.force_end_session()
+            return {"ended": ended}
+
+        return await self._submit(mutation)
+
+    # -- HTTP -----------------------------------------------------------------
+
+    async def _dispatch(self, method: str, target: str, raw_body: bytes) -> Tuple[int, object]:
+        url = urlsplit(target)
+        handler = self._routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self._routes):
+                return 405, {"error": f"{method} not allowed on {url.path}"}
+            return 404, {"error": f"No endpoint {url.path}"}
+        try:
+            body = json.loads(raw_body) if raw_body.strip() else {}
+            if not isinstance(body, dict):
+                raise HTTPError(400, "Request body must be a JSON object")
+            return 200, await handler(parse_qs(url.query), body)
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except RuntimeError as e:
+            # Account state errors: no active session, session already active, ...
+            return 409, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    @staticmethod
+    async def _readline(reader: asyncio.StreamReader) -> bytes:
+        try:
+            return await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            # StreamReader.readline reports a line over its limit as ValueError
+            raise HTTPError(413, "Request line or header too long")
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Return `(method, target, body, keep_alive)`, or None at end of stream."""
+        line = await self._readline(reader)
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = await self._readline(reader)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Bad Content-Length")
+        if length < 0:
+            raise HTTPError(400, "Bad Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        return method, target, body, keep_alive
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool) -> None:
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    self._write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+                status, payload = await self._dispatch(method, target, body)
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def serve(account: Account, host: str = "127.0.0.1", port: int = 8765, ready: Optional[Callable[[], None]] = None) -> None:
+    """Run the API until interrupted; `ready()` is called once it is listening."""
+
+    async def main():
+        api = AccountAPI(account)
+        server = await api.start(host, port)
+        if ready is not None:
+            ready()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await api.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
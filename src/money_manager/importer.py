@@ -0,0 +1,55 @@
+"""Stream trade results from CSV or NDJSON files into `Account.record_many`.
+
+Each result has a `result` ("win" or "loss") and optionally `pnl`,
+`bet_amount`, `bet_percent` and `timestamp` (ISO 8601). CSV files need a
+header row naming these columns; other columns are ignored. NDJSON files
+hold one JSON object per line. Files are read one row at a time, so size
+is not limited by memory.
+"""
+import csv
+import json
+import os
+import sys
+from typing import Dict, Iterator, Optional
+
+RESULT_FIELDS = ("result", "pnl", "bet_amount", "bet_percent", "timestamp")
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".ndjson", ".jsonl", ".json"):
+        return "ndjson"
+    raise ValueError(f"Cannot tell the format of {path!r} from its extension; pass one of {IMPORT_FORMATS}")
+
+
+def read_results(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """Yield result dicts from `path` ("-" reads standard input)."""
+    if fmt is None:
+        if path == "-":
+            raise ValueError("Pass the format explicitly when reading standard input")
+        fmt = detect_format(path)
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format {fmt!r}; expected one of {IMPORT_FORMATS}")
+    fh = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(fh)
+            if reader.fieldnames is None or "result" not in reader.fieldnames:
+                raise ValueError(f"{path}: CSV header must include a 'result' column")
+            for row in reader:
+                yield {k: row.get(k) for k in RESULT_FIELDS}
+        else:
+            for lineno, line in enumerate(fh, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}, line {lineno}: invalid JSON ({e.msg})")
+                yield row
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
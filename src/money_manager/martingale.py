@@ -1,6 +1,15 @@
-import random
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import Callable, Dict, Generator, List, Optional, Union
+
+import numpy as np
+
+
+# Stop reasons reported by `MartingaleSimulator.simulate_many`, indexed by code.
+STOP_REASONS = ("max_rounds", "bankrupt", "max_bet_exceeded", "target_profit")
+STOP_MAX_ROUNDS, STOP_BANKRUPT, STOP_MAX_BET, STOP_TARGET = range(len(STOP_REASONS))
+
+# What `MartingaleSimulator.simulate` keeps per round.
+HISTORY_MODES = ("full", "arrays", "none", "stream")
 
 
 @dataclass
@@ -21,6 +30,11 @@ class MartingaleSimulator:
     - On win: balance increases by bet*(payout-1) and `current_bet` resets to `base_bet`.
     - On loss: lose stake from balance, then `current_bet` *= multiplier.
     - Stop when target profit reached, bankrupt, max rounds reached, or a bet exceeds `max_bet`.
+
+    Each simulator owns a `numpy.random.Generator` seeded from `seed` (an int
+    or a `SeedSequence`), so simulators never share random state. `spawn()`
+    derives children with independent streams. `simulate()` draws outcomes
+    `draw_block` at a time instead of once per round.
     """
 
     def __init__(
@@ -33,7 +47,8 @@ class MartingaleSimulator:
         target_profit: Optional[float] = None,
         max_bet: Optional[float] = None,
         max_rounds: int = 10000,
-        seed: Optional[int] = None,
+        seed: Union[None, int, np.random.SeedSequence] = None,
+        draw_block: int = 4096,
     ):
         self.starting_balance = float(starting_balance)
         self.base_bet = float(base_bet)
@@ -44,61 +59,316 @@ class MartingaleSimulator:
         self.max_bet = None if max_bet is None else float(max_bet)
         self.max_rounds = int(max_rounds)
         self.seed = seed
-        if seed is not None:
-            random.seed(seed)
+        self.draw_block = max(1, int(draw_block))
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seed_sequence)
 
-    def simulate(self) -> Dict:
+    def spawn(self, n: int) -> List["MartingaleSimulator"]:
+        """Return `n` copies of this simulator with independent child random streams."""
+        return [
+            MartingaleSimulator(
+                starting_balance=self.starting_balance,
+                base_bet=self.base_bet,
+                multiplier=self.multiplier,
+                win_prob=self.win_prob,
+                payout=self.payout,
+                target_profit=self.target_profit,
+                max_bet=self.max_bet,
+                max_rounds=self.max_rounds,
+                seed=child,
+                draw_block=self.draw_block,
+            )
+            for child in self.seed_sequence.spawn(n)
+        ]
+
+    def iter_steps(self) -> Generator[StepResult, None, Dict]:
+        """Yield one `StepResult` per round as the simulation runs.
+
+        The generator's return value (`StopIteration.value`) holds the
+        `final_balance`, `rounds` and `stop_reason` of the run.
+        """
         balance = float(self.starting_balance)
         current_bet = float(self.base_bet)
         rounds = 0
-        history: List[StepResult] = []
+        stop_reason = "max_rounds"
+        draws: List[float] = []
+        pos = 0
 
         while rounds < self.max_rounds:
             rounds += 1
 
             # Check bet affordability and max_bet
             if current_bet > balance:
-                history.append(StepResult(rounds, current_bet, "bankrupt", balance))
+                stop_reason = "bankrupt"
+                yield StepResult(rounds, current_bet, stop_reason, balance)
                 break
             if self.max_bet is not None and current_bet > self.max_bet:
-                history.append(StepResult(rounds, current_bet, "max_bet_exceeded", balance))
+                stop_reason = "max_bet_exceeded"
+                yield StepResult(rounds, current_bet, stop_reason, balance)
                 break
 
             # Place the bet: subtract stake first
-            balance -= current_bet
+            stake = current_bet
+            balance -= stake
 
-            # Determine outcome
-            win = random.random() < self.win_prob
+            # Determine outcome from the pre-generated block of uniforms
+            if pos == len(draws):
+                draws = self.rng.random(min(self.draw_block, self.max_rounds - rounds + 1)).tolist()
+                pos = 0
+            win = draws[pos] < self.win_prob
+            pos += 1
             if win:
-                profit = current_bet * (self.payout - 1.0)
-                balance += current_bet + profit  # receive stake + profit
+                profit = stake * (self.payout - 1.0)
+                balance += stake + profit  # receive stake + profit
                 # Note: we subtracted the stake already; adding stake+profit yields net profit added
                 outcome = "win"
                 current_bet = float(self.base_bet)
             else:
                 # lost stake already removed
                 outcome = "loss"
-                current_bet = current_bet * self.multiplier
+                current_bet = stake * self.multiplier
 
-            history.append(StepResult(rounds, float(current_bet if outcome == "win" else current_bet / (self.multiplier if outcome=="loss" else 1)), outcome, balance))
+            yield StepResult(rounds, stake, outcome, balance)
 
             # Check target profit
             if self.target_profit is not None:
                 if balance - self.starting_balance >= self.target_profit:
+                    stop_reason = "target_profit"
                     break
 
             # If balance is zero or negative, stop
             if balance <= 0:
+                stop_reason = "bankrupt"
                 break
 
+        return {"final_balance": balance, "rounds": rounds, "stop_reason": stop_reason}
+
+    def simulate(self, history: str = "full", on_step: Optional[Callable[[StepResult], None]] = None) -> Dict:
+        """Run one simulation.
+
+        `history` selects what is kept per round:
+        - "full": return every step as a dict under "history" (default).
+        - "arrays": return a columnar `HistoryArrays` under "history".
+        - "none": keep only running aggregates; memory is constant.
+        - "stream": pass each `StepResult` to `on_step` as it happens, keep nothing.
+
+        Every mode returns the aggregates (wins, losses, longest loss streak,
+        largest bet, min/max balance) alongside the final balance and rounds.
+        """
+        if history not in HISTORY_MODES:
+            raise ValueError(f"history must be one of {', '.join(HISTORY_MODES)}")
+        if history == "stream" and on_step is None:
+            raise ValueError("history='stream' requires an on_step callback")
+
+        from .history import HistoryArrays
+
+        steps = HistoryArrays() if history in ("full", "arrays") else None
+        wins = losses = streak = longest_streak = 0
+        largest_bet = 0.0
+        min_balance = max_balance = float(self.starting_balance)
+
+        gen = self.iter_steps()
+        while True:
+            try:
+                step = next(gen)
+            except StopIteration as stop:
+                end = stop.value
+                break
+            if step.outcome == "win":
+                wins += 1
+                streak = 0
+            elif step.outcome == "loss":
+                losses += 1
+                streak += 1
+                longest_streak = max(longest_streak, streak)
+            if step.outcome in ("win", "loss"):
+                largest_bet = max(largest_bet, step.bet)
+                min_balance = min(min_balance, step.balance)
+                max_balance = max(max_balance, step.balance)
+            if steps is not None:
+                steps.append_step(step)
+            elif history == "stream":
+                on_step(step)
+
+        result = {
+            "starting_balance": self.starting_balance,
+            "final_balance": end["final_balance"],
+            "rounds": end["rounds"],
+            "stop_reason": end["stop_reason"],
+            "wins": wins,
+            "losses": losses,
+            "longest_loss_streak": longest_streak,
+            "largest_bet": largest_bet,
+            "min_balance": min_balance,
+            "max_balance": max_balance,
+        }
+        if history == "full":
+            result["history"] = steps.to_dicts()
+        elif history == "arrays":
+            result["history"] = steps
+        return result
+
+    def simulate_many(self, n_paths: int, rng: Optional[np.random.Generator] = None) -> Dict:
+        """Run `n_paths` independent simulations at once as NumPy arrays.
+
+        Applies the same rules and stop conditions as `simulate()`, advancing
+        every live path one round per iteration. Each round draws one uniform
+        per path (live or not), so path `i` sees the same outcome sequence for
+        a given seed regardless of the other parameters. Uses the simulator's
+        own generator unless `rng` is given.
+
+        Returns per-path `final_balance`, `rounds` and `stop_reason` arrays;
+        `stop_reason` holds integer codes indexing `STOP_REASONS`.
+        """
+        n_paths = int(n_paths)
+        if rng is None:
+            rng = self.rng
+        result = simulate_batch(
+            starting_balance=self.starting_balance,
+            base_bet=[self.base_bet],
+            multiplier=[self.multiplier],
+            win_prob=[self.win_prob],
+            payout=[self.payout],
+            target_profit=[self.target_profit],
+            max_bet=[self.max_bet],
+            max_rounds=self.max_rounds,
+            n_paths=n_paths,
+            rng=rng,
+        )
         return {
             "starting_balance": self.starting_balance,
-            "final_balance": balance,
-            "rounds": rounds,
-            "history": [r.__dict__ for r in history],
+            "n_paths": n_paths,
+            "final_balance": result["final_balance"][0],
+            "rounds": result["rounds"][0],
+            "stop_reason": result["stop_reason"][0],
         }
 
 
+def _param_array(values, n_cells: int) -> np.ndarray:
+    # None (no limit) becomes +inf so comparisons never trigger.
+    arr = np.array([np.inf if v is None else float(v) for v in values], dtype=float)
+    return np.broadcast_to(arr, (n_cells,)) if arr.size == 1 else arr
+
+
+def simulate_batch(
+    starting_balance: float,
+    base_bet,
+    multiplier,
+    win_prob,
+    payout,
+    target_profit,
+    max_bet,
+    max_rounds: int,
+    n_paths: int,
+    rng: np.random.Generator,
+) -> Dict:
+    """Simulate `n_paths` paths for each of several parameter cells at once.
+
+    Each parameter is a sequence with one value per cell (or a single value
+    shared by all cells); `None` for `target_profit`/`max_bet` means no limit.
+    Every round draws one uniform per path and the same draw is used by that
+    path in every cell, so cells are compared on common random numbers.
+
+    Returns `final_balance`, `rounds` and `stop_reason` arrays shaped
+    `(n_cells, n_paths)`.
+    """
+    n_cells = max(len(v) for v in (base_bet, multiplier, win_prob, payout, target_profit, max_bet))
+    n_paths = int(n_paths)
+    start = float(starting_balance)
+    base_bet = _param_array(base_bet, n_cells)
+    multiplier = _param_array(multiplier, n_cells)
+    win_prob = _param_array(win_prob, n_cells)
+    gain = _param_array(payout, n_cells) - 1.0
+    target_profit = _param_array(target_profit, n_cells)
+    max_bet = _param_array(max_bet, n_cells)
+
+    size = n_cells * n_paths
+    cell = np.repeat(np.arange(n_cells), n_paths)
+    path = np.tile(np.arange(n_paths), n_cells)
+    balance = np.full(size, start)
+    current_bet = base_bet[cell].copy()
+    rounds = np.zeros(size, dtype=np.int64)
+    stop_reason = np.full(size, STOP_MAX_ROUNDS, dtype=np.int8)
+    alive = np.ones(size, dtype=bool)
+
+    for rnd in range(1, int(max_rounds) + 1):
+        idx = np.flatnonzero(alive)
+        if idx.size == 0:
+            break
+        draws = rng.random(n_paths)[path[idx]]
+        c = cell[idx]
+        rounds[idx] = rnd
+        bal = balance[idx]
+        bet = current_bet[idx]
+
+        # Check bet affordability and max_bet before placing
+        bankrupt = bet > bal
+        capped = ~bankrupt & (bet > max_bet[c])
+        stopped = bankrupt | capped
+        stop_reason[idx[bankrupt]] = STOP_BANKRUPT
+        stop_reason[idx[capped]] = STOP_MAX_BET
+
+        # Place the bet on every path that is still playing
+        play = ~stopped
+        win = play & (draws < win_prob[c])
+        loss = play & ~win
+        bal = np.where(play, bal - bet, bal)
+        bal = np.where(win, bal + (bet + bet * gain[c]), bal)
+        balance[idx] = bal
+        current_bet[idx] = np.where(win, base_bet[c], np.where(loss, bet * multiplier[c], bet))
+
+        hit = play & (bal - start >= target_profit[c])
+        stop_reason[idx[hit]] = STOP_TARGET
+        busted = play & ~hit & (bal <= 0)
+        stop_reason[idx[busted]] = STOP_BANKRUPT
+        alive[idx[stopped | hit | busted]] = False
+
+    shape = (n_cells, n_paths)
+    return {
+        "final_balance": balance.reshape(shape),
+        "rounds": rounds.reshape(shape),
+        "stop_reason": stop_reason.reshape(shape),
+    }
+
+
+def summarize_many(result: Dict) -> Dict:
+    """Reduce a `simulate_many` result to mergeable per-batch totals."""
+    final = result["final_balance"]
+    counts = np.bincount(result["stop_reason"], minlength=len(STOP_REASONS))
+    return {
+        "starting_balance": result["starting_balance"],
+        "n_paths": int(final.size),
+        "total_final_balance": float(final.sum()),
+        "min_final_balance": float(final.min()) if final.size else None,
+        "max_final_balance": float(final.max()) if final.size else None,
+        "total_rounds": int(result["rounds"].sum()),
+        "max_rounds": int(result["rounds"].max()) if final.size else 0,
+        "stop_reasons": {name: int(c) for name, c in zip(STOP_REASONS, counts)},
+    }
+
+
+def merge_summaries(summaries: List[Dict]) -> Dict:
+    """Combine `summarize_many` outputs and add derived means and probabilities."""
+    n_paths = sum(s["n_paths"] for s in summaries)
+    mins = [s["min_final_balance"] for s in summaries if s["min_final_balance"] is not None]
+    maxs = [s["max_final_balance"] for s in summaries if s["max_final_balance"] is not None]
+    merged = {
+        "starting_balance": summaries[0]["starting_balance"] if summaries else None,
+        "n_paths": n_paths,
+        "total_final_balance": sum(s["total_final_balance"] for s in summaries),
+        "min_final_balance": min(mins) if mins else None,
+        "max_final_balance": max(maxs) if maxs else None,
+        "total_rounds": sum(s["total_rounds"] for s in summaries),
+        "max_rounds": max((s["max_rounds"] for s in summaries), default=0),
+        "stop_reasons": {name: sum(s["stop_reasons"][name] for s in summaries) for name in STOP_REASONS},
+    }
+    if n_paths:
+        merged["mean_final_balance"] = merged["total_final_balance"] / n_paths
+        merged["mean_rounds"] = merged["total_rounds"] / n_paths
+        merged["ruin_probability"] = merged["stop_reasons"]["bankrupt"] / n_paths
+    return merged
+
+
 def quick_simulation_example():
     sim = MartingaleSimulator(starting_balance=1000, base_bet=1, multiplier=2, win_prob=0.48, payout=2, target_profit=50, max_rounds=1000, seed=42)
     return sim.simulate()
@@ -0,0 +1,47 @@
+"""Multi-process runner for large `MartingaleSimulator` batches."""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+from .martingale import MartingaleSimulator, merge_summaries, summarize_many
+
+
+def _run_chunk(sim: MartingaleSimulator, n_paths: int, seed_seq: np.random.SeedSequence) -> Dict:
+    # Only the compact summary crosses the process boundary, never per-path data.
+    result = sim.simulate_many(n_paths, rng=np.random.default_rng(seed_seq))
+    return summarize_many(result)
+
+
+def run_parallel(
+    sim: MartingaleSimulator,
+    n_paths: int,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    chunk_size: int = 10000,
+) -> Dict:
+    """Run `n_paths` simulations of `sim` split across a process pool.
+
+    The run is cut into chunks of `chunk_size` paths, each with its own child
+    of `SeedSequence(seed)` (or of the simulator's own seed sequence when
+    `seed` is None), so results for a given master `seed` are
+    reproducible whatever the number of `workers`. With `workers=1` the
+    chunks run in the calling process.
+    """
+    n_paths = int(n_paths)
+    chunk_size = max(1, int(chunk_size))
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    root = np.random.SeedSequence(seed) if seed is not None else sim.seed_sequence
+    seeds = root.spawn(len(sizes))
+
+    if workers == 1 or len(sizes) <= 1:
+        summaries = [_run_chunk(sim, n, ss) for n, ss in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            summaries = list(pool.map(_run_chunk, [sim] * len(sizes), sizes, seeds))
+
+    merged = merge_summaries(summaries)
+    merged["chunks"] = len(sizes)
+    return merged
@@ -1,9 +1,26 @@
-import json
+import functools
+import itertools
+import math
 import os
+import threading
 import uuid
-from dataclasses import dataclass, asdict
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Dict, Tuple, Union
+
+from .locking import FileLock
+from .storage import PROGRESS_FIELDS, Storage, WriteBehindStorage, make_storage
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_BASE_PERCENT = 0.02
+DEFAULT_MULTIPLIER = 2.0
+
+
+class AccountConflictError(RuntimeError):
+    """Another process changed the account since this `Account` loaded it."""
 
 
 @dataclass
@@ -24,93 +41,454 @@ class Session:
     active: bool
     steps: List[Step]
     created_at: str
+    # Martingale progression after the last step, kept so the next bet needs no step scan
+    base_percent: float = DEFAULT_BASE_PERCENT
+    multiplier: float = DEFAULT_MULTIPLIER
+    loss_streak: int = 0
+    last_percent: Optional[float] = None
+    session_loss: float = 0.0
+
+    @classmethod
+    def lazy(cls, id: str, start_balance: float, active: bool, created_at: str, loader: Callable[[], List[Step]], step_count: int, end_balance: float, raw_steps: Optional[List[Dict]] = None, **progress) -> "Session":
+        """Build a session whose steps are fetched by `loader()` on first access of `.steps`.
+
+        `step_count` and `end_balance` are served from the index until then.
+        `raw_steps`, when the backend already has them as dicts, lets the
+        session be saved again without building `Step` objects.
+        """
+        sess = cls(id=id, start_balance=start_balance, active=active, steps=None, created_at=created_at, **progress)
+        sess.__dict__.update(_loader=loader, _index=(step_count, end_balance), _raw_steps=raw_steps)
+        return sess
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__.get("_steps") is not None
+
+    @property
+    def step_count(self) -> int:
+        return len(self.steps) if self.loaded else self.__dict__["_index"][0]
+
+    @property
+    def end_balance(self) -> float:
+        if self.loaded:
+            return self.steps[-1].balance_after if self.steps else self.start_balance
+        return self.__dict__["_index"][1]
+
+    def step_dicts(self, start: int = 0) -> List[Dict]:
+        """Steps from position `start` on as dicts, without loading them if the backend's dicts are at hand."""
+        if not self.loaded and self.__dict__.get("_raw_steps") is not None:
+            raw = self.__dict__["_raw_steps"]
+            return raw[start:] if start else raw
+        return [dict(vars(step)) for step in self.steps[start:]]
+
+    def _step_views(self) -> List[Dict]:
+        """Steps as dicts for reading only (not copies); an unloaded session stays unloaded."""
+        if self.loaded:
+            return [vars(step) for step in self.steps]
+        raw = self.__dict__.get("_raw_steps")
+        if raw is not None:
+            return raw
+        return [vars(step) for step in self.__dict__["_loader"]()]
+
+    def progress(self) -> Dict:
+        """The progression state as stored with the session (see `PROGRESS_FIELDS`)."""
+        return {f: getattr(self, f) for f in PROGRESS_FIELDS}
+
+    def next_percent(self, base_percent: Optional[float] = None, multiplier: Optional[float] = None) -> float:
+        """Percentage of balance for the next bet; arguments override the session's parameters."""
+        if self.loss_streak == 0 or self.last_percent is None:
+            return float(self.base_percent if base_percent is None else base_percent)
+        return float(self.last_percent) * float(self.multiplier if multiplier is None else multiplier)
+
+    def advance(self, step: Step) -> None:
+        """Fold one recorded step into the progression state."""
+        if step.result == "win":
+            self.loss_streak = 0
+            self.last_percent = None
+        else:
+            self.loss_streak += 1
+            self.last_percent = step.bet_percent
+        self.session_loss = round(self.session_loss - step.pnl, 2)
+
+
+def bet_amount_for(balance: float, pct: float) -> float:
+    """Stake for betting `pct` of `balance`: rounded to cents, at least 0.01."""
+    return max(round(balance * pct, 2), 0.01)
+
+
+def progress_from_steps(steps: List[Dict], base_percent: float = DEFAULT_BASE_PERCENT, multiplier: float = DEFAULT_MULTIPLIER) -> Dict:
+    """Rebuild progression state for sessions saved before it was stored."""
+    streak = 0
+    for st in reversed(steps):
+        if st["result"] == "win":
+            break
+        streak += 1
+    return {
+        "base_percent": base_percent,
+        "multiplier": multiplier,
+        "loss_streak": streak,
+        "last_percent": steps[-1]["bet_percent"] if streak else None,
+        "session_loss": round(-sum(st["pnl"] for st in steps), 2),
+    }
+
+
+def _get_session_steps(self: Session) -> List[Step]:
+    steps = self.__dict__.get("_steps")
+    if steps is None:
+        loader = self.__dict__.pop("_loader", None)
+        steps = loader() if loader is not None else []
+        self.__dict__["_steps"] = steps
+        self.__dict__.pop("_raw_steps", None)
+    return steps
+
+
+def _set_session_steps(self: Session, steps: Optional[List[Step]]) -> None:
+    self.__dict__["_steps"] = steps
+
+
+# Installed after @dataclass so the generated __init__ assigns through the setter.
+Session.steps = property(_get_session_steps, _set_session_steps, doc="Session steps, loaded on first access for lazy sessions.")
+
+
+@dataclass
+class BetLadder:
+    """Bets and balances through a run of consecutive losses; entry k-1 is the k-th bet in a row."""
+    depth: "np.ndarray"
+    bet_percent: "np.ndarray"
+    bet_amount: "np.ndarray"
+    balance_before: "np.ndarray"
+    balance_after: "np.ndarray"  # balance if that bet loses too
+    reach_probability: Optional["np.ndarray"]  # chance of getting to place that bet; None without win_prob
+    bust_depth: Optional[int]  # first bet that needs the whole balance or more; None if beyond the table
+
+    def rows(self) -> List[Dict]:
+        """The ladder as one dict per depth, amounts rounded to cents."""
+        out = []
+        for i in range(len(self.depth)):
+            out.append({
+                "depth": int(self.depth[i]),
+                "bet_percent": float(self.bet_percent[i]),
+                "bet_amount": round(float(self.bet_amount[i]), 2),
+                "balance_before": round(float(self.balance_before[i]), 2),
+                "balance_after": round(float(self.balance_after[i]), 2),
+                "reach_probability": None if self.reach_probability is None else float(self.reach_probability[i]),
+            })
+        return out
+
+
+def bet_ladder(balance: float, base_percent: float = DEFAULT_BASE_PERCENT, multiplier: float = DEFAULT_MULTIPLIER, depth: int = 20, win_prob: Optional[float] = None) -> BetLadder:
+    """Tabulate a session's first `depth` bets assuming every one of them loses.
+
+    Computed in one pass with cumulative products, so amounts match
+    `get_next_bet`/`record_result` up to their rounding to cents. With
+    `win_prob`, `reach_probability[k-1]` is (1 - win_prob) ** (k - 1).
+    """
+    # Imported here so the CLI's client and daemon paths don't pay for NumPy
+    import numpy as np
+
+    if depth < 1:
+        raise ValueError("depth must be at least 1")
+    growth = np.full(depth, float(multiplier))
+    growth[0] = 1.0
+    pct = float(base_percent) * np.cumprod(growth)
+    balance_after = float(balance) * np.cumprod(np.clip(1.0 - pct, 0.0, None))
+    balance_before = np.concatenate(([float(balance)], balance_after[:-1]))
+    busted = np.flatnonzero(pct >= 1.0)
+    reach = None
+    if win_prob is not None:
+        if not 0.0 <= win_prob <= 1.0:
+            raise ValueError("win_prob must be between 0 and 1")
+        odds = np.full(depth, 1.0 - float(win_prob))
+        odds[0] = 1.0
+        reach = np.cumprod(odds)
+    return BetLadder(
+        depth=np.arange(1, depth + 1),
+        bet_percent=pct,
+        bet_amount=balance_before * pct,
+        balance_before=balance_before,
+        balance_after=balance_after,
+        reach_probability=reach,
+        bust_depth=int(busted[0]) + 1 if busted.size else None,
+    )
+
+
+def number_field(name: str, value) -> Optional[float]:
+    """`value` as a float for field `name` (None when blank); raise ValueError if it is unusable.
+
+    Must be a scalar number; `pnl` must be finite, every other field (bet
+    amounts, percents, multipliers) positive.
+    """
+    if value is None or value == "":
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number, got {value!r}")
+    if not math.isfinite(number) or (name != "pnl" and number <= 0):
+        raise ValueError(f"{name} must be {'finite' if name == 'pnl' else 'positive'}, got {number}")
+    return number
+
+
+def _validate_result(item: Dict, n: int) -> Dict:
+    """Normalize one `record_many` item; raise ValueError naming item `n` if it is bad."""
+    if not isinstance(item, dict):
+        raise ValueError(f"result {n}: expected a mapping, got {type(item).__name__}")
+    result = str(item.get("result") or "").strip().lower()
+    if result not in ("win", "loss"):
+        raise ValueError(f"result {n}: result must be 'win' or 'loss', got {item.get('result')!r}")
+    row = {"result": result}
+    for name in ("pnl", "bet_amount", "bet_percent"):
+        try:
+            row[name] = number_field(name, item.get(name))
+        except ValueError as e:
+            raise ValueError(f"result {n}: {e}") from None
+    timestamp = item.get("timestamp") or None
+    if timestamp is not None:
+        try:
+            datetime.fromisoformat(str(timestamp))
+        except ValueError:
+            raise ValueError(f"result {n}: timestamp must be ISO 8601, got {timestamp!r}")
+        timestamp = str(timestamp)
+    row["timestamp"] = timestamp
+    return row
+
+
+def _synchronized(method):
+    """Run an `Account` method under the account's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _mutation(method):
+    """Run an `Account` mutation under the thread and file locks.
+
+    Raises `AccountConflictError` before touching any state if another
+    process has written the account since this object loaded it.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock, self._file_lock:
+            disk_version = self._file_lock.read_version()
+            if disk_version != self.version:
+                raise AccountConflictError(
+                    f"{self.data_file} was changed by another process (version {disk_version}, loaded {self.version}); reload and retry"
+                )
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class Account:
-    def __init__(self, balance: float = 0.0, data_file: Optional[str] = None):
+    def __init__(
+        self,
+        balance: float = 0.0,
+        data_file: Optional[str] = None,
+        storage: Union[str, Storage] = "json",
+        durability: str = "every_write",
+        flush_interval_ms: int = 200,
+        flush_batch_size: int = 100,
+    ):
+        """`storage` is a `Storage` instance or a backend name from `STORAGE_KINDS`.
+
+        `durability` other than "every_write" queues writes in memory (see
+        `WriteBehindStorage`); call `flush()`/`close()` or use the account as
+        a context manager to make sure they reach disk.
+
+        Processes sharing `data_file` coordinate through `<data_file>.lock`:
+        every mutation holds an exclusive lock and bumps the version stored
+        there, and an `Account` whose `version` is behind raises
+        `AccountConflictError` instead of overwriting newer data. Wrap
+        read-modify-write sequences in `transaction()` to reload first. With
+        write-behind durability the data lands after the lock is released, so
+        use it with a single writer only.
+        """
         self.balance = float(balance)
         self.data_file = data_file or os.path.join(os.getcwd(), "mm_account.json")
+        self._lock = threading.RLock()
+        self.storage = make_storage(storage, self.data_file) if isinstance(storage, str) else storage
+        if durability != "every_write":
+            self.storage = WriteBehindStorage(self.storage, durability=durability, interval_ms=flush_interval_ms,
+                                              batch_size=flush_batch_size, lock=self._lock)
         self.sessions: List[Session] = []
         self.current_session: Optional[Session] = None
+        # Sequence number of the last persisted mutation record
+        self.seq = 0
+        # Version of the on-disk data this object reflects (see `transaction`)
+        self.version = 0
+        self._file_lock = FileLock(self.data_file + ".lock")
 
-        # Try load existing
-        if os.path.exists(self.data_file):
-            try:
+        # Load existing data; a corrupt file raises CorruptDataError rather than starting fresh
+        self.reload()
+
+    def reload(self):
+        """Re-read the account and its version from disk."""
+        with self._lock, self._file_lock:
+            self.version = self._file_lock.read_version()
+            if self.storage.exists():
                 self._load()
-            except Exception:
-                # ignore and start fresh
-                pass
 
+    def disk_version(self) -> int:
+        """The version last written by any process; differs from `version` once this object is stale."""
+        with self._file_lock:
+            return self._file_lock.read_version()
+
+    @contextmanager
+    def transaction(self):
+        """Hold the cross-process lock, reloading first if another process wrote meanwhile.
+
+        Reads and mutations inside the block see and extend the latest data.
+        """
+        with self._lock, self._file_lock:
+            if self._file_lock.read_version() != self.version:
+                self.reload()
+            yield self
+
+    @_synchronized
     def _load(self):
-        with open(self.data_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = self.storage.load()
         self.balance = float(data.get("balance", self.balance))
+        self.seq = int(data.get("seq", 0))
         self.sessions = []
+        self.current_session = None
         for s in data.get("sessions", []):
-            steps = [Step(**st) for st in s.get("steps", [])]
-            sess = Session(id=s.get("id"), start_balance=s.get("start_balance"), active=s.get("active", False), steps=steps, created_at=s.get("created_at"))
-            self.sessions.append(sess)
-            if sess.active:
+            # Closed sessions keep only an index entry until their steps are accessed
+            raw = s.get("steps")
+            loader = self._step_loader(s.get("id"), raw)
+            progress = s.get("progress")
+            if s.get("active", False):
+                if progress is None:
+                    progress = progress_from_steps(raw if raw is not None else self.storage.load_steps(s.get("id")))
+                sess = Session(id=s.get("id"), start_balance=s.get("start_balance"), active=True, steps=loader(), created_at=s.get("created_at"), **progress)
                 self.current_session = sess
+            else:
+                if raw is not None:
+                    count, end = len(raw), (raw[-1]["balance_after"] if raw else s.get("start_balance"))
+                else:
+                    count, end = s.get("step_count", 0), s.get("end_balance", s.get("start_balance"))
+                sess = Session.lazy(id=s.get("id"), start_balance=s.get("start_balance"), active=False, created_at=s.get("created_at"), loader=loader, step_count=count, end_balance=end, raw_steps=raw, **(progress or {}))
+            self.sessions.append(sess)
 
-    def _save(self):
-        data = {
+    def _step_loader(self, session_id: str, raw: Optional[List[Dict]]) -> Callable[[], List[Step]]:
+        if raw is not None:
+            return lambda: [Step(**st) for st in raw]
+        return lambda: [Step(**st) for st in self.storage.load_steps(session_id)]
+
+    def _session_header(self, s: Session) -> Dict:
+        return {"id": s.id, "start_balance": s.start_balance, "active": s.active, "created_at": s.created_at, "progress": s.progress()}
+
+    @_synchronized
+    def to_document(self) -> Dict:
+        """Return the full account in the `mm_account.json` layout."""
+        return {
             "balance": self.balance,
-            "sessions": [
-                {
-                    "id": s.id,
-                    "start_balance": s.start_balance,
-                    "active": s.active,
-                    "created_at": s.created_at,
-                    "steps": [asdict(step) for step in s.steps],
-                }
-                for s in self.sessions
-            ],
+            "seq": self.seq,
+            "sessions": [dict(self._session_header(s), steps=s.step_dicts()) for s in self.sessions],
         }
-        with open(self.data_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
 
+    def _save(self):
+        self.storage.save(self.to_document())
+
+    def _persist(self, record: Dict):
+        self._persist_many([record])
+
+    def _persist_many(self, records: List[Dict]):
+        """Persist several records as one commit (and one version bump).
+
+        The version is bumped only once the write succeeded, still under the
+        lock, so readers never see a new version with old data and a failed
+        write leaves the version alone.
+        """
+        seq = self.seq
+        for record in records:
+            self.seq += 1
+            record["seq"] = self.seq
+        try:
+            self.storage.append_many(records, self.to_document)
+        except BaseException:
+            self.seq = seq
+            raise
+        self.version = self._file_lock.write_version(self.version + 1)
+
+    def flush(self):
+        """Push any queued writes to disk (no-op unless write-behind is on)."""
+        flush = getattr(self.storage, "flush", None)
+        if flush is not None:
+            flush()
+
+    def close(self):
+        self.storage.close()
+        self._file_lock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @_mutation
     def init_account(self, balance: float):
         self.balance = float(balance)
         self.sessions = []
         self.current_session = None
-        self._save()
+        self._persist({"op": "init", "balance": self.balance})
 
-    def start_session(self):
+    @_mutation
+    def start_session(self, base_percent: float = DEFAULT_BASE_PERCENT, multiplier: float = DEFAULT_MULTIPLIER):
+        """Open a session whose bets start at `base_percent` and grow by `multiplier` per loss."""
         if self.current_session is not None and self.current_session.active:
             raise RuntimeError("A session is already active")
-        sess = Session(id=str(uuid.uuid4()), start_balance=self.balance, active=True, steps=[], created_at=datetime.utcnow().isoformat())
+        sess, record = self._open_session(base_percent, multiplier)
+        self._persist(record)
+        return sess
+
+    def _open_session(self, base_percent: float, multiplier: float, created_at: Optional[str] = None):
+        """Start a session in memory; returns it with the record to persist."""
+        sess = Session(
+            id=str(uuid.uuid4()),
+            start_balance=self.balance,
+            active=True,
+            steps=[],
+            created_at=created_at or datetime.utcnow().isoformat(),
+            base_percent=float(base_percent),
+            multiplier=float(multiplier),
+        )
         self.sessions.append(sess)
         self.current_session = sess
-        self._save()
-        return sess
+        return sess, {"op": "start", "session": self._session_header(sess)}
 
-    def get_next_bet(self, base_percent: float = 0.02, multiplier: float = 2.0) -> Dict[str, float]:
+    def get_next_bet(self, base_percent: Optional[float] = None, multiplier: Optional[float] = None) -> Dict[str, float]:
         """Return next bet percentage and amount based on current session and account balance.
 
         - Start each session with `base_percent` of current balance.
         - On each loss, percentage *= multiplier.
+
+        Both default to the active session's parameters (or the defaults when
+        no session is open); the lookup reads the session's cached progression
+        and never touches its steps.
         """
         if self.current_session is None or not self.current_session.active:
             # Not in a session: next session would start at base_percent
-            pct = float(base_percent)
+            pct = float(DEFAULT_BASE_PERCENT if base_percent is None else base_percent)
         else:
-            # compute current pct based on previous steps
-            if not self.current_session.steps:
-                pct = float(base_percent)
-            else:
-                last = self.current_session.steps[-1]
-                if last.result == "win":
-                    pct = float(base_percent)
-                else:
-                    # last was a loss: double the last percentage
-                    pct = float(last.bet_percent) * float(multiplier)
+            pct = self.current_session.next_percent(base_percent, multiplier)
+        return {"bet_percent": pct, "bet_amount": bet_amount_for(self.balance, pct)}
 
-        bet_amount = round(self.balance * pct, 2)
-        if bet_amount < 0.01:
-            bet_amount = 0.01
-        return {"bet_percent": pct, "bet_amount": bet_amount}
+    @_synchronized
+    def get_ladder(self, depth: int = 20, win_prob: Optional[float] = None, base_percent: Optional[float] = None, multiplier: Optional[float] = None) -> BetLadder:
+        """`bet_ladder` for a session started at the current balance.
 
+        Parameters default to the active session's, as in `get_next_bet`.
+        """
+        sess = self.current_session if self.current_session is not None and self.current_session.active else None
+        if base_percent is None:
+            base_percent = sess.base_percent if sess else DEFAULT_BASE_PERCENT
+        if multiplier is None:
+            multiplier = sess.multiplier if sess else DEFAULT_MULTIPLIER
+        return bet_ladder(self.balance, base_percent, multiplier, depth=depth, win_prob=win_prob)
+
+    @_mutation
     def record_result(self, bet_percent: float, bet_amount: float, pnl: float, result: str):
         """Record a real outcome into current session and update balance.
 
@@ -119,7 +497,12 @@ class Account:
         """
         if self.current_session is None or not self.current_session.active:
             raise RuntimeError("No active session to record result")
+        step, record = self._apply_result(bet_percent, bet_amount, pnl, result)
+        self._persist(record)
+        return step
 
+    def _apply_result(self, bet_percent: float, bet_amount: float, pnl: float, result: str, timestamp: Optional[str] = None):
+        """Apply one outcome to the active session in memory; returns the step and the record to persist."""
         # Apply pnl (positive or negative)
         self.balance = round(self.balance + float(pnl), 2)
 
@@ -130,9 +513,11 @@ class Account:
             result=result,
             pnl=float(pnl),
             balance_after=self.balance,
-            timestamp=datetime.utcnow().isoformat(),
+            timestamp=timestamp or datetime.utcnow().isoformat(),
         )
-        self.current_session.steps.append(step)
+        sess = self.current_session
+        sess.steps.append(step)
+        sess.advance(step)
 
         # If win, end session and reset
         if result == "win":
@@ -145,21 +530,257 @@ class Account:
                 self.current_session.active = False
             self.current_session = None
 
-        self._save()
-        return step
+        return step, {"op": "step", "session_id": sess.id, "step": dict(vars(step)), "balance": self.balance, "active": sess.active, "progress": sess.progress()}
 
+    @_mutation
+    def record_many(
+        self,
+        results: Iterable[Dict],
+        chunk_size: int = 10000,
+        dry_run: bool = False,
+        base_percent: float = DEFAULT_BASE_PERCENT,
+        multiplier: float = DEFAULT_MULTIPLIER,
+        on_step: Optional[Callable[[Step], None]] = None,
+    ) -> Dict:
+        """Record a stream of outcomes in one pass, committing every `chunk_size` records.
+
+        Each item is a dict with `result` ("win" or "loss") and optionally
+        `pnl`, `bet_amount`, `bet_percent` and `timestamp`. Missing bets come
+        from the progression and a missing pnl assumes even payout, as in
+        `app.py record`. Whenever no session is active one is started with
+        `base_percent` and `multiplier`.
+
+        Items are validated as they are applied: a bad one raises ValueError
+        naming its position, after committing the items before it. With
+        `dry_run` nothing is saved and the account is restored afterwards, so
+        a dry run validates a whole stream up front. `on_step(step)` is called
+        for every applied step, e.g. to write out the balance path.
+
+        With JSON storage, where every commit rewrites the whole file, the
+        import is committed once at the end; use journal or sqlite storage
+        to import large streams. With sqlite, sessions closed by a committed
+        chunk are dropped from memory and reloaded on demand, so memory stays
+        bounded by the chunk size.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if getattr(self.storage, "rewrites_on_commit", False):
+            chunk_size = math.inf
+        unload = getattr(self.storage, "lazy_steps", False)
+        kept = len(self.sessions)  # sessions before this position are left as they are
+        cur = self.current_session
+        if cur is not None:
+            kept -= 1
+        saved = (self.balance, list(self.sessions), cur, cur and (cur.active, cur.step_count, cur.progress()))
+        summary = {"steps": 0, "sessions_started": 0, "start_balance": self.balance, "final_balance": self.balance, "min_balance": self.balance, "max_balance": self.balance}
+        pending: List[Dict] = []
+        try:
+            for n, item in enumerate(results, 1):
+                row = _validate_result(item, n)
+                if self.current_session is None or not self.current_session.active:
+                    _, record = self._open_session(base_percent, multiplier, created_at=row["timestamp"])
+                    pending.append(record)
+                    summary["sessions_started"] += 1
+                pct, amount = row["bet_percent"], row["bet_amount"]
+                if pct is None and amount is None:
+                    info = self.get_next_bet()
+                    pct, amount = info["bet_percent"], info["bet_amount"]
+                elif amount is None:
+                    amount = bet_amount_for(self.balance, pct)
+                elif pct is None:
+                    pct = amount / self.balance if self.balance > 0 else 0.0
+                pnl = row["pnl"] if row["pnl"] is not None else (amount if row["result"] == "win" else -amount)
+                step, record = self._apply_result(pct, amount, pnl, row["result"], timestamp=row["timestamp"])
+                pending.append(record)
+
+                summary["steps"] += 1
+                summary["final_balance"] = self.balance
+                summary["min_balance"] = min(summary["min_balance"], self.balance)
+                summary["max_balance"] = max(summary["max_balance"], self.balance)
+                if on_step is not None:
+                    on_step(step)
+                if dry_run:
+                    pending.clear()
+                    if self.current_session is None:
+                        # Closed sessions are not needed again; drop them to keep memory flat
+                        self.sessions.pop()
+                elif len(pending) >= chunk_size:
+                    self._persist_many(pending)
+                    pending = []
+                    if unload:
+                        kept = self._unload_closed(kept)
+        finally:
+            if dry_run:
+                self._restore(saved)
+            elif pending:
+                self._persist_many(pending)
+        return summary
+
+    def _unload_closed(self, start: int) -> int:
+        """Swap closed sessions from position `start` on for lazy ones; returns the first still open."""
+        for pos in range(start, len(self.sessions)):
+            sess = self.sessions[pos]
+            if sess.active:
+                return pos
+            if sess.loaded:
+                self.sessions[pos] = Session.lazy(
+                    id=sess.id, start_balance=sess.start_balance, active=False, created_at=sess.created_at,
+                    loader=self._step_loader(sess.id, None), step_count=sess.step_count, end_balance=sess.end_balance,
+                    **sess.progress(),
+                )
+        return len(self.sessions)
+
+    def _restore(self, saved):
+        """Undo in-memory changes made since `saved` was taken in `record_many`."""
+        self.balance, self.sessions, cur, cur_state = saved
+        self.current_session = cur
+        if cur is not None:
+            cur.active, count, progress = cur_state
+            del cur.steps[count:]
+            for name, value in progress.items():
+                setattr(cur, name, value)
+
+    @_mutation
     def force_end_session(self):
         if self.current_session:
-            self.current_session.active = False
+            sess = self.current_session
+            sess.active = False
             self.current_session = None
-            self._save()
+            self._persist({"op": "end", "session_id": sess.id})
+
+    @staticmethod
+    def _step_filter(result: Optional[str], since: Optional[str], until: Optional[str]) -> Optional[Callable[[Dict], bool]]:
+        """Predicate for `history` filters, or None when there are none.
+
+        `since` and `until` are ISO dates or datetimes compared with step
+        timestamps; both are inclusive, so `until="2024-05-01"` keeps that day.
+        """
+        if result is None and since is None and until is None:
+            return None
+
+        def match(st: Dict) -> bool:
+            if result is not None and st["result"] != result:
+                return False
+            ts = st["timestamp"]
+            if since is not None and ts < since:
+                return False
+            return until is None or ts[:len(until)] <= until
+
+        return match
+
+    def _matching_steps(self, session_id: Optional[str], match: Callable[[Dict], bool]) -> Iterator[Tuple[Session, Dict]]:
+        """`(session, step)` for steps passing `match`, newest first, one session in memory at a time."""
+        for sess in reversed(self.sessions):
+            if session_id is not None and sess.id != session_id:
+                continue
+            for st in reversed(sess._step_views()):
+                if match(st):
+                    yield sess, st
+
+    def _step_queries(self) -> Optional[Storage]:
+        """The backend, if it can filter and count steps itself (SQLite); queued writes are flushed first."""
+        if not hasattr(self.storage, "count_steps"):
+            return None
+        self.flush()
+        return self.storage
+
+    @_synchronized
+    def history(self, offset: int = 0, limit: int = 50, session_id: Optional[str] = None,
+                result: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+        """Steps newest first, each tagged with its `session_id`.
+
+        Without `result`/`since`/`until` filters, sessions that end before
+        `offset` are skipped by their step count, so lazy sessions outside the
+        page stay unloaded. Filtered pages are queried from SQLite when that is
+        the backend; other backends scan steps up to the page but copy only
+        the rows returned.
+        """
+        rows: List[Dict] = []
+        skip = max(int(offset), 0)
+        match = self._step_filter(result, since, until)
+        store = self._step_queries() if match is not None else None
+        if store is not None:
+            return store.query_steps(session_id=session_id, start=since, result=result, until=until,
+                                     limit=limit, offset=skip, newest_first=True)
+        if match is not None:
+            for sess, st in itertools.islice(self._matching_steps(session_id, match), skip, skip + limit):
+                rows.append(dict(st, session_id=sess.id))
+            return rows
+        for sess in reversed(self.sessions):
+            if len(rows) >= limit:
+                break
+            if session_id is not None and sess.id != session_id:
+                continue
+            count = sess.step_count
+            if skip >= count:
+                skip -= count
+                continue
+            steps = sess.step_dicts()
+            for st in reversed(steps[: count - skip]):
+                rows.append(dict(st, session_id=sess.id))
+                if len(rows) >= limit:
+                    break
+            skip = 0
+        return rows
+
+    @_synchronized
+    def history_count(self, session_id: Optional[str] = None, result: Optional[str] = None,
+                      since: Optional[str] = None, until: Optional[str] = None) -> int:
+        """Number of steps `history` pages through with the same filters."""
+        match = self._step_filter(result, since, until)
+        if match is None:
+            return sum(s.step_count for s in self.sessions if session_id is None or s.id == session_id)
+        store = self._step_queries()
+        if store is not None:
+            return store.count_steps(session_id=session_id, start=since, result=result, until=until)
+        return sum(1 for _ in self._matching_steps(session_id, match))
+
+    @_synchronized
+    def steps_since(self, session_id: Optional[str], idx: int) -> Optional[Dict]:
+        """What was added after step `idx` of session `session_id` (None: from the start).
+
+        Returns the balance, headers of sessions newer than `session_id`, the
+        new steps oldest first (each with its `session_id`) and the new
+        watermark `(session_id, idx)`. Only sessions from the watermark on are
+        visited, so the cost follows what was added. Returns None when the
+        watermark no longer exists, e.g. after `init_account`.
+        """
+        start = 0
+        if session_id is not None:
+            for pos in range(len(self.sessions) - 1, -1, -1):
+                if self.sessions[pos].id == session_id:
+                    start = pos
+                    break
+            else:
+                return None
+            if self.sessions[start].step_count < idx:
+                return None
+        new_sessions, rows = [], []
+        for pos in range(start, len(self.sessions)):
+            sess = self.sessions[pos]
+            skip = 0
+            if session_id is not None and pos == start:
+                skip = idx
+            else:
+                new_sessions.append(self._session_header(sess))
+            if sess.step_count > skip:
+                rows.extend(dict(st, session_id=sess.id) for st in sess.step_dicts(skip))
+        last = self.sessions[-1] if self.sessions else None
+        return {
+            "balance": self.balance,
+            "new_sessions": new_sessions,
+            "rows": rows,
+            "watermark": (last.id, last.step_count) if last is not None else (None, 0),
+        }
 
+    @_synchronized
     def status(self) -> Dict:
         s = None
         if self.current_session:
             s = {
                 "id": self.current_session.id,
                 "start_balance": self.current_session.start_balance,
-                "steps": [asdict(st) for st in self.current_session.steps],
+                "progress": self.current_session.progress(),
+                "steps": self.current_session.step_dicts(),
             }
         return {"balance": self.balance, "current_session": s}
@@ -0,0 +1,166 @@
+"""Account history analytics: drawdown, loss streaks, win rate, session and time-of-day breakdowns.
+
+`AccountStats` copies the recorded steps into NumPy columns once and keeps
+running aggregates beside them. `update(account)` pulls only the steps
+recorded since the previous call (see `Account.steps_since`) and folds them
+in with vectorized operations, so refreshing after a trade costs O(new
+steps). If the account was re-initialized, the stats are rebuilt from scratch.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_STEP_COLUMNS = (("pnl", np.float64), ("balance", np.float64), ("win", np.bool_), ("hour", np.int8), ("session", np.int32))
+_SESSION_COLUMNS = (("start_balance", np.float64), ("steps", np.int64), ("pnl", np.float64))
+
+
+def _hour(timestamp: str) -> int:
+    """Hour of an ISO timestamp, or -1 when it has none."""
+    hh = timestamp[11:13]
+    return int(hh) if len(hh) == 2 and hh.isdigit() else -1
+
+
+class _Columns:
+    """Named NumPy columns of equal length that grow by doubling."""
+
+    def __init__(self, spec: Tuple, capacity: int = 1024):
+        self._spec = spec
+        self._cols = {name: np.zeros(capacity, dtype=dtype) for name, dtype in spec}
+        self.n = 0
+
+    def extend(self, k: int) -> slice:
+        """Make room for `k` more rows (zero-filled) and return their slice."""
+        needed = self.n + k
+        capacity = len(self._cols[self._spec[0][0]])
+        if needed > capacity:
+            capacity = max(needed, 2 * capacity)
+            for name, dtype in self._spec:
+                buf = np.zeros(capacity, dtype=dtype)
+                buf[:self.n] = self._cols[name][:self.n]
+                self._cols[name] = buf
+        rows = slice(self.n, needed)
+        self.n = needed
+        return rows
+
+    def raw(self, name: str) -> np.ndarray:
+        """The whole buffer of column `name`, for in-place writes."""
+        return self._cols[name]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._cols[name][:self.n]
+
+
+class AccountStats:
+    """Vectorized metrics over an `Account`'s step history, kept up to date incrementally."""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self) -> None:
+        self.steps = _Columns(_STEP_COLUMNS)
+        self.sessions = _Columns(_SESSION_COLUMNS, capacity=64)
+        self._session_index: Dict[str, int] = {}
+        self.watermark: Tuple[Optional[str], int] = (None, 0)
+        self.first_balance: Optional[float] = None
+        self.balance = 0.0
+        self.wins = 0
+        self.peak: Optional[float] = None
+        self.max_drawdown = 0.0
+        self.max_drawdown_pct = 0.0
+        self.loss_streak = 0
+        self.longest_loss_streak = 0
+        self.hour_steps = np.zeros(24, dtype=np.int64)
+        self.hour_wins = np.zeros(24, dtype=np.int64)
+        self.hour_pnl = np.zeros(24, dtype=np.float64)
+
+    def update(self, account) -> "AccountStats":
+        """Fold in what `account` recorded since the last call; returns self."""
+        delta = account.steps_since(*self.watermark)
+        if delta is None:
+            self._reset()
+            delta = account.steps_since(None, 0)
+        for header in delta["new_sessions"]:
+            rows = self.sessions.extend(1)
+            self.sessions.raw("start_balance")[rows] = header["start_balance"]
+            self._session_index[header["id"]] = rows.start
+            if self.first_balance is None:
+                self.first_balance = header["start_balance"]
+        if delta["rows"]:
+            self._add_steps(delta["rows"])
+        self.balance = delta["balance"]
+        self.watermark = delta["watermark"]
+        return self
+
+    def _add_steps(self, rows: List[Dict]) -> None:
+        k = len(rows)
+        pnl = np.fromiter((r["pnl"] for r in rows), dtype=np.float64, count=k)
+        balance = np.fromiter((r["balance_after"] for r in rows), dtype=np.float64, count=k)
+        win = np.fromiter((r["result"] == "win" for r in rows), dtype=np.bool_, count=k)
+        hour = np.fromiter((_hour(r["timestamp"]) for r in rows), dtype=np.int8, count=k)
+        session = np.fromiter((self._session_index[r["session_id"]] for r in rows), dtype=np.int32, count=k)
+        span = self.steps.extend(k)
+        for name, values in (("pnl", pnl), ("balance", balance), ("win", win), ("hour", hour), ("session", session)):
+            self.steps.raw(name)[span] = values
+
+        self.wins += int(win.sum())
+
+        # Drawdown from the running peak, which starts at the first session's start balance
+        start = self.peak if self.peak is not None else (self.first_balance if self.first_balance is not None else balance[0] - pnl[0])
+        peaks = np.maximum.accumulate(np.concatenate(([start], balance)))[1:]
+        drawdown = peaks - balance
+        self.max_drawdown = max(self.max_drawdown, float(drawdown.max()))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.where(peaks > 0, drawdown / peaks, 0.0)
+        self.max_drawdown_pct = max(self.max_drawdown_pct, float(pct.max()))
+        self.peak = float(peaks[-1])
+
+        # Length of the loss run ending at each step (0 at wins), carrying the run in progress
+        idx = np.arange(k)
+        last_win = np.maximum.accumulate(np.where(win, idx, -1))
+        run = idx - last_win
+        run[last_win < 0] += self.loss_streak
+        self.longest_loss_streak = max(self.longest_loss_streak, int(run.max()))
+        self.loss_streak = int(run[-1])
+
+        timed = hour >= 0
+        hours = hour[timed]
+        self.hour_steps += np.bincount(hours, minlength=24)
+        self.hour_wins += np.bincount(hours, weights=win[timed], minlength=24).astype(np.int64)
+        self.hour_pnl += np.bincount(hours, weights=pnl[timed], minlength=24)
+
+        np.add.at(self.sessions.raw("steps"), session, 1)
+        np.add.at(self.sessions.raw("pnl"), session, pnl)
+
+    @property
+    def session_pnl(self) -> np.ndarray:
+        """Profit/loss of each session, oldest first."""
+        return self.sessions["pnl"]
+
+    def by_hour(self) -> List[Dict]:
+        """Steps, win rate and P&L per hour of day, for hours with any steps."""
+        return [
+            {"hour": h, "steps": int(self.hour_steps[h]), "win_rate": float(self.hour_wins[h] / self.hour_steps[h]), "pnl": float(self.hour_pnl[h])}
+            for h in np.flatnonzero(self.hour_steps).tolist()
+        ]
+
+    def summary(self) -> Dict:
+        n_steps, n_sessions = self.steps.n, self.sessions.n
+        session_pnl = self.session_pnl
+        return {
+            "steps": n_steps,
+            "sessions": n_sessions,
+            "wins": self.wins,
+            "losses": n_steps - self.wins,
+            "win_rate": self.wins / n_steps if n_steps else 0.0,
+            "starting_balance": self.first_balance,
+            "balance": self.balance,
+            "total_pnl": self.balance - self.first_balance if self.first_balance is not None else 0.0,
+            "max_drawdown": self.max_drawdown,
+            "max_drawdown_pct": self.max_drawdown_pct,
+            "longest_loss_streak": self.longest_loss_streak,
+            "current_loss_streak": self.loss_streak,
+            "avg_session_length": n_steps / n_sessions if n_sessions else 0.0,
+            "avg_session_pnl": float(session_pnl.mean()) if n_sessions else 0.0,
+            "best_session_pnl": float(session_pnl.max()) if n_sessions else 0.0,
+            "worst_session_pnl": float(session_pnl.min()) if n_sessions else 0.0,
+        }
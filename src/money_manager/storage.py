@@ -0,0 +1,765 @@
+"""Persistence backends for `Account`.
+
+Backends exchange the account as a plain document in the `mm_account.json`
+layout (`{"balance": ..., "sessions": [{..., "steps": [...]}]}`) and receive
+each mutation as a small record:
+
+- `{"op": "init", "balance": b}`
+- `{"op": "start", "session": {...session fields, no steps...}}`
+- `{"op": "step", "session_id": id, "step": {...}, "balance": b, "active": bool, "progress": {...}}`
+- `{"op": "end", "session_id": id}`
+
+Every record carries a `seq` number assigned by the account, and documents
+carry the `seq` of the last record they include. Sessions carry a `progress`
+dict (`PROGRESS_FIELDS`) with the Martingale state after their last step;
+files written before it existed simply lack the key.
+"""
+import atexit
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .locking import FileLock
+
+STORAGE_KINDS = ("json", "journal", "sqlite")
+DURABILITY_MODES = ("every_write", "interval", "on_close")
+STEP_FIELDS = ("idx", "bet_percent", "bet_amount", "result", "pnl", "balance_after", "timestamp")
+PROGRESS_FIELDS = ("base_percent", "multiplier", "loss_streak", "last_percent", "session_loss")
+
+
+def empty_document(balance: float = 0.0) -> Dict:
+    return {"balance": float(balance), "sessions": []}
+
+
+def apply_record(doc: Dict, record: Dict, index: Optional[Dict[str, Dict]] = None) -> None:
+    """Apply one mutation record to an account document in place.
+
+    `index` maps session id to session dict; pass the same dict across calls
+    to avoid scanning the session list for every record.
+    """
+    if index is None:
+        index = {s["id"]: s for s in doc["sessions"]}
+    if "seq" in record:
+        doc["seq"] = record["seq"]
+    op = record["op"]
+    if op == "init":
+        doc["balance"] = record["balance"]
+        doc["sessions"] = []
+        index.clear()
+    elif op == "start":
+        sess = dict(record["session"], steps=[])
+        doc["sessions"].append(sess)
+        index[sess["id"]] = sess
+    elif op == "step":
+        sess = index[record["session_id"]]
+        sess["steps"].append(record["step"])
+        sess["active"] = record["active"]
+        if "progress" in record:
+            sess["progress"] = record["progress"]
+        doc["balance"] = record["balance"]
+    elif op == "end":
+        index[record["session_id"]]["active"] = False
+    else:
+        raise ValueError(f"Unknown journal op: {op!r}")
+
+
+class CorruptDataError(RuntimeError):
+    """The account file exists but cannot be trusted (bad JSON or checksum mismatch)."""
+
+    def __init__(self, path: str, reason: str):
+        self.path = path
+        self.backup = path + ".bak" if os.path.exists(path + ".bak") else None
+        hint = f"; last good copy: {self.backup}" if self.backup else ""
+        super().__init__(f"Account data in {path} is corrupt ({reason}){hint}")
+
+
+# The checksum is stored as the document's last member so the file stays plain
+# JSON; it covers the file exactly as written minus that member.
+_CHECKSUM_RE = re.compile(rb',\n"checksum": "sha256:([0-9a-f]{64})"\n(\}\s*)$')
+
+
+def _fsync_dir(path: str) -> None:
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return  # not supported on this platform (e.g. Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_json(path: str, doc: Dict, indent: Optional[int] = 2, fsync: bool = True, backup: bool = True) -> None:
+    """Atomically replace `path` with `doc` plus an embedded checksum.
+
+    The data goes to a temp file that is fsynced and renamed over `path`, so
+    a crash leaves either the old or the new file. With `backup`, the
+    previous file is kept as `<path>.bak` (replaced on every save).
+    """
+    text = json.dumps(doc, indent=indent)
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    end = text.rindex("}")
+    text = text[:end] + f',\n"checksum": "sha256:{digest}"\n' + text[end:]
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    if backup and os.path.exists(path):
+        bak_tmp = path + ".bak.tmp"
+        if os.path.exists(bak_tmp):
+            os.remove(bak_tmp)
+        try:
+            os.link(path, bak_tmp)
+        except OSError:
+            shutil.copy2(path, bak_tmp)
+        os.replace(bak_tmp, path + ".bak")
+    os.replace(tmp, path)
+    if fsync:
+        _fsync_dir(path)
+
+
+def read_json(path: str) -> Dict:
+    """Load a document written by `write_json`, verifying its checksum.
+
+    Files without a checksum (written by older versions) are accepted as-is.
+    Raises `CorruptDataError` for unreadable JSON or a checksum mismatch.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    m = _CHECKSUM_RE.search(data)
+    if m is not None:
+        body = data[:m.start()] + m.group(2)
+        if hashlib.sha256(body).hexdigest() != m.group(1).decode("ascii"):
+            raise CorruptDataError(path, "checksum mismatch")
+    try:
+        doc = json.loads(data.decode("utf-8"))
+    except ValueError as e:
+        raise CorruptDataError(path, f"invalid JSON: {e}") from e
+    if not isinstance(doc, dict) or not isinstance(doc.get("sessions", []), list):
+        raise CorruptDataError(path, "not an account document")
+    doc.pop("checksum", None)
+    return doc
+
+
+class Storage:
+    """Base class: a backend that can load, snapshot and record mutations."""
+
+    # Every commit rewrites the whole account, so bulk writers should commit once
+    rewrites_on_commit = False
+    # `load_steps` can fetch a closed session's steps again on demand
+    lazy_steps = False
+
+    def exists(self) -> bool:
+        raise NotImplementedError
+
+    def load(self) -> Dict:
+        """Return the account document.
+
+        A backend may leave out `steps` for closed sessions and give
+        `step_count`/`end_balance` instead; those are then read on demand
+        through `load_steps`.
+        """
+        raise NotImplementedError
+
+    def load_steps(self, session_id: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def save(self, doc: Dict) -> None:
+        raise NotImplementedError
+
+    def append(self, record: Dict, snapshot: Callable[[], Dict]) -> None:
+        """Persist one mutation; `snapshot()` returns the full current document."""
+        self.save(snapshot())
+
+    def append_many(self, records: List[Dict], snapshot: Callable[[], Dict]) -> None:
+        """Persist several mutations, in order, as one commit where the backend allows."""
+        for record in records:
+            self.append(record, snapshot)
+
+    def close(self) -> None:
+        pass
+
+
+class JsonStorage(Storage):
+    """The original single-file format: every mutation rewrites `mm_account.json`.
+
+    Saves are atomic and checksummed (see `write_json`), keeping the previous
+    file as `mm_account.json.bak`.
+    """
+
+    rewrites_on_commit = True
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> Dict:
+        return read_json(self.path)
+
+    def save(self, doc: Dict) -> None:
+        write_json(self.path, doc, indent=2)
+
+    def append_many(self, records: List[Dict], snapshot: Callable[[], Dict]) -> None:
+        # The snapshot already reflects every record: one rewrite covers the batch.
+        self.save(snapshot())
+
+
+class JournalStorage(Storage):
+    """Snapshot file plus an append-only NDJSON journal of mutations.
+
+    Each mutation appends one compact line to `<path>.journal` (fsynced by
+    default), so a write costs O(1) however long the history is. Loading
+    reads the snapshot at `path` and replays the journal records newer than
+    the snapshot's `seq`. Every `compact_every` records the snapshot is
+    rewritten and the journal truncated; a crash between the two steps never
+    replays a record twice. A torn last line from a crash mid-append is
+    ignored on load and cut off before the next append.
+    """
+
+    def __init__(self, path: str, compact_every: int = 1000, fsync: bool = True):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_every = int(compact_every)
+        self.fsync = fsync
+        self._snapshot_seq = 0
+        self._pending = 0
+        self._torn_at: Optional[int] = None
+        self._fh = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path) or os.path.exists(self.journal_path)
+
+    def load(self) -> Dict:
+        if os.path.exists(self.path):
+            doc = read_json(self.path)
+        else:
+            doc = empty_document()
+        self._snapshot_seq = int(doc.get("seq", 0))
+        self._pending = 0
+        self._torn_at = None
+        index = {s["id"]: s for s in doc["sessions"]}
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb") as f:
+                good = 0  # end of the last complete record
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("no newline")
+                        record = json.loads(line)
+                    except ValueError:
+                        if f.read().strip():
+                            raise CorruptDataError(self.journal_path, "unreadable record before the end of the journal")
+                        self._torn_at = good  # torn write at the tail
+                        break
+                    good += len(line)
+                    if record["seq"] <= doc.get("seq", 0):
+                        continue
+                    apply_record(doc, record, index)
+                    self._pending += 1
+        return doc
+
+    def save(self, doc: Dict) -> None:
+        """Write a full snapshot and truncate the journal."""
+        self._close_journal()
+        write_json(self.path, doc, indent=None, fsync=self.fsync, backup=False)
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+        self._snapshot_seq = int(doc.get("seq", 0))
+        self._pending = 0
+        self._torn_at = None
+
+    def append(self, record: Dict, snapshot: Callable[[], Dict]) -> None:
+        self.append_many([record], snapshot)
+
+    def append_many(self, records: List[Dict], snapshot: Callable[[], Dict]) -> None:
+        # Records already folded into the last snapshot are skipped.
+        records = [r for r in records if r["seq"] > self._snapshot_seq]
+        if not records:
+            return
+        if any(r["op"] == "init" for r in records):
+            # A reset discards all history; start from a fresh snapshot.
+            self.save(snapshot())
+            return
+        if self._fh is None:
+            if self._torn_at is not None:
+                # Cut the torn tail off, or the next record would be glued onto it
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(self._torn_at)
+                self._torn_at = None
+            self._fh = open(self.journal_path, "a", encoding="utf-8")
+        self._fh.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+        self._pending += len(records)
+        if self.compact_every and self._pending >= self.compact_every:
+            self.save(snapshot())
+
+    def _close_journal(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def close(self) -> None:
+        self._close_journal()
+
+
+class SQLiteStorage(Storage):
+    """SQLite database with indexed `sessions` and `steps` tables.
+
+    Runs in WAL mode and commits each mutation record (for example a step
+    plus the new balance) in one transaction. `query_steps` and `count_steps`
+    filter history by session, time range and result without loading the
+    whole account.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS sessions (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL UNIQUE,
+            start_balance REAL,
+            active INTEGER NOT NULL,
+            created_at TEXT,
+            base_percent REAL,
+            multiplier REAL,
+            loss_streak INTEGER,
+            last_percent REAL,
+            session_loss REAL
+        );
+        CREATE TABLE IF NOT EXISTS steps (
+            session_id TEXT NOT NULL REFERENCES sessions(id),
+            idx INTEGER NOT NULL,
+            bet_percent REAL,
+            bet_amount REAL,
+            result TEXT,
+            pnl REAL,
+            balance_after REAL,
+            timestamp TEXT
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS steps_session_idx ON steps(session_id, idx);
+        CREATE INDEX IF NOT EXISTS steps_timestamp ON steps(timestamp);
+    """
+
+    lazy_steps = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+            self._upgrade_schema(self._conn)
+        return self._conn
+
+    @staticmethod
+    def _upgrade_schema(conn: sqlite3.Connection) -> None:
+        # Databases created before sessions kept their progression state
+        columns = {r["name"] for r in conn.execute("PRAGMA table_info(sessions)")}
+        types = {"loss_streak": "INTEGER"}
+        with conn:
+            for name in PROGRESS_FIELDS:
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE sessions ADD COLUMN {name} {types.get(name, 'REAL')}")
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> Dict:
+        """Read the balance and session index; only the active session's steps are loaded."""
+        with self._lock:
+            conn = self.conn
+            meta = {r["key"]: r["value"] for r in conn.execute("SELECT key, value FROM meta")}
+            doc = empty_document(float(meta.get("balance", 0.0)))
+            doc["seq"] = int(meta.get("seq", 0))
+            rows = conn.execute(
+                f"""
+                SELECT s.id, s.start_balance, s.active, s.created_at, {", ".join("s." + f for f in PROGRESS_FIELDS)},
+                       (SELECT COUNT(*) FROM steps WHERE session_id = s.id) AS step_count,
+                       (SELECT balance_after FROM steps WHERE session_id = s.id ORDER BY idx DESC LIMIT 1) AS end_balance
+                FROM sessions s ORDER BY s.seq
+                """
+            )
+            for r in rows:
+                sess = {"id": r["id"], "start_balance": r["start_balance"], "active": bool(r["active"]), "created_at": r["created_at"]}
+                if r["loss_streak"] is not None:
+                    sess["progress"] = {f: r[f] for f in PROGRESS_FIELDS}
+                if sess["active"]:
+                    sess["steps"] = self.load_steps(sess["id"])
+                else:
+                    sess["step_count"] = r["step_count"]
+                    sess["end_balance"] = r["end_balance"] if r["end_balance"] is not None else r["start_balance"]
+                doc["sessions"].append(sess)
+        return doc
+
+    def load_steps(self, session_id: str) -> List[Dict]:
+        with self._lock:
+            rows = self.conn.execute(f"SELECT {', '.join(STEP_FIELDS)} FROM steps WHERE session_id = ? ORDER BY idx", (session_id,))
+            return [dict(r) for r in rows]
+
+    def _set_meta(self, key: str, value) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, repr(value)))
+
+    def _insert_session(self, sess: Dict) -> None:
+        self._insert_sessions([sess])
+
+    def _insert_sessions(self, sessions: List[Dict]) -> None:
+        rows = []
+        for sess in sessions:
+            progress = sess.get("progress") or {}
+            rows.append((sess["id"], sess["start_balance"], int(bool(sess["active"])), sess["created_at"], *(progress.get(f) for f in PROGRESS_FIELDS)))
+        self.conn.executemany(
+            f"INSERT INTO sessions (id, start_balance, active, created_at, {', '.join(PROGRESS_FIELDS)}) VALUES (?, ?, ?, ?{', ?' * len(PROGRESS_FIELDS)})",
+            rows,
+        )
+
+    def _update_progress(self, session_id: str, progress: Dict) -> None:
+        self.conn.execute(
+            f"UPDATE sessions SET {', '.join(f + ' = ?' for f in PROGRESS_FIELDS)} WHERE id = ?",
+            (*(progress.get(f) for f in PROGRESS_FIELDS), session_id),
+        )
+
+    def _insert_steps(self, session_id: str, steps: List[Dict]) -> None:
+        self.conn.executemany(
+            f"INSERT INTO steps (session_id, {', '.join(STEP_FIELDS)}) VALUES (?{', ?' * len(STEP_FIELDS)})",
+            [(session_id, *(st[k] for k in STEP_FIELDS)) for st in steps],
+        )
+
+    def save(self, doc: Dict) -> None:
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM steps")
+            self.conn.execute("DELETE FROM sessions")
+            self._set_meta("balance", float(doc["balance"]))
+            self._set_meta("seq", int(doc.get("seq", 0)))
+            self._insert_sessions(doc["sessions"])
+            for sess in doc["sessions"]:
+                self._insert_steps(sess["id"], sess["steps"])
+
+    def append(self, record: Dict, snapshot: Callable[[], Dict]) -> None:
+        self.append_many([record], snapshot)
+
+    def append_many(self, records: List[Dict], snapshot: Callable[[], Dict]) -> None:
+        """Apply records in one transaction, coalescing runs of starts, steps and ends.
+
+        Sessions and steps are inserted with one `executemany` each and every
+        touched session is updated once with its final state, so a large
+        batch costs a handful of statements rather than several per record.
+        """
+        with self._lock, self.conn:
+            new_sessions: List[Dict] = []
+            new_steps: List[tuple] = []
+            updates: Dict[str, Dict] = {}
+            balance = None
+
+            def flush():
+                nonlocal balance
+                self._insert_sessions(new_sessions)
+                self.conn.executemany(
+                    f"INSERT INTO steps (session_id, {', '.join(STEP_FIELDS)}) VALUES (?{', ?' * len(STEP_FIELDS)})",
+                    new_steps,
+                )
+                self.conn.executemany(
+                    "UPDATE sessions SET active = ? WHERE id = ?",
+                    [(int(state["active"]), session_id) for session_id, state in updates.items() if "progress" not in state],
+                )
+                self.conn.executemany(
+                    f"UPDATE sessions SET active = ?, {', '.join(f + ' = ?' for f in PROGRESS_FIELDS)} WHERE id = ?",
+                    [(int(state["active"]), *(state["progress"].get(f) for f in PROGRESS_FIELDS), session_id) for session_id, state in updates.items() if "progress" in state],
+                )
+                if balance is not None:
+                    self._set_meta("balance", float(balance))
+                new_sessions.clear()
+                new_steps.clear()
+                updates.clear()
+                balance = None
+
+            for record in records:
+                op = record["op"]
+                if op == "start":
+                    new_sessions.append(record["session"])
+                elif op == "step":
+                    new_steps.append((record["session_id"], *(record["step"][k] for k in STEP_FIELDS)))
+                    state = updates.setdefault(record["session_id"], {})
+                    state["active"] = record["active"]
+                    if "progress" in record:
+                        state["progress"] = record["progress"]
+                    balance = record["balance"]
+                elif op == "end":
+                    updates.setdefault(record["session_id"], {})["active"] = False
+                else:
+                    flush()
+                    self._apply(record)
+            flush()
+            if records and "seq" in records[-1]:
+                self._set_meta("seq", int(records[-1]["seq"]))
+
+    def _apply(self, record: Dict) -> None:
+        op = record["op"]
+        if op == "init":
+            self.conn.execute("DELETE FROM steps")
+            self.conn.execute("DELETE FROM sessions")
+            self._set_meta("balance", float(record["balance"]))
+        elif op == "start":
+            self._insert_session(record["session"])
+        elif op == "step":
+            self._insert_steps(record["session_id"], [record["step"]])
+            self.conn.execute("UPDATE sessions SET active = ? WHERE id = ?", (int(record["active"]), record["session_id"]))
+            if "progress" in record:
+                self._update_progress(record["session_id"], record["progress"])
+            self._set_meta("balance", float(record["balance"]))
+        elif op == "end":
+            self.conn.execute("UPDATE sessions SET active = 0 WHERE id = ?", (record["session_id"],))
+        else:
+            raise ValueError(f"Unknown storage op: {op!r}")
+        if "seq" in record:
+            self._set_meta("seq", int(record["seq"]))
+
+    @staticmethod
+    def _step_where(session_id: Optional[str], start: Optional[str], end: Optional[str],
+                    result: Optional[str], until: Optional[str]) -> Tuple[str, List]:
+        clauses, params = [], []
+        for column, op, value in (("st.session_id", "=", session_id), ("st.timestamp", ">=", start), ("st.timestamp", "<", end), ("st.result", "=", result)):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        if until is not None:
+            # Inclusive at `until`'s own precision, as in `Account.history`
+            clauses.append("substr(st.timestamp, 1, ?) <= ?")
+            params += [len(until), until]
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query_steps(
+        self,
+        session_id: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        result: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        until: Optional[str] = None,
+        newest_first: bool = False,
+    ) -> List[Dict]:
+        """Return steps (with their `session_id`) matching the filters, oldest first.
+
+        `start`/`end` are ISO timestamps; `end` is exclusive, while `until`
+        is inclusive (`until="2024-05-01"` keeps that day). With
+        `newest_first`, steps come in reverse recording order (latest session
+        first, then by step), which is the order `Account.history` pages in.
+        """
+        where, params = self._step_where(session_id, start, end, result, until)
+        columns = ", ".join("st." + f for f in STEP_FIELDS)
+        if newest_first:
+            # CROSS JOIN keeps sessions as the outer loop, so SQLite walks both
+            # tables in order and stops after the page instead of sorting
+            sql = f"SELECT st.session_id, {columns} FROM sessions s CROSS JOIN steps st ON st.session_id = s.id{where} ORDER BY s.seq DESC, st.idx DESC"
+        else:
+            sql = f"SELECT st.session_id, {columns} FROM steps st{where} ORDER BY st.timestamp, st.idx"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [int(limit), int(offset)]
+        with self._lock:
+            return [dict(r) for r in self.conn.execute(sql, params)]
+
+    def count_steps(self, session_id: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+                    result: Optional[str] = None, until: Optional[str] = None) -> int:
+        """Number of steps `query_steps` returns for the same filters."""
+        where, params = self._step_where(session_id, start, end, result, until)
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM steps st{where}", params).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class WriteBehindStorage(Storage):
+    """Queue mutations in memory and hand them to `inner` in batches.
+
+    `durability` trades throughput against crash safety:
+    - "every_write": pass each record straight through (no queue).
+    - "interval": a background thread flushes every `interval_ms`, or sooner
+      once `batch_size` records are queued.
+    - "on_close": flush only on `flush()`/`close()` and at interpreter exit.
+
+    Queued records are lost if the process dies before a flush. Errors from
+    a background flush are raised by the next `append`/`flush`.
+
+    `lock` is the owner's lock, the one `snapshot()` takes (`Account` passes
+    its own). Every flush takes it before the flush lock, so a background
+    flush waiting in `snapshot()` cannot deadlock with an owner thread that
+    holds it and loads (which flushes).
+    """
+
+    def __init__(self, inner: Storage, durability: str = "interval", interval_ms: int = 200, batch_size: int = 100,
+                 lock: Optional[threading.RLock] = None):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {', '.join(DURABILITY_MODES)}")
+        self.inner = inner
+        self.durability = durability
+        self.interval = max(1, int(interval_ms)) / 1000.0
+        self.batch_size = max(1, int(batch_size))
+        self._queue: List[Dict] = []
+        self._snapshot: Optional[Callable[[], Dict]] = None
+        self._cond = threading.Condition()
+        self._owner_lock = lock if lock is not None else threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        atexit.register(self.close)
+
+    def __getattr__(self, name):
+        # Backend-specific extras such as `query_steps` go to the wrapped storage.
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    @property
+    def rewrites_on_commit(self) -> bool:
+        return self.inner.rewrites_on_commit
+
+    @property
+    def lazy_steps(self) -> bool:
+        return self.inner.lazy_steps
+
+    def exists(self) -> bool:
+        return self.inner.exists()
+
+    def load(self) -> Dict:
+        self.flush()
+        return self.inner.load()
+
+    def load_steps(self, session_id: str) -> List[Dict]:
+        self.flush()
+        return self.inner.load_steps(session_id)
+
+    def save(self, doc: Dict) -> None:
+        with self._owner_lock, self._flush_lock:
+            with self._cond:
+                self._queue = []
+            self.inner.save(doc)
+
+    def append(self, record: Dict, snapshot: Callable[[], Dict]) -> None:
+        self._raise_pending_error()
+        if self.durability == "every_write":
+            self.inner.append(record, snapshot)
+            return
+        with self._cond:
+            self._queue.append(record)
+            self._snapshot = snapshot
+            if self.durability == "interval":
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="mm-write-behind", daemon=True)
+                    self._thread.start()
+                if len(self._queue) >= self.batch_size:
+                    self._cond.notify()
+
+    def flush(self) -> None:
+        """Write every queued record to the inner storage now."""
+        self._write_queued()
+        self._raise_pending_error()
+
+    def _write_queued(self) -> None:
+        # Lock order: owner, then flush (see the class docstring)
+        with self._owner_lock, self._flush_lock:
+            with self._cond:
+                batch, self._queue = self._queue, []
+                snapshot = self._snapshot
+            if not batch:
+                return
+            try:
+                self.inner.append_many(batch, snapshot)
+            except BaseException:
+                # Keep the records so the next flush retries them in order.
+                with self._cond:
+                    self._queue[:0] = batch
+                raise
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._queue) < self.batch_size:
+                    self._cond.wait(self.interval)
+                if self._closed:
+                    return
+            try:
+                self._write_queued()
+            except Exception as e:  # surfaced on the caller's thread
+                self._error = e
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        atexit.unregister(self.close)
+        try:
+            self.flush()
+        finally:
+            self.inner.close()
+
+
+def sqlite_path(path: str) -> str:
+    """Database file used for the account file `path` (`mm_account.json` -> `mm_account.db`)."""
+    return os.path.splitext(path)[0] + ".db"
+
+
+def migrate_json_to_sqlite(json_path: str, db_path: Optional[str] = None, force: bool = False) -> SQLiteStorage:
+    """Copy an `mm_account.json` account into a SQLite database in one transaction.
+
+    Refuses to replace an existing database unless `force`. Runs under the
+    account's lock file and bumps its version, so other processes holding
+    the account reload instead of keeping stale state.
+    """
+    db_path = db_path or sqlite_path(json_path)
+    if not os.path.exists(json_path):
+        raise RuntimeError(f"No account file to migrate at {json_path}")
+    lock = FileLock(json_path + ".lock")
+    try:
+        with lock:
+            if os.path.exists(db_path) and not force:
+                raise RuntimeError(f"{db_path} already exists; pass --force to replace it with the contents of {json_path}")
+            storage = SQLiteStorage(db_path)
+            storage.save(JsonStorage(json_path).load())
+            lock.write_version(lock.read_version() + 1)
+    finally:
+        lock.close()
+    return storage
+
+
+def make_storage(kind: str, path: str) -> Storage:
+    """Build the backend named `kind` for the account file at `path`."""
+    if kind == "json":
+        return JsonStorage(path)
+    if kind == "journal":
+        return JournalStorage(path)
+    if kind == "sqlite":
+        return SQLiteStorage(sqlite_path(path))
+    raise ValueError(f"Unknown storage backend {kind!r}; expected one of {', '.join(STORAGE_KINDS)}")
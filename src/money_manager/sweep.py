@@ -0,0 +1,80 @@
+"""Parameter-grid sweeps over the Martingale simulator."""
+import csv
+import itertools
+from typing import Dict, Iterable, List, Optional, Sequence, TextIO
+
+import numpy as np
+
+from .martingale import STOP_BANKRUPT, simulate_batch
+
+# Parameters that may vary across grid cells, in table column order.
+SWEEP_PARAMS = ("base_bet", "multiplier", "win_prob", "payout", "target_profit", "max_bet")
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict]:
+    """Return the cartesian product of `grid` as a list of parameter dicts."""
+    unknown = set(grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+    keys = [k for k in SWEEP_PARAMS if k in grid]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+def sweep(
+    grid: Dict[str, Sequence],
+    n_paths: int = 10000,
+    starting_balance: float = 1000.0,
+    max_rounds: int = 10000,
+    seed: Optional[int] = None,
+    defaults: Optional[Dict] = None,
+    cells_per_batch: int = 64,
+    percentiles: Iterable[float] = PERCENTILES,
+) -> List[Dict]:
+    """Evaluate every cell of `grid` with `n_paths` paths and summarize each.
+
+    Parameters missing from `grid` take their value from `defaults` (or the
+    `MartingaleSimulator` defaults). Cells are simulated `cells_per_batch` at
+    a time; every batch replays the same random stream, so all cells share
+    common random numbers no matter how they are batched.
+    """
+    base = {"base_bet": 1.0, "multiplier": 2.0, "win_prob": 0.5, "payout": 2.0, "target_profit": None, "max_bet": None}
+    base.update(defaults or {})
+    cells = [{**base, **cell} for cell in expand_grid(grid)]
+    percentiles = list(percentiles)
+    seed_seq = np.random.SeedSequence(seed)
+
+    rows: List[Dict] = []
+    for lo in range(0, len(cells), max(1, int(cells_per_batch))):
+        batch = cells[lo:lo + max(1, int(cells_per_batch))]
+        result = simulate_batch(
+            starting_balance=starting_balance,
+            max_rounds=max_rounds,
+            n_paths=n_paths,
+            rng=np.random.default_rng(seed_seq),
+            **{k: [c[k] for c in batch] for k in SWEEP_PARAMS},
+        )
+        final = result["final_balance"]
+        pct = np.percentile(final, percentiles, axis=1)
+        mean = final.mean(axis=1)
+        ruin = (result["stop_reason"] == STOP_BANKRUPT).mean(axis=1)
+        median_rounds = np.median(result["rounds"], axis=1)
+        for i, cell in enumerate(batch):
+            row = dict(cell)
+            row["mean_final_balance"] = float(mean[i])
+            row["ruin_probability"] = float(ruin[i])
+            row["median_rounds"] = float(median_rounds[i])
+            for q, values in zip(percentiles, pct):
+                row[f"p{q:g}_final_balance"] = float(values[i])
+            rows.append(row)
+    return rows
+
+
+def write_table(rows: List[Dict], fh: TextIO) -> None:
+    """Write sweep rows as CSV; `None` parameters are left empty."""
+    if not rows:
+        return
+    writer = csv.DictWriter(fh, fieldnames=list(rows[0]), lineterminator="\n")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({k: ("" if v is None else (f"{v:.6g}" if isinstance(v, float) else v)) for k, v in row.items()})
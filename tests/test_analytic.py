@@ -0,0 +1,36 @@
+import pytest
+
+from cli import simulated_figures
+from money_manager.analytic import analyze, max_loss_streak
+from money_manager.martingale import MartingaleSimulator, merge_summaries, summarize_many
+
+
+def test_max_loss_streak():
+    # 1+2+4+...+512 = 1023 > 1000, so nine losses are affordable
+    assert max_loss_streak(1000, 1, 2) == 9
+    assert max_loss_streak(1000, 1, 2, max_bet=100) == 7
+    assert max_loss_streak(0.5, 1, 2) == 0
+
+
+def test_analytic_matches_simulation():
+    sim = MartingaleSimulator(starting_balance=200, base_bet=1, multiplier=2, win_prob=0.47, payout=2, target_profit=30, max_rounds=100000, seed=1)
+    exact = analyze(sim)
+    assert exact.exact
+    assert exact.target_probability + exact.ruin_probability == pytest.approx(1.0)
+    batch = merge_summaries([summarize_many(sim.simulate_many(20000))])
+    assert batch["ruin_probability"] == pytest.approx(exact.ruin_probability, abs=0.02)
+    assert batch["mean_rounds"] == pytest.approx(exact.expected_rounds, rel=0.05)
+
+
+def test_analyze_requires_target():
+    with pytest.raises(ValueError):
+        analyze(MartingaleSimulator())
+
+
+def test_cross_check_compares_the_same_ruin_figure():
+    sim = MartingaleSimulator(starting_balance=200, base_bet=1, multiplier=2, win_prob=0.47, payout=2, target_profit=30, max_bet=16, max_rounds=100000, seed=1)
+    exact = analyze(sim)
+    simulated = simulated_figures(merge_summaries([summarize_many(sim.simulate_many(20000))]))
+    assert exact.max_bet_probability > 0.1
+    for key in ("bankrupt_probability", "max_bet_probability", "ruin_probability", "target_probability"):
+        assert simulated[key] == pytest.approx(getattr(exact, key), abs=0.02), key
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from money_manager.backtest import backtest, outcome_sequence, settings_grid
+from money_manager.session import Account
+
+OUTCOMES = "LLWLWLLLWWLLW"
+
+
+def _account(tmp_path, base_percent=0.02, multiplier=2.0):
+    acct = Account(data_file=str(tmp_path / "acct.json"))
+    acct.init_account(1000)
+    for ch in OUTCOMES:
+        if acct.current_session is None:
+            acct.start_session(base_percent=base_percent, multiplier=multiplier)
+        info = acct.get_next_bet()
+        win = ch == "W"
+        acct.record_result(info["bet_percent"], info["bet_amount"], info["bet_amount"] if win else -info["bet_amount"], "win" if win else "loss")
+    return acct
+
+
+def test_replaying_recorded_settings_reproduces_the_history(tmp_path):
+    acct = _account(tmp_path)
+    seq = outcome_sequence(acct)
+    assert seq.streak.tolist() == [0, 1, 2, 0, 1, 0, 1, 2, 3, 0, 0, 1, 2]
+
+    result = backtest(seq, [0.02, 0.01], [2.0, 3.0])
+    # Stakes are not rounded to cents, so allow a few cents of drift
+    assert np.allclose(result.curves[0, 1:], seq.recorded_balance, atol=0.05)
+    assert result.final_balance[0] == pytest.approx(acct.balance, abs=0.05)
+
+    # The second setting by hand: 1% stakes tripling on each loss, 1:1 payouts
+    balance, streak = 1000.0, 0
+    for ch in OUTCOMES:
+        stake = balance * 0.01 * 3.0 ** streak
+        balance += stake if ch == "W" else -stake
+        streak = 0 if ch == "W" else streak + 1
+    assert result.final_balance[1] == pytest.approx(balance)
+    assert result.curves.shape == (2, len(OUTCOMES) + 1)
+    assert (result.max_drawdown >= 0).all() and (result.bust_step == 0).all()
+
+
+def test_unaffordable_bets_stop_the_setting(tmp_path):
+    seq = outcome_sequence(_account(tmp_path))
+    bases, mults = settings_grid([0.3], [2.0, 4.0])
+    result = backtest(seq, bases, mults, keep_curves=False, chunk_size=2)
+    # 0.3 * 4 > 1 at the second loss in a row (step 2), 0.3 * 2 ** 2 > 1 at the third (step 3)
+    assert result.bust_step.tolist() == [3, 2]
+    assert result.curves is None
+    rows = result.rows()
+    assert rows[1]["bust_step"] == 2 and rows[1]["final_balance"] == pytest.approx(700)
+
+    # Chunking does not change the answer
+    whole = backtest(seq, bases, mults, chunk_size=4096)
+    assert np.allclose(whole.final_balance, result.final_balance)
+    assert np.allclose(whole.max_drawdown_pct, result.max_drawdown_pct)
+
+    with pytest.raises(ValueError):
+        backtest(seq, [0.01, 0.02], [2.0])
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import threading
+
+import pytest
+
+import app
+from money_manager.daemon import Client, CommandServer
+from money_manager.session import Account
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    acct = Account(data_file=app.get_data_file())
+    acct.init_account(1000)
+    # Unix socket paths are length-limited, so keep this one short
+    sock = os.path.join(tempfile.mkdtemp(), "mm.sock")
+    server = CommandServer(sock, lambda argv: app.run_command(acct, app.build_parser(), argv))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield sock, acct
+    server.shutdown()
+    server.server_close()
+    acct.close()
+
+
+def test_commands_run_on_daemon_and_write_through(daemon):
+    sock, acct = daemon
+    with Client(sock) as client:
+        assert client.call(["start"])["status"] == 0
+        reply = client.call(["record"])
+        assert reply == {"status": 0, "stdout": "Recorded step 1: loss pnl=-20.0 balance=980.0\n", "stderr": ""}
+        assert "Next bet: 39.2" in client.call(["next"])["stdout"]
+
+        bad = client.call(["start"])
+        assert bad["status"] == 1 and "already active" in bad["stderr"]
+        assert client.call(["bogus"])["status"] == 2
+        assert client.call(["serve"])["status"] == 1
+
+    # Every change is already on disk
+    assert Account(data_file=acct.data_file).current_session.steps[-1].balance_after == 980.0
+
+
+def test_daemon_picks_up_changes_from_other_processes(daemon):
+    sock, acct = daemon
+    other = Account(data_file=acct.data_file)
+    other.start_session()
+    other.record_result(0.02, 20.0, -20.0, "loss")
+    with Client(sock) as client:
+        assert "Balance: 980.0" in client.call(["status"])["stdout"]
+
+
+def test_a_long_lived_client_does_not_block_others(daemon):
+    sock, acct = daemon
+    with Client(sock) as first:
+        assert first.call(["start"])["status"] == 0
+        # `first` stays connected while another client is served
+        with Client(sock, timeout=5.0) as second:
+            assert second.call(["record"])["status"] == 0
+        assert "Balance: 980.0" in first.call(["status"])["stdout"]
+
+
+def test_client_paths_resolve_in_the_client_directory(daemon, tmp_path, monkeypatch, capsys):
+    sock, acct = daemon
+    client_dir = tmp_path / "client"
+    client_dir.mkdir()
+    monkeypatch.chdir(client_dir)
+    (client_dir / "results.csv").write_text("result,pnl\nloss,-20\nwin,20\n")
+
+    parser = app.build_parser()
+    argv = ["--socket", sock, "import", "--format", "csv", "results.csv", "--path-out=path.csv"]
+    assert app.client_argv(parser, parser.parse_args(argv), argv)[4:] == ["csv", str(client_dir / "results.csv"), f"--path-out={client_dir / 'path.csv'}"]
+
+    app.main(argv)
+    app.main(["--socket", sock, "export"])
+    app.main(["--socket", sock, "backtest", "--base-percent", "0.01", "--multiplier", "2", "--out", "bt.csv"])
+    capsys.readouterr()
+    assert sorted(p.name for p in client_dir.iterdir()) == ["bt.csv", "path.csv", "results.csv", "trading_history.csv", "trading_history.csv.state"]
+    assert not (tmp_path / "trading_history.csv").exists()
+
+    for argv in (["import", "-"], ["--storage", "sqlite", "status"]):
+        with pytest.raises(SystemExit):
+            app.main(["--socket", sock, *argv])
+        assert "Error:" in capsys.readouterr().err
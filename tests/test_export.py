@@ -0,0 +1,82 @@
+import csv
+
+import pytest
+
+from money_manager.export import CSV_HEADERS, HISTORY_HEADERS, IncrementalExport, write_workbook
+from money_manager.session import Account
+
+
+def test_write_workbook_streams_styled_rows(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    acct = Account(data_file=str(tmp_path / "acct.json"))
+    acct.init_account(1000)
+    acct.start_session()
+    acct.record_result(0.02, 20.0, -20.0, "loss")
+    acct.record_result(0.04, 39.2, 39.2, "win")
+
+    seen = []
+    path = str(tmp_path / "history.xlsx")
+    assert write_workbook(acct.to_document(), path, progress=lambda done, total: seen.append((done, total)), progress_every=1) == 2
+    assert seen[-1] == (2, 2)
+
+    wb = openpyxl.load_workbook(path)
+    rows = list(wb["Trading History"].iter_rows(values_only=True))
+    assert list(rows[0]) == HISTORY_HEADERS
+    assert rows[1][3] == "-20.00" and rows[2][5] == "✓ PROFIT"
+    assert wb["Trading History"]["B3"].style == "mm_profit"
+    assert wb["Summary"]["B3"].value == 1019.2
+    assert wb["Summary"]["B2"].value == 1000
+    assert not (tmp_path / "history.tmp.xlsx").exists()
+
+
+def _csv_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def test_incremental_export_appends_only_new_rows(tmp_path):
+    acct = Account(data_file=str(tmp_path / "acct.json"))
+    acct.init_account(1000)
+    acct.start_session()
+    acct.record_result(0.02, 20.0, -20.0, "loss")
+
+    path = str(tmp_path / "history.csv")
+    export = IncrementalExport(path)
+    assert export.update(acct) == 1
+    assert export.update(acct) == 0
+
+    acct.record_result(0.04, 39.2, 39.2, "win")
+    acct.force_end_session()
+    acct.start_session()
+    acct.record_result(0.02, 20.38, -20.38, "loss")
+    # A fresh instance picks the watermark up from the state file
+    export = IncrementalExport(path)
+    assert export.update(acct) == 2
+
+    rows = _csv_rows(path)
+    assert rows[0] == CSV_HEADERS
+    assert [r[0] for r in rows[1:]] == ["1", "2", "1"]
+    assert rows[3][7] == acct.current_session.id
+    assert export.figures() == {"balance": acct.balance, "first_balance": 1000, "sessions": 2}
+
+
+def test_incremental_export_recovers_from_torn_append_and_reinit(tmp_path):
+    acct = Account(data_file=str(tmp_path / "acct.json"))
+    acct.init_account(1000)
+    acct.start_session()
+    acct.record_result(0.02, 20.0, -20.0, "loss")
+    path = str(tmp_path / "history.csv")
+    IncrementalExport(path).update(acct)
+
+    # Rows appended but the state never saved: they are cut off, not duplicated
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("partial,row\n")
+    acct.record_result(0.04, 39.2, -39.2, "loss")
+    assert IncrementalExport(path).update(acct) == 1
+    assert [r[0] for r in _csv_rows(path)[1:]] == ["1", "2"]
+
+    acct.init_account(500)
+    export = IncrementalExport(path)
+    assert export.update(acct) == 0
+    assert _csv_rows(path) == [CSV_HEADERS]
+    assert export.figures() == {"balance": 500, "first_balance": None, "sessions": 0}
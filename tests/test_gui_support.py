@@ -0,0 +1,168 @@
+import threading
+import time
+
+import pytest
+
+from gui_support import Debouncer, StepTable, TaskRunner
+from money_manager.session import Account
+
+
+class FakeTree:
+    """Records Treeview calls instead of drawing."""
+
+    def __init__(self):
+        self.rows = {}
+        self.calls = []
+        self._next = 0
+
+    def insert(self, parent, index, values, tags):
+        self._next += 1
+        item = f"I{self._next}"
+        self.rows[item] = values
+        self.calls.append("insert")
+        return item
+
+    def item(self, item, values, tags):
+        self.rows[item] = values
+        self.calls.append("item")
+
+    def delete(self, *items):
+        for item in items:
+            del self.rows[item]
+        self.calls.append("delete")
+
+
+def row(step):
+    return (step.idx, f"{step.pnl:.2f}"), ("win" if step.pnl > 0 else "loss",)
+
+
+def test_step_table_inserts_only_new_steps(tmp_path):
+    acct = Account(data_file=str(tmp_path / "acct.json"))
+    acct.init_account(1000)
+    acct.start_session()
+    tree = FakeTree()
+    table = StepTable(tree, row)
+
+    acct.record_result(0.02, 20.0, -20.0, "loss")
+    acct.record_result(0.04, 39.2, -39.2, "loss")
+    table.sync(acct.current_session)
+    assert tree.calls == ["insert", "insert"]
+
+    table.sync(acct.current_session)
+    acct.record_result(0.08, 75.26, -75.26, "loss")
+    table.sync(acct.current_session)
+    assert tree.calls == ["insert", "insert", "insert"]
+    assert [v[0] for v in tree.rows.values()] == [1, 2, 3]
+
+    # A win ends the session, which empties the table
+    acct.record_result(0.16, 139.04, 139.04, "win")
+    table.sync(acct.current_session)
+    assert tree.rows == {} and tree.calls[-1] == "delete"
+
+
+def test_step_table_after_reload_and_new_session(tmp_path):
+    path = str(tmp_path / "acct.json")
+    acct = Account(data_file=path)
+    acct.init_account(1000)
+    acct.start_session()
+    acct.record_result(0.02, 20.0, -20.0, "loss")
+    tree = FakeTree()
+    table = StepTable(tree, row)
+    table.sync(acct.current_session)
+
+    # Another process records a step: reloaded objects, unchanged rows stay as they are
+    other = Account(data_file=path)
+    other.record_result(0.04, 39.2, -39.2, "loss")
+    with acct.transaction():
+        pass
+    table.sync(acct.current_session)
+    assert tree.calls == ["insert", "insert"]
+    assert list(tree.rows.values()) == [(1, "-20.00"), (2, "-39.20")]
+
+    acct.force_end_session()
+    table.sync(acct.current_session)
+    assert tree.rows == {} and table.items == {}
+    acct.start_session()
+    acct.record_result(0.02, 18.82, -18.82, "loss")
+    table.sync(acct.current_session)
+    assert list(tree.rows.values()) == [(1, "-18.82")]
+
+
+class FakeWidget:
+    """`after`/`after_cancel` with a clock the test advances by hand."""
+
+    def __init__(self):
+        self.now = 0
+        self.timers = {}
+        self._next = 0
+
+    def after(self, ms, fn, *args):
+        self._next += 1
+        self.timers[self._next] = (self.now + ms, fn, args)
+        return self._next
+
+    def after_cancel(self, timer_id):
+        del self.timers[timer_id]
+
+    def advance(self, ms):
+        self.now += ms
+        for timer_id, (due, fn, args) in sorted(self.timers.items(), key=lambda t: t[1][0]):
+            if due <= self.now and timer_id in self.timers:
+                del self.timers[timer_id]
+                fn(*args)
+
+
+def _pump(widget, runner, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while runner.busy:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+        widget.advance(runner.poll_ms)
+
+
+def test_task_runner_runs_off_the_tk_thread_in_order():
+    widget = FakeWidget()
+    runner = TaskRunner(widget)
+    seen = []
+    release = threading.Event()
+
+    def slow():
+        release.wait()
+        runner.post(seen.append, ("progress", threading.current_thread().name))
+        return "first"
+
+    runner.submit(slow, seen.append)
+    runner.submit(lambda: "second", seen.append)
+    # The caller is not blocked while the worker waits
+    widget.advance(runner.poll_ms)
+    assert seen == [] and runner.busy
+    release.set()
+    _pump(widget, runner)
+    assert seen == [("progress", "mm-worker"), "first", "second"]
+    assert widget.timers == {}  # polling stops once idle
+
+    errors = []
+    runner.submit(lambda: 1 / 0, seen.append, errors.append)
+    _pump(widget, runner)
+    assert isinstance(errors[0], ZeroDivisionError)
+
+    runner.submit(lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        _pump(widget, runner)
+
+
+def test_debouncer_fires_once_after_the_last_trigger():
+    widget = FakeWidget()
+    calls = []
+    debounce = Debouncer(widget, 200, lambda *args: calls.append(args))
+    for i in range(5):
+        debounce.trigger(i)
+        widget.advance(100)
+    assert calls == [] and len(widget.timers) == 1
+    widget.advance(100)
+    assert calls == [(4,)]
+
+    debounce.trigger(5)
+    debounce.cancel()
+    widget.advance(1000)
+    assert calls == [(4,)] and widget.timers == {}
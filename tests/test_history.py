@@ -0,0 +1,26 @@
+from money_manager.history import HistoryArrays
+from money_manager.martingale import MartingaleSimulator, StepResult
+
+
+def test_append_grow_and_slice():
+    hist = HistoryArrays(capacity=2)
+    for i in range(5):
+        hist.append(i + 1, 1.0 * (i + 1), "loss" if i % 2 else "win", 100.0 - i)
+    assert len(hist) == 5
+    assert hist[1] == StepResult(2, 2.0, "loss", 99.0)
+    tail = hist[3:]
+    assert len(tail) == 2
+    assert tail.to_dicts()[0] == {"round": 4, "bet": 4.0, "outcome": "loss", "balance": 97.0}
+
+
+def test_simulate_arrays_roundtrip(tmp_path):
+    kwargs = dict(starting_balance=100, base_bet=1, win_prob=0.45, target_profit=10, max_rounds=300)
+    full = MartingaleSimulator(seed=3, **kwargs).simulate()
+    arrays = MartingaleSimulator(seed=3, **kwargs).simulate(history="arrays")["history"]
+    assert arrays.to_dicts() == full["history"]
+    for path in (str(tmp_path / "hist.npz"), str(tmp_path / "hist_dir")):
+        arrays.save(path)
+        loaded = HistoryArrays.load(path)
+        assert loaded.to_dicts() == full["history"]
+    loaded.append(999, 1.0, "win", 1.0)
+    assert len(loaded) == len(arrays) + 1
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+from money_manager.http_api import AccountAPI
+from money_manager.session import Account
+
+
+async def _request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: x\r\nConnection: close\r\nContent-Length: {len(payload)}\r\n\r\n".encode() + payload)
+    raw = await reader.read()
+    writer.close()
+    head, _, data = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(data)
+
+
+def test_endpoints(tmp_path):
+    acct = Account(data_file=str(tmp_path / "acct.json"))
+    acct.init_account(1000)
+
+    async def scenario():
+        api = AccountAPI(acct)
+        server = await api.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            assert await _request(port, "POST", "/record", {"result": "loss"}) == (409, {"error": "No active session to record result"})
+            status, sess = await _request(port, "POST", "/session/start", {"base_percent": 0.01, "multiplier": 3})
+            assert status == 200 and sess["progress"]["multiplier"] == 3.0
+
+            # Concurrent records are applied one at a time, in order
+            replies = await asyncio.gather(*(_request(port, "POST", "/record", {"result": "loss"}) for _ in range(3)))
+            assert sorted(r[1]["idx"] for r in replies) == [1, 2, 3]
+            assert await _request(port, "GET", "/next-bet") == (200, {"bet_percent": 0.01 * 27, "bet_amount": round(acct.balance * 0.27, 2), "balance": acct.balance})
+
+            status, body = await _request(port, "GET", "/status")
+            assert body == acct.status()
+            status, page = await _request(port, "GET", "/history?limit=2")
+            assert [st["idx"] for st in page["steps"]] == [3, 2] and page["next_offset"] == 2
+            status, page = await _request(port, "GET", "/history?offset=2&limit=2")
+            assert [st["idx"] for st in page["steps"]] == [1] and page["next_offset"] is None
+            status, page = await _request(port, "GET", "/history?result=win")
+            assert status == 200 and page["steps"] == []
+
+            assert (await _request(port, "POST", "/session/end"))[1] == {"ended": True}
+            assert (await _request(port, "GET", "/record"))[0] == 405
+            assert (await _request(port, "GET", "/nope"))[0] == 404
+            assert (await _request(port, "POST", "/record", {"result": "maybe"}))[0] == 400
+            # Amounts are checked as in record_many: nothing unusable reaches the account
+            for bad in ({"pnl": "nan"}, {"pnl": "inf"}, {"bet_amount": []}, {"bet_amount": -5}, {"bet_percent": [0.1]}):
+                status, body = await _request(port, "POST", "/record", dict(bad, result="loss"))
+                assert status == 400, bad
+            assert (await _request(port, "POST", "/session/start", {"multiplier": []}))[0] == 400
+            assert (await _request(port, "GET", "/next-bet?base_percent=nan"))[0] == 400
+        finally:
+            await api.close()
+
+    asyncio.run(scenario())
+    reloaded = Account(data_file=acct.data_file)
+    assert reloaded.balance == acct.balance and reloaded.current_session is None
+
+
+def test_reads_see_other_writers_and_long_lines_are_rejected(tmp_path):
+    acct = Account(data_file=str(tmp_path / "acct.json"))
+    acct.init_account(1000)
+
+    async def scenario():
+        api = AccountAPI(acct)
+        server = await api.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            assert (await _request(port, "GET", "/status"))[1]["current_session"] is None
+            # Another process records a step: the next GETs reflect it
+            other = Account(data_file=acct.data_file)
+            other.start_session()
+            other.record_result(0.02, 20.0, -20.0, "loss")
+            status, body = await _request(port, "GET", "/status")
+            assert body["balance"] == 980.0 and len(body["current_session"]["steps"]) == 1
+            assert (await _request(port, "GET", "/next-bet"))[1]["bet_amount"] == 39.2
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /status?" + b"x" * 100_000 + b" HTTP/1.1\r\n\r\n")
+            raw = await reader.read()
+            writer.close()
+            assert raw.startswith(b"HTTP/1.1 413 ")
+
+            for length in (b"-5", b"abc"):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"POST /record HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+                raw = await reader.read()
+                writer.close()
+                assert raw.startswith(b"HTTP/1.1 400 "), length
+        finally:
+            await api.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from money_manager.importer import read_results
+from money_manager.session import Account
+
+ROWS = [
+    {"result": "loss", "timestamp": "2024-03-01T10:00:00"},
+    {"result": "loss", "timestamp": "2024-03-01T10:01:00"},
+    {"result": "win", "timestamp": "2024-03-01T10:02:00"},
+    {"result": "loss", "bet_amount": "15", "pnl": "-15", "timestamp": "2024-03-01T10:03:00"},
+]
+
+
+@pytest.mark.parametrize("storage", ["json", "journal", "sqlite"])
+def test_record_many_matches_individual_records(tmp_path, storage):
+    one_by_one = Account(data_file=str(tmp_path / "a.json"))
+    one_by_one.init_account(1000)
+    one_by_one.start_session()
+    for row in ROWS[:3]:
+        nxt = one_by_one.get_next_bet()
+        pnl = nxt["bet_amount"] if row["result"] == "win" else -nxt["bet_amount"]
+        one_by_one.record_result(nxt["bet_percent"], nxt["bet_amount"], pnl, row["result"])
+    one_by_one.start_session()
+    one_by_one.record_result(15 / one_by_one.balance, 15.0, -15.0, "loss")
+
+    bulk = Account(data_file=str(tmp_path / "b.json"), storage=storage)
+    bulk.init_account(1000)
+    summary = bulk.record_many(ROWS, chunk_size=3)
+    bulk.close()
+    assert summary["steps"] == 4 and summary["sessions_started"] == 2
+    assert summary["final_balance"] == one_by_one.balance
+    assert summary["min_balance"] == 940.8
+
+    reloaded = Account(data_file=str(tmp_path / "b.json"), storage=storage)
+    assert reloaded.balance == one_by_one.balance
+    assert [st.timestamp for s in reloaded.sessions for st in s.steps] == [r["timestamp"] for r in ROWS]
+    assert reloaded.current_session.loss_streak == 1
+    reloaded.close()
+
+
+def test_dry_run_leaves_account_untouched(tmp_path):
+    acct = Account(data_file=str(tmp_path / "a.json"))
+    acct.init_account(1000)
+    acct.start_session()
+    acct.record_result(0.02, 20.0, -20.0, "loss")
+    before = acct.to_document()
+
+    path = []
+    summary = acct.record_many(ROWS, dry_run=True, on_step=lambda st: path.append(st.balance_after))
+    assert path[-1] == summary["final_balance"] and len(path) == 4
+    assert acct.to_document() == before
+    assert Account(data_file=acct.data_file).to_document() == before
+
+
+def test_bad_row_reports_position_and_keeps_earlier_rows(tmp_path):
+    acct = Account(data_file=str(tmp_path / "a.json"))
+    acct.init_account(1000)
+    with pytest.raises(ValueError, match="result 2: pnl must be a number"):
+        acct.record_many([{"result": "loss"}, {"result": "win", "pnl": "abc"}])
+    assert Account(data_file=acct.data_file).balance == 980.0
+
+
+def test_read_results_streams_csv_and_ndjson(tmp_path):
+    csv_file = tmp_path / "fills.csv"
+    csv_file.write_text("timestamp,result,pnl,broker\n2024-03-01T10:00:00,loss,-5,x\n2024-03-01T10:01:00,win,,x\n")
+    ndjson_file = tmp_path / "fills.ndjson"
+    ndjson_file.write_text("\n".join(json.dumps(r) for r in ROWS) + "\n")
+
+    rows = list(read_results(str(csv_file)))
+    assert rows[0] == {"result": "loss", "pnl": "-5", "bet_amount": None, "bet_percent": None, "timestamp": "2024-03-01T10:00:00"}
+    assert rows[1]["pnl"] == ""
+    assert list(read_results(str(ndjson_file))) == ROWS
+
+
+@pytest.mark.parametrize("storage", ["json", "sqlite"])
+def test_import_across_many_chunks(tmp_path, storage, monkeypatch):
+    rows = [{"result": "win" if n % 3 == 2 else "loss", "timestamp": f"2024-03-01T10:{n:02d}:00"} for n in range(30)]
+    reference = Account(data_file=str(tmp_path / "ref.json"), storage=storage)
+    reference.init_account(1000)
+    for row in rows:
+        reference.record_many([row])
+
+    acct = Account(data_file=str(tmp_path / "bulk.json"), storage=storage)
+    acct.init_account(1000)
+    commits = []
+    append_many = acct.storage.append_many
+    monkeypatch.setattr(acct.storage, "append_many", lambda records, snapshot: commits.append(len(records)) or append_many(records, snapshot))
+    summary = acct.record_many(rows, chunk_size=4)
+    acct.close()
+    assert summary["steps"] == 30 and summary["sessions_started"] == 10
+    if storage == "json":
+        # Each commit would rewrite the whole file: the import commits once
+        assert commits == [40]
+    else:
+        assert len(commits) == 10 and sum(commits) == 40
+        # Committed closed sessions are no longer held in memory
+        assert not any(s.loaded for s in acct.sessions[:-1])
+
+    reloaded = Account(data_file=acct.data_file, storage=storage)
+    assert reloaded.balance == reference.balance
+    assert [[vars(st) for st in s.steps] for s in reloaded.sessions] == [[vars(st) for st in s.steps] for s in reference.sessions]
+    reloaded.close()
+    reference.close()
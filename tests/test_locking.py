@@ -0,0 +1,67 @@
+import os
+import sys
+from multiprocessing import Process
+
+import pytest
+
+from money_manager.session import Account, AccountConflictError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+from bench_concurrent_record import record_steps  # noqa: E402
+
+
+@pytest.mark.parametrize("storage", ["json", "journal", "sqlite"])
+def test_concurrent_processes_lose_no_steps(tmp_path, storage):
+    data_file = str(tmp_path / "mm_account.json")
+    Account(data_file=data_file, storage=storage).init_account(1000)
+    procs = [Process(target=record_steps, args=(data_file, storage, 15)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+
+    acct = Account(data_file=data_file, storage=storage)
+    assert sum(s.step_count for s in acct.sessions) == 60
+    assert acct.balance == pytest.approx(1000 - 0.6)
+
+
+def test_stale_account_raises_conflict(tmp_path):
+    data_file = str(tmp_path / "mm_account.json")
+    a = Account(data_file=data_file)
+    a.init_account(1000)
+    b = Account(data_file=data_file)
+    a.start_session()
+
+    with pytest.raises(AccountConflictError):
+        b.start_session()
+    assert b.current_session is None
+
+    with b.transaction():
+        assert b.current_session is not None
+        b.record_result(0.02, 20.0, -20.0, "loss")
+    a.reload()
+    assert a.balance == 980.0
+    assert a.current_session.steps[-1].balance_after == 980.0
+
+
+def test_failed_write_keeps_the_version(tmp_path, monkeypatch):
+    data_file = str(tmp_path / "mm_account.json")
+    acct = Account(data_file=data_file)
+    acct.init_account(1000)
+    version = acct.disk_version()
+
+    def fail(doc):
+        # The version must not be bumped before the data is written
+        assert acct.disk_version() == version
+        raise OSError("disk full")
+
+    monkeypatch.setattr(acct.storage, "save", fail)
+    with pytest.raises(OSError):
+        acct.start_session()
+    assert acct.disk_version() == acct.version == version
+    monkeypatch.undo()
+    acct.reload()
+    acct.start_session()
+    assert acct.disk_version() == version + 1
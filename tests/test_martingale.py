@@ -1,4 +1,5 @@
-from money_manager.martingale import MartingaleSimulator
+from money_manager.martingale import STOP_REASONS, MartingaleSimulator
+from money_manager.parallel import run_parallel
 
 
 def test_quick_simulation_reaches_target():
@@ -12,3 +13,54 @@ def test_bankrupt_scenario():
     sim = MartingaleSimulator(starting_balance=10, base_bet=5, multiplier=2, win_prob=0.0, payout=2, max_rounds=10, seed=0)
     result = sim.simulate()
     assert result["final_balance"] <= 10
+
+
+def test_simulate_many_stop_reasons():
+    sim = MartingaleSimulator(starting_balance=10, base_bet=5, multiplier=2, win_prob=0.0, payout=2, max_rounds=10, seed=0)
+    res = sim.simulate_many(50)
+    assert res["final_balance"].shape == (50,)
+    assert all(STOP_REASONS[c] == "bankrupt" for c in res["stop_reason"])
+    # 5 lost, then a 10 bet exceeds the remaining 5 on round 2
+    assert (res["final_balance"] == 5).all()
+    assert (res["rounds"] == 2).all()
+
+
+def test_simulate_many_matches_single_path_rules():
+    sim = MartingaleSimulator(starting_balance=1000, base_bet=1, multiplier=2, win_prob=1.0, payout=2, target_profit=10, max_rounds=100, seed=0)
+    res = sim.simulate_many(5)
+    single = sim.simulate()
+    assert (res["final_balance"] == single["final_balance"]).all()
+    assert (res["rounds"] == single["rounds"]).all()
+
+
+def test_run_parallel_reproducible_across_workers():
+    sim = MartingaleSimulator(starting_balance=100, base_bet=1, multiplier=2, win_prob=0.48, payout=2, target_profit=20, max_rounds=200)
+    one = run_parallel(sim, 2500, workers=1, seed=7, chunk_size=1000)
+    two = run_parallel(sim, 2500, workers=2, seed=7, chunk_size=1000)
+    assert one == two
+    assert one["n_paths"] == 2500
+    assert sum(one["stop_reasons"].values()) == 2500
+
+
+def test_history_modes_agree():
+    kwargs = dict(starting_balance=100, base_bet=1, multiplier=2, win_prob=0.45, payout=2, target_profit=10, max_rounds=500)
+    full = MartingaleSimulator(seed=5, **kwargs).simulate()
+    summary = MartingaleSimulator(seed=5, **kwargs).simulate(history="none")
+    streamed = []
+    MartingaleSimulator(seed=5, **kwargs).simulate(history="stream", on_step=streamed.append)
+    assert "history" not in summary
+    assert summary["final_balance"] == full["final_balance"]
+    assert summary["wins"] + summary["losses"] == len([h for h in full["history"] if h["outcome"] in ("win", "loss")])
+    assert [s.__dict__ for s in streamed] == full["history"]
+
+
+def test_simulators_have_independent_streams():
+    kwargs = dict(starting_balance=100, base_bet=1, win_prob=0.45, target_profit=10, max_rounds=300)
+    a = MartingaleSimulator(seed=9, **kwargs)
+    b = MartingaleSimulator(seed=9, **kwargs)
+    MartingaleSimulator(seed=1, **kwargs).simulate()  # must not disturb a or b
+    assert a.simulate() == b.simulate()
+    children = a.spawn(2)
+    assert children[0].simulate() != children[1].simulate()
+    per_round = MartingaleSimulator(seed=9, draw_block=1, **kwargs).simulate()
+    assert per_round["rounds"] > 0
@@ -1,6 +1,9 @@
 from money_manager.session import Account
+import json
 import os
 
+import pytest
+
 
 def test_session_flow(tmp_path):
     data_file = tmp_path / "acct.json"
@@ -15,3 +18,115 @@ def test_session_flow(tmp_path):
     nxt2 = acct.get_next_bet()
     # next percent should be doubled
     assert round(nxt2["bet_percent"], 10) == round(nxt["bet_percent"] * 2, 10)
+
+
+def test_closed_sessions_load_lazily(tmp_path):
+    for storage in ("json", "sqlite"):
+        data_file = str(tmp_path / f"{storage}.json")
+        acct = Account(data_file=data_file, storage=storage)
+        acct.init_account(1000)
+        acct.start_session()
+        acct.record_result(0.02, 20.0, -20.0, "loss")
+        acct.record_result(0.04, 39.2, 39.2, "win")
+        acct.start_session()
+        acct.record_result(0.02, 20.38, -20.38, "loss")
+        acct.close()
+
+        reopened = Account(data_file=data_file, storage=storage)
+        closed, active = reopened.sessions
+        assert not closed.loaded
+        assert closed.step_count == 2
+        assert closed.end_balance == 1019.2
+        assert active.loaded and reopened.current_session is active
+        assert [st.result for st in closed.steps] == ["loss", "win"]
+        assert closed.loaded
+        reopened.close()
+
+
+def test_progression_state_is_persisted(tmp_path):
+    for storage in ("json", "journal", "sqlite"):
+        data_file = str(tmp_path / f"{storage}.json")
+        acct = Account(data_file=data_file, storage=storage)
+        acct.init_account(1000)
+        acct.start_session(base_percent=0.01, multiplier=3.0)
+        for _ in range(2):
+            nxt = acct.get_next_bet()
+            acct.record_result(nxt["bet_percent"], nxt["bet_amount"], -nxt["bet_amount"], "loss")
+        acct.close()
+
+        reopened = Account(data_file=data_file, storage=storage)
+        sess = reopened.current_session
+        assert (sess.loss_streak, sess.base_percent, sess.multiplier) == (2, 0.01, 3.0)
+        assert sess.session_loss == 10.0 + 29.7
+        # The next bet comes from the cached state, not the step list
+        sess.steps = None
+        assert reopened.get_next_bet()["bet_percent"] == 0.01 * 3 * 3
+        assert reopened.get_next_bet(multiplier=2.0)["bet_percent"] == 0.03 * 2
+        reopened.close()
+
+
+def test_progression_recovered_for_old_files(tmp_path):
+    data_file = tmp_path / "acct.json"
+    steps = [
+        {"idx": 1, "bet_percent": 0.02, "bet_amount": 20.0, "result": "loss", "pnl": -20.0, "balance_after": 980.0, "timestamp": "t1"},
+        {"idx": 2, "bet_percent": 0.04, "bet_amount": 39.2, "result": "loss", "pnl": -39.2, "balance_after": 940.8, "timestamp": "t2"},
+    ]
+    doc = {"balance": 940.8, "sessions": [{"id": "s1", "start_balance": 1000.0, "active": True, "created_at": "t0", "steps": steps}]}
+    data_file.write_text(json.dumps(doc))
+
+    acct = Account(data_file=str(data_file))
+    assert acct.current_session.loss_streak == 2
+    assert acct.current_session.session_loss == 59.2
+    assert round(acct.get_next_bet()["bet_percent"], 10) == 0.08
+
+
+def test_bet_ladder_matches_recorded_losses(tmp_path):
+    acct = Account(data_file=str(tmp_path / "acct.json"))
+    acct.init_account(1000)
+    ladder = acct.get_ladder(depth=8, win_prob=0.4, base_percent=0.1, multiplier=2.0)
+    assert ladder.bust_depth == 5
+    assert ladder.reach_probability[3] == pytest.approx(0.6 ** 3)
+
+    acct.start_session(base_percent=0.1, multiplier=2.0)
+    for row in ladder.rows()[:4]:
+        nxt = acct.get_next_bet()
+        assert nxt["bet_percent"] == pytest.approx(row["bet_percent"])
+        assert nxt["bet_amount"] == pytest.approx(row["bet_amount"], abs=0.02)
+        acct.record_result(nxt["bet_percent"], nxt["bet_amount"], -nxt["bet_amount"], "loss")
+        assert acct.balance == pytest.approx(row["balance_after"], abs=0.05)
+    assert acct.get_next_bet()["bet_amount"] > acct.balance
+
+
+def test_history_filters(tmp_path, monkeypatch):
+    pages = {}
+    for storage in ("json", "sqlite"):
+        data_file = str(tmp_path / f"{storage}.json")
+        acct = Account(data_file=data_file, storage=storage)
+        acct.init_account(1000)
+        acct.record_many([
+            {"result": "loss", "timestamp": "2024-05-01T10:00:00"},
+            {"result": "win", "timestamp": "2024-05-01T11:00:00"},
+            {"result": "loss", "timestamp": "2024-05-02T09:00:00"},
+            {"result": "loss", "timestamp": "2024-05-03T09:00:00"},
+        ])
+        acct.close()
+
+        acct = Account(data_file=data_file, storage=storage)
+        if storage == "sqlite":
+            # Filters and counts are answered by SQL, not by walking the steps
+            monkeypatch.setattr(acct, "_matching_steps", None)
+        first, second = acct.sessions
+        assert acct.history_count() == 4
+        assert acct.history_count(result="loss") == 3
+        assert [st["timestamp"][:10] for st in acct.history(result="loss", offset=1, limit=5)] == ["2024-05-02", "2024-05-01"]
+        assert acct.history_count(since="2024-05-01T10:30", until="2024-05-02") == 2
+        assert [st["idx"] for st in acct.history(session_id=first.id, result="win")] == [2]
+        assert acct.history_count(session_id=second.id, until="2024-05-01") == 0
+        # Filtered scans read closed sessions without keeping them loaded
+        assert not first.loaded
+        pages[storage] = [
+            [dict(st, session_id=st["session_id"] == second.id) for st in acct.history(offset, 2, result="loss", since="2024-05-01")]
+            for offset in (0, 2)
+        ]
+        acct.close()
+    assert pages["sqlite"] == pages["json"]
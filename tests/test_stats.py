@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+import app
+from money_manager.session import Account
+from money_manager.stats import AccountStats
+
+RESULTS = [
+    {"result": "loss", "pnl": -10, "timestamp": "2024-05-01T09:15:00"},
+    {"result": "loss", "pnl": -20, "timestamp": "2024-05-01T09:45:00"},
+    {"result": "win", "pnl": 40, "timestamp": "2024-05-01T10:05:00"},
+    {"result": "loss", "pnl": -50, "timestamp": "2024-05-02T10:30:00"},
+    {"result": "loss", "pnl": -5, "timestamp": "2024-05-02T10:40:00"},
+    {"result": "loss", "pnl": -5, "timestamp": "2024-05-02T22:00:00"},
+]
+
+
+def test_metrics(tmp_path):
+    acct = Account(data_file=str(tmp_path / "acct.json"))
+    acct.init_account(1000)
+    acct.record_many(RESULTS)
+
+    s = AccountStats().update(acct).summary()
+    assert s["steps"] == 6 and s["sessions"] == 2 and s["wins"] == 1
+    assert s["win_rate"] == pytest.approx(1 / 6)
+    assert s["starting_balance"] == 1000 and s["balance"] == 950 and s["total_pnl"] == -50
+    # Peak 1010 after the win, low 950 at the end
+    assert s["max_drawdown"] == 60 and s["max_drawdown_pct"] == pytest.approx(60 / 1010)
+    assert s["longest_loss_streak"] == 3 and s["current_loss_streak"] == 3
+    assert s["avg_session_length"] == 3
+    assert (s["best_session_pnl"], s["worst_session_pnl"]) == (10, -60)
+
+    by_hour = {row["hour"]: row for row in AccountStats().update(acct).by_hour()}
+    assert sorted(by_hour) == [9, 10, 22]
+    assert by_hour[10]["steps"] == 3 and by_hour[10]["win_rate"] == pytest.approx(1 / 3) and by_hour[10]["pnl"] == -15
+
+
+def test_incremental_updates_match_a_full_build(tmp_path):
+    acct = Account(data_file=str(tmp_path / "acct.json"))
+    acct.init_account(1000)
+    stats = AccountStats()
+    for item in RESULTS:
+        acct.record_many([item])
+        stats.update(acct)
+    full = AccountStats().update(acct)
+    assert stats.summary() == full.summary()
+    assert np.array_equal(stats.session_pnl, full.session_pnl)
+    assert np.array_equal(stats.steps["balance"], full.steps["balance"])
+
+    # A re-initialized account is rebuilt, not appended to
+    acct.init_account(500)
+    assert stats.update(acct).summary()["steps"] == 0
+    assert stats.summary()["balance"] == 500
+
+
+def test_stats_command(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    acct = Account(data_file=str(tmp_path / "mm_account.json"))
+    acct.init_account(1000)
+    acct.record_many(RESULTS)
+    acct.close()
+
+    app.main(["stats", "--by-hour"])
+    out = capsys.readouterr().out
+    assert "Max drawdown: 60.00 (5.94%)" in out
+    assert "Loss streak: longest 3, current 3" in out
+    assert "  22        1      0.0%       -5.00" in out
@@ -0,0 +1,178 @@
+import json
+import threading
+import time
+
+import pytest
+
+import app
+from money_manager.session import Account
+from money_manager.storage import CorruptDataError, JournalStorage, SQLiteStorage, migrate_json_to_sqlite
+
+
+def _play(acct):
+    acct.init_account(1000)
+    acct.start_session()
+    for result in ("loss", "loss", "win"):
+        nxt = acct.get_next_bet()
+        pnl = nxt["bet_amount"] if result == "win" else -nxt["bet_amount"]
+        acct.record_result(nxt["bet_percent"], nxt["bet_amount"], pnl, result)
+    acct.start_session()
+    acct.record_result(0.02, 20.0, -20.0, "loss")
+
+
+def test_journal_replay_matches_json(tmp_path):
+    json_acct = Account(data_file=str(tmp_path / "a.json"))
+    _play(json_acct)
+    journal_acct = Account(data_file=str(tmp_path / "b.json"), storage="journal")
+    _play(journal_acct)
+    journal_acct.close()
+    assert (tmp_path / "b.json.journal").exists()
+
+    reloaded = Account(data_file=str(tmp_path / "b.json"), storage="journal")
+    assert reloaded.balance == json_acct.balance
+    assert reloaded.status() == journal_acct.status()
+    assert reloaded.to_document() == journal_acct.to_document()
+    assert len(reloaded.sessions) == 2
+
+
+def test_journal_compaction_and_torn_tail(tmp_path):
+    path = str(tmp_path / "acct.json")
+    acct = Account(data_file=path, storage=JournalStorage(path, compact_every=3, fsync=False))
+    _play(acct)
+    acct.close()
+    # simulate a crash in the middle of an append
+    with open(path + ".journal", "a", encoding="utf-8") as f:
+        f.write('{"op":"step","sess')
+    reloaded = Account(data_file=path, storage="journal")
+    assert reloaded.balance == acct.balance
+    assert [len(s.steps) for s in reloaded.sessions] == [3, 1]
+
+    # The next appends must not be glued onto the torn fragment
+    reloaded.record_result(0.04, 39.2, -39.2, "loss")
+    reloaded.record_result(0.08, 75.26, -75.26, "loss")
+    reloaded.close()
+    again = Account(data_file=path, storage="journal")
+    assert again.balance == reloaded.balance
+    assert [len(s.steps) for s in again.sessions] == [3, 3]
+
+
+def test_sqlite_backend_and_migration(tmp_path):
+    json_path = str(tmp_path / "acct.json")
+    json_acct = Account(data_file=json_path)
+    _play(json_acct)
+
+    storage = migrate_json_to_sqlite(json_path)
+    migrated = Account(data_file=json_path, storage=storage)
+    assert migrated.to_document() == json_acct.to_document()
+
+    # keep recording through the sqlite backend and reopen
+    migrated.record_result(0.04, 39.2, 39.2, "win")
+    migrated.close()
+    reopened = Account(data_file=json_path, storage="sqlite")
+    assert reopened.balance == migrated.balance
+    assert reopened.current_session is None
+    losses = reopened.storage.query_steps(result="loss")
+    assert len(losses) == 3
+    first = reopened.sessions[0].id
+    assert [st["idx"] for st in reopened.storage.query_steps(session_id=first)] == [1, 2, 3]
+    assert isinstance(reopened.storage, SQLiteStorage)
+
+
+def test_migration_keeps_an_existing_database(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit):
+        app.main(["migrate"])
+    assert "No account file to migrate" in capsys.readouterr().err
+
+    json_path = app.get_data_file()
+    _play(Account(data_file=json_path))
+    app.main(["migrate"])
+    # Keep using the database; the JSON file goes stale
+    db_acct = Account(data_file=json_path, storage="sqlite")
+    db_acct.record_result(0.04, 39.2, -39.2, "loss")
+    db_acct.close()
+
+    with pytest.raises(SystemExit):
+        app.main(["migrate"])
+    assert "already exists" in capsys.readouterr().err
+    assert Account(data_file=json_path, storage="sqlite").balance == db_acct.balance
+
+    # --force replaces it, and other holders of the account see a new version
+    version = db_acct.version
+    app.main(["migrate", "--force"])
+    reopened = Account(data_file=json_path, storage="sqlite")
+    assert reopened.balance == Account(data_file=json_path).balance
+    assert reopened.version == version + 1
+
+
+def test_write_behind_on_close_and_interval(tmp_path):
+    path = str(tmp_path / "wb.json")
+    acct = Account(data_file=path, durability="on_close")
+    acct.init_account(1000)
+    acct.start_session()
+    acct.record_result(0.02, 20.0, -20.0, "loss")
+    assert not (tmp_path / "wb.json").exists()
+    acct.flush()
+    assert Account(data_file=path).balance == 980.0
+
+    for storage in ("json", "journal", "sqlite"):
+        path = str(tmp_path / f"interval-{storage}.json")
+        with Account(data_file=path, storage=storage, durability="interval", flush_interval_ms=5, flush_batch_size=10) as acct:
+            acct.init_account(1000)
+            for _ in range(25):
+                acct.start_session()
+                acct.record_result(0.01, 10.0, 10.0, "win")
+        reopened = Account(data_file=path, storage=storage)
+        assert reopened.balance == 1250.0
+        assert len(reopened.sessions) == 25
+        reopened.close()
+
+
+def test_write_behind_flush_and_reload_do_not_deadlock(tmp_path):
+    acct = Account(data_file=str(tmp_path / "wb.json"), durability="on_close")
+    acct.init_account(1000)
+    acct.flush()
+    acct.start_session()
+    acct.record_result(0.02, 20.0, -20.0, "loss")
+
+    def owner():
+        # A flush on another thread starts while this one holds the account lock and reloads
+        with acct._lock:
+            flusher = threading.Thread(target=acct.flush, daemon=True)
+            flusher.start()
+            time.sleep(0.05)
+            acct.reload()
+        flusher.join()
+
+    thread = threading.Thread(target=owner, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert acct.balance == 980.0
+    acct.close()
+
+
+def test_atomic_save_checksum_and_corruption(tmp_path):
+    path = tmp_path / "acct.json"
+    acct = Account(data_file=str(path))
+    _play(acct)
+    assert (tmp_path / "acct.json.bak").exists()
+    assert not (tmp_path / "acct.json.tmp").exists()
+    assert "checksum" in json.loads(path.read_text())
+
+    # flip one digit inside the file: still valid JSON, but the checksum catches it
+    text = path.read_text()
+    path.write_text(text.replace('"balance_after": 980.0', '"balance_after": 981.0', 1))
+    with pytest.raises(CorruptDataError) as err:
+        Account(data_file=str(path))
+    assert err.value.backup == str(path) + ".bak"
+
+    # truncated file
+    path.write_text(text[: len(text) // 2])
+    with pytest.raises(CorruptDataError):
+        Account(data_file=str(path))
+
+    # files from older versions carry no checksum and still load
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps({"balance": 5.0, "sessions": []}))
+    assert Account(data_file=str(legacy)).balance == 5.0
@@ -0,0 +1,32 @@
+import io
+
+import pytest
+
+from cli import parse_args
+from money_manager.sweep import expand_grid, sweep, write_table
+
+
+def test_expand_grid_product():
+    cells = expand_grid({"base_bet": [1, 2], "multiplier": [2, 3, 4]})
+    assert len(cells) == 6
+    assert cells[0] == {"base_bet": 1, "multiplier": 2}
+
+
+def test_sweep_common_random_numbers_independent_of_batching():
+    grid = {"base_bet": [1, 2], "win_prob": [0.45, 0.5]}
+    kwargs = dict(n_paths=500, starting_balance=100, max_rounds=200, seed=11, defaults={"target_profit": 20})
+    together = sweep(grid, cells_per_batch=64, **kwargs)
+    one_by_one = sweep(grid, cells_per_batch=1, **kwargs)
+    assert together == one_by_one
+    assert all(0.0 <= row["ruin_probability"] <= 1.0 for row in together)
+    buf = io.StringIO()
+    write_table(together, buf)
+    assert buf.getvalue().splitlines()[0].startswith("base_bet,multiplier,win_prob")
+
+
+def test_sweep_rejects_shared_options_given_before_it():
+    assert parse_args(["--workers", "2", "sweep", "--seed", "5"]).seed == 5
+    with pytest.raises(SystemExit):
+        parse_args(["--seed", "5", "sweep"])
+    with pytest.raises(SystemExit):
+        parse_args(["--max-r=50", "sweep"])